@@ -1,12 +1,64 @@
-from typing import Generic, TypeVar, List
-from functools import reduce
+import heapq
+import os
+from array import array
+from concurrent.futures import Executor, ProcessPoolExecutor
+from io import StringIO
+from itertools import count, repeat
+from typing import Any, Callable, Dict, Generic, Iterable, Iterator, Optional, Sequence, TextIO, Tuple, TypeVar, List
+from recorridos import (
+    Entrada, ancho_maximo, buscar_por_niveles, camino_de, escribir_sangrado, iguales, indice_de_valores, niveles,
+    plegar, plegar_serializado, por_niveles, posorden, preorden, preorden_con_nivel, resolver_caminos
+)
+from versiones import CONGELADA, Version, a_desprender, cerrar, compartir, desanotar, es_ajeno, ultima, version_para_copiar
 
 T = TypeVar('T')
+R = TypeVar('R')
+
+# next() sobre un count es atómico: dos modificaciones a la vez, aunque sea desde
+# hilos distintos, nunca terminan con la misma versión
+_versiones = count(1)
+
+
+class _Familia:
+    '''
+    Conjunto de unión y búsqueda de los nodos enlazados entre sí: todo nodo al que
+    se llega desde otro está en su misma familia, salvo los que una copia comparte
+    con su original, que no cambian mientras los comparte (ver copy()). La versión de la raíz cambia con
+    cada modificación de cualquiera de sus nodos y es la que validan las huellas,
+    el índice de nivel() e IndiceEuler. copiada dice si alguno de sus nodos se
+    copió alguna vez: si no, nada de la familia está en otra versión.
+    '''
+    __slots__ = ('padre', 'version', 'copiada')
+
+    def __init__(self):
+        self.padre: Optional[_Familia] = None
+        self.version: int = next(_versiones)
+        self.copiada: bool = False
+
 
 class ArbolN(Generic[T]):
+    __slots__ = (
+        '_dato', '_subarboles', '_antecesor', '_duenio', '_ajenos', '_familia', '_indice', '_huella', '_version_huella',
+        '__weakref__'
+    )
+
     def __init__(self, dato: T):
         self._dato: T = dato
         self._subarboles: List[ArbolN[T]] = []
+        # nodo del que cuelga en su árbol: con él se sube hasta la raíz para saber
+        # qué copiar antes de escribir (ver copy() y versiones.antecesor)
+        self._antecesor: Any = None
+        # versión a la que pertenece el nodo (ver versiones.py); None si es la de su padre
+        self._duenio: Optional[Version] = None
+        # referencias débiles a los nodos de las copias que apuntan a este, ver versiones.compartir
+        self._ajenos: Optional[list] = None
+        # None mientras el nodo está solo, sin subárboles ni padre; ver _Familia
+        self._familia: Optional[_Familia] = None
+        # (versión de la familia al armarlo, dato -> entrada), ver indexar()
+        self._indice: Optional[Tuple[int, Dict[T, Entrada]]] = None
+        # hash estructural y versión de la familia cuando se calculó, ver huella()
+        self._huella: int = 0
+        self._version_huella: Optional[int] = None
        
     @property
     def dato(self) -> T:
@@ -14,119 +66,638 @@ class ArbolN(Generic[T]):
 
     @dato.setter
     def dato(self, valor: T):
+        self._antes_de_escribir()
         self._dato = valor
+        self._modificado()
+
+    def _raiz_familia(self) -> _Familia:
+        familia = self._familia
+        if familia is None:
+            familia = self._familia = _Familia()
+            return familia
+        raiz = familia
+        while raiz.padre is not None:
+            raiz = raiz.padre
+        # compresión de caminos
+        while familia is not raiz:
+            familia.padre, familia = raiz, familia.padre
+        self._familia = raiz
+        return raiz
+
+    def _version(self) -> int:
+        return self._raiz_familia().version
+
+    def _modificado(self, enlazados: "Iterable[ArbolN[T]]" = ()) -> None:
+        # une la familia con la de los subárboles recién enlazados y le da una versión nueva
+        familia = self._raiz_familia()
+        for t in enlazados:
+            if t._familia is None:
+                t._familia = familia
+            else:
+                otra = t._raiz_familia()
+                if otra is not familia:
+                    otra.padre = familia
+                    familia.copiada = familia.copiada or otra.copiada
+        familia.version = next(_versiones)
 
     @property
-    def subarboles(self) -> "List[ArbolN[T]]":
+    def subarboles(self) -> "Tuple[ArbolN[T], ...]":
+        # tupla y no la lista: los cambios pasan por insertar_subarbol o el setter,
+        # que son los que invalidan el índice y las huellas
+        return tuple(self._subarboles_propios())
+
+    def _subarboles_propios(self) -> "List[ArbolN[T]]":
+        # copia por camino (ver copy()): antes de entregar los subárboles se reemplazan
+        # los que son de otra versión
+        duenio = self._duenio
+        if duenio is not None and any(t._duenio is not duenio and es_ajeno(t._duenio, duenio) for t in self._subarboles):
+            self._subarboles = [
+                t._copia_propia(self) if t._duenio is not duenio and es_ajeno(t._duenio, duenio) else t
+                for t in self._subarboles
+            ]
+            # los nodos nuevos son otros objetos: IndiceEuler se tiene que rearmar
+            self._modificado()
         return self._subarboles
+
+    def _copia_propia(self, padre: "ArbolN[T]") -> "ArbolN[T]":
+        nuevo = ArbolN(self._dato)
+        nuevo._subarboles = list(self._subarboles)
+        nuevo._antecesor = padre
+        nuevo._duenio = padre._duenio
+        nuevo._familia = padre._raiz_familia()
+        compartir(nuevo._subarboles, self._duenio, nuevo, self)
+        return nuevo
+
+    def _enlazar(self, subarboles: "Iterable[ArbolN[T]]") -> None:
+        # los subárboles de otra versión (ver copy()) tienen su padre allá, y anotan a
+        # este nodo, que ahora también apunta a ellos
+        for t in subarboles:
+            if es_ajeno(t._duenio, self._duenio):
+                compartir((t,), None, self)
+            else:
+                t._antecesor = self
+
+    def _antes_de_escribir(self) -> None:
+        duenio = self._duenio
+        if (duenio is None and not self._raiz_familia().copiada) or (duenio is not None and duenio.atajo is None):
+            return
+        for t, version in a_desprender(self):
+            t._desprender(version)
+
+    def _desprender(self, version: Version) -> None:
+        '''
+        El nodo, de una versión cerrada, se queda con una copia de sus subárboles en
+        la versión actual; el nodo viejo pasa a uno congelado, que es el que ven
+        desde ahora las copias que apuntaban a este (ver versiones.py).
+        '''
+        viejo = ArbolN(self._dato)
+        viejo._subarboles = self._subarboles
+        viejo._duenio = CONGELADA
+        self._subarboles = list(viejo._subarboles)
+        compartir(viejo._subarboles, version, viejo, self)
+        for copia in desanotar(self):
+            copia._cambiar_hijo(self, viejo)
+        self._duenio = ultima(version)
+
+    def _cambiar_hijo(self, anterior: "ArbolN[T]", nuevo: "ArbolN[T]") -> None:
+        hijos = self._subarboles
+        for i, t in enumerate(hijos):
+            if t is anterior:
+                hijos[i] = nuevo
+                # otro objeto: IndiceEuler se tiene que rearmar
+                self._modificado()
+                return
     
     @subarboles.setter
-    def subarboles(self, subarboles: "List[ArbolN[T]]"):
-        self._subarboles = subarboles
+    def subarboles(self, subarboles: "Iterable[ArbolN[T]]"):
+        self._antes_de_escribir()
+        self._subarboles = list(subarboles)
+        self._enlazar(self._subarboles)
+        self._modificado(self._subarboles)
 
     def insertar_subarbol(self, subarbol: "ArbolN[T]"):
-        self.subarboles.append(subarbol)
+        self._antes_de_escribir()
+        self._subarboles.append(subarbol)
+        self._enlazar((subarbol,))
+        self._modificado((subarbol,))
 
     def es_hoja(self) -> bool:
-        return self.subarboles == []
+        return self._subarboles == []
+
+    # Los recorridos usan la pila explícita de recorridos.py en lugar de recursión,
+    # así que no tienen límite de profundidad.
+    def _hijos(self) -> "List[ArbolN[T]]":
+        return self._subarboles
     
     def altura(self) -> int:
-        def altura_n(bosque: List[ArbolN[T]]) -> int:
-            if not bosque:
-                return 0
-            else:
-                return max(bosque[0].altura(), altura_n(bosque[1:]))
-        
-        return 1 + altura_n(self.subarboles)
+        return 1 + max(nivel for _, nivel in preorden_con_nivel(self, ArbolN._hijos))
         
     def __len__(self) -> int:
-        if self.es_hoja():
-            return 1
-        else:
-            return 1 + sum([len(subarbol) for subarbol in self.subarboles])
+        return sum(1 for _ in preorden(self, ArbolN._hijos))
 
     def __str__(self):
-        def mostrar(t: ArbolN[T], nivel: int):
-            tab = '.' * 4
-            indent = tab * nivel
-            out = indent + str(t.dato) + '\n'
-            for subarbol in t.subarboles:
-                out += mostrar(subarbol, nivel + 1)
-            return out
-            
-        return mostrar(self, 0)
+        salida = StringIO()
+        self.render(salida)
+        return salida.getvalue()
+
+    def render(
+        self, sink: Optional[TextIO] = None, max_nodes: Optional[int] = None, max_depth: Optional[int] = None
+    ) -> None:
+        '''
+        Escribe en sink (por defecto la salida estándar) lo mismo que __str__, de a
+        bloques de renglones. max_nodes y max_depth cortan la salida y agregan un
+        renglón con la cantidad de subárboles que quedaron sin mostrar.
+        '''
+        escribir_sangrado(self, ArbolN._hijos, lambda t: str(t._dato), sink, max_nodes, max_depth)
 
     def preorder(self) -> List[T]:
-        return reduce(lambda recorrido, subarbol: recorrido + subarbol.preorder(), self.subarboles, [self.dato])
+        return list(self.iter_preorder())
 
     def preorder2(self) -> List[T]:
-        recorrido = [self.dato]
-        for subarbol in self.subarboles:
-            recorrido += subarbol.preorder2()
+        recorrido = []
+        for dato in self.iter_preorder():
+            recorrido.append(dato)
         return recorrido
     
     def preorder3(self) -> List[T]:
-        def preorder_n(bosque: List[ArbolN[T]]) -> List[T]:
-            return [] if not bosque else bosque[0].preorder3() + preorder_n(bosque[1:])
-        return [self.dato] + preorder_n(self.subarboles)
+        return [dato for dato in self]
+
+    def __iter__(self) -> Iterator[T]:
+        return self.iter_preorder()
+
+    # Recorridos perezosos: generan los datos de a uno guardando sólo la pila (o la
+    # cola en bfs) de subárboles pendientes. En un árbol n-ario no hay inorden.
+    def iter_preorder(self) -> Iterator[T]:
+        for t in preorden(self, ArbolN._hijos):
+            yield t.dato
+
+    def iter_posorder(self) -> Iterator[T]:
+        for t in posorden(self, ArbolN._hijos):
+            yield t.dato
+
+    def iter_bfs(self) -> Iterator[T]:
+        for t in por_niveles(self, ArbolN._hijos):
+            yield t.dato
     
+    def huella(self) -> int:
+        '''
+        Hash estructural (de Merkle): el hash del dato combinado con las huellas de
+        los subárboles. Queda guardada en cada nodo hasta la próxima modificación de
+        algún nodo de su familia (ver _Familia); como un subárbol no sabe de quién
+        cuelga, no se puede borrar sólo el camino modificado. Los datos tienen que
+        ser hashables.
+        '''
+        version = self._version()
+        if self._version_huella != version:
+            sin_huella = lambda t: [h for h in t._subarboles if h._version_huella != version]
+            for t in posorden(self, sin_huella):
+                t._huella = hash((t._dato, tuple([h._huella for h in t._subarboles])))
+                t._version_huella = version
+        return self._huella
+
     def __eq__(self, otro: "ArbolN[T]") -> bool:
+        if self is otro:
+            return True
         if self.dato != otro.dato:
             return False
-        if len(self.subarboles) != len(otro.subarboles):
-            return False
-        return all(a == b for a, b in zip(self.subarboles, otro.subarboles))
+        if isinstance(otro, ArbolN):
+            # con las huellas guardadas los árboles distintos se descartan en O(1)
+            try:
+                if self.huella() != otro.huella():
+                    return False
+            except TypeError:
+                pass  # datos no hashables: queda la comparación nodo a nodo
+        return iguales(self, otro, ArbolN._hijos, lambda a, b: a.dato == b.dato)
+
+    # Recorrido por niveles (recorridos.niveles): cada nivel se arma a partir del
+    # anterior, sin cola, y se puede cortar en cuanto se encuentra lo buscado.
+    def niveles(self) -> Iterator[List[T]]:
+        for nivel in niveles(self, ArbolN._hijos):
+            yield [t.dato for t in nivel]
+
+    def ancho_maximo(self) -> int:
+        return ancho_maximo(self, ArbolN._hijos)
+
+    def buscar_bfs(self, predicado: Callable[[T], bool]) -> Optional[T]:
+        '''
+        Primer dato por niveles (el más cercano a la raíz) que cumple el predicado, o None.
+        '''
+        encontrado = buscar_por_niveles(self, ArbolN._hijos, lambda t: predicado(t.dato))
+        return None if encontrado is None else encontrado[0].dato
 
     def bfs(self) -> List[T]:
-        resultado = []
-        cola = [self]
-        while cola:
-            actual = cola.pop(0)
-            resultado.append(actual.dato)
-            cola.extend(actual.subarboles)
-        return resultado
+        return [dato for nivel in self.niveles() for dato in nivel]
     
     def posorder(self) -> List[T]:
-        resultado = []
-        for subarbol in self.subarboles:
-            resultado += subarbol.posorder()
-        resultado.append(self.dato)
-        return resultado
+        return list(self.iter_posorder())
 
     def nivel(self, x: T) -> int:
-        def nivel_n(bosque: List[ArbolN[T]], x: T, nivel_actual: int) -> int:
-            for subarbol in bosque:
-                if subarbol.dato == x:
-                    return nivel_actual + 1
-                nivel_encontrado = nivel_n(subarbol.subarboles, x, nivel_actual + 1)
-                if nivel_encontrado != -1:
-                    return nivel_encontrado
-            return -1
-
-        if self.dato == x:
-            return 0
-        return nivel_n(self.subarboles, x, 0)
+        indice = self._indice_vigente()
+        if indice is not None:
+            entrada = indice.get(x)
+            return -1 if entrada is None else entrada[0]
+        for t, nivel in preorden_con_nivel(self, ArbolN._hijos):
+            if t.dato == x:
+                return nivel
+        return -1
+
+    def _hijos_con_direccion(self) -> "Iterable[Tuple[int, ArbolN[T]]]":
+        return enumerate(self._subarboles)
+
+    def indexar(self) -> None:
+        '''
+        Arma en una pasada el índice dato -> (nivel, camino desde la raíz) que usan
+        nivel, nivel_muchos y camino. Lo descarta la próxima modificación del
+        árbol, hecha con insertar_subarbol o los setters de dato y subarboles. Con datos repetidos vale el primero en preorden, como en nivel.
+        Los datos tienen que ser hashables.
+        '''
+        self._indice = (self._version(), indice_de_valores(self, ArbolN._hijos_con_direccion, lambda t: t._dato))
+
+    def _indice_vigente(self) -> "Optional[Dict[T, Entrada]]":
+        if self._indice is None or self._indice[0] != self._version():
+            return None
+        return self._indice[1]
+
+    def nivel_muchos(self, valores: Iterable[T]) -> List[int]:
+        '''
+        nivel de cada valor: O(n) para armar el índice si no está y O(1) por valor.
+        '''
+        indice = self._indice_vigente()
+        if indice is None:
+            self.indexar()
+            indice = self._indice[1]
+        return [-1 if (entrada := indice.get(valor)) is None else entrada[0] for valor in valores]
+
+    def camino(self, valor: T) -> Optional[List[int]]:
+        '''
+        Direcciones para recorrido_guiado desde la raíz hasta valor, o None si no está.
+        '''
+        indice = self._indice_vigente()
+        if indice is None:
+            self.indexar()
+            indice = self._indice[1]
+        entrada = indice.get(valor)
+        return None if entrada is None else camino_de(entrada)
 
     def copy(self) -> "ArbolN[T]":
-        nuevo_arbol = ArbolN(self.dato)
-        nuevo_arbol.subarboles = [subarbol.copy() for subarbol in self.subarboles]
-        return nuevo_arbol
+        '''
+        Copia persistente: las dos versiones comparten los subárboles. subarboles de
+        la copia le da una copia propia de cada nodo compartido la primera vez que
+        lo entrega, y los del original no copian nada; los recorridos leen los
+        nodos sin copiarlos.
+
+        En el original se sigue escribiendo a través de cualquier subárbol (obtenido
+        antes o después de copiar): antes de escribir en un nodo que las copias
+        pueden estar compartiendo se copia el camino desde la raíz hasta él, y las
+        copias se quedan con los nodos viejos (ver versiones.py).
+
+        Cuesta O(cantidad de hijos de la raíz), que son los únicos que se marcan.
+        '''
+        copia = ArbolN(self._dato)
+        copia._subarboles = list(self._subarboles)
+        copia._duenio = Version()
+        familia = self._raiz_familia()
+        version = self._duenio
+        if version is None:
+            version = version_para_copiar(self)
+        familia.copiada = True
+        compartir(copia._subarboles, version, copia, self)
+        if version.atajo is None:
+            # todo lo que está en la versión actual puede estar en la copia desde ahora
+            sigue = cerrar(version)
+            if self._antecesor is None:
+                self._duenio = sigue
+        return copia
     
     def sin_hojas(self) -> "ArbolN[T]":
-        if self.es_hoja():
-            return None
-        nuevo_arbol = ArbolN(self.dato)
-        nuevo_arbol.subarboles = [subarbol.sin_hojas() for subarbol in self.subarboles if not subarbol.es_hoja()]
-        return nuevo_arbol
+        familia = _Familia()
+
+        def podar(t: ArbolN[T], podados: List[ArbolN[T]]) -> ArbolN[T]:
+            if not t._subarboles:
+                return None
+            nuevo_arbol = ArbolN(t._dato)
+            nuevo_arbol._subarboles = [subarbol for subarbol in podados if subarbol is not None]
+            nuevo_arbol._enlazar(nuevo_arbol._subarboles)
+            nuevo_arbol._familia = familia
+            return nuevo_arbol
+
+        return plegar(self, ArbolN._hijos, podar)
+
+    def vista(self) -> "VistaN[T]":
+        '''
+        Vista de sólo lectura del árbol, sin copiarlo; de ahí salen las vistas
+        perezosas sin_hojas(), espejo() y filtrar(). Ver VistaN.
+        '''
+        return VistaN(self, ArbolN._hijos)
     
+    def fold(
+        self, f_hoja: Callable[[T], R], f_combinar: Callable[[T, List[R]], R], procesos: Optional[int] = None,
+        profundidad: Optional[int] = None, ejecutor: Optional[Executor] = None
+    ) -> R:
+        '''
+        Pliega el árbol de las hojas a la raíz: f_hoja(dato) en cada hoja y
+        f_combinar(dato, resultados_de_los_subarboles) en los demás nodos.
+
+        Sin procesos ni ejecutor corre acá, sin recursión. Con procesos (o un
+        ejecutor ya armado, para no levantar procesos en cada llamada) los
+        subárboles que cuelgan a profundidad niveles de la raíz se pliegan en un
+        ProcessPoolExecutor y acá sólo se combina lo de arriba. Sin profundidad se
+        baja hasta tener al menos 4 subárboles por proceso. Cada proceso recibe
+        su parte como dos arreglos en preorden (datos y cantidad de subárboles), no
+        como objetos ArbolN, así que f_hoja y f_combinar tienen que poder mandarse
+        a otro proceso: funciones de módulo, no lambdas.
+        '''
+        if procesos is None and ejecutor is None:
+            return plegar(self, ArbolN._hijos, lambda t, hijos: f_combinar(t._dato, hijos) if hijos else f_hoja(t._dato))
+        if ejecutor is None:
+            with ProcessPoolExecutor(procesos) as propio:
+                return self.fold(f_hoja, f_combinar, procesos, profundidad, propio)
+
+        partes = 4 * (procesos or os.cpu_count() or 1)
+        frontera, nivel = [self], 0
+        while (len(frontera) < partes) if profundidad is None else (nivel < profundidad):
+            siguiente = [h for t in frontera for h in t._subarboles]
+            if not siguiente:
+                break
+            frontera, nivel = siguiente, nivel + 1
+
+        # cada tanda junta subárboles enteros (un bosque en preorden) y las tandas se
+        # llenan de a una por la más liviana, empezando por los subárboles más grandes
+        serializados = [ArbolN._serializar(t) for t in frontera]
+        tandas: List[Tuple[List[T], array, List[int]]] = [([], array('I'), []) for _ in range(min(partes, len(frontera)))]
+        livianas = [(0, i) for i in range(len(tandas))]
+        for j in sorted(range(len(frontera)), key=lambda j: -len(serializados[j][0])):
+            carga, i = heapq.heappop(livianas)
+            datos, grados, raices = tandas[i]
+            datos.extend(serializados[j][0])
+            grados.extend(serializados[j][1])
+            raices.append(j)
+            heapq.heappush(livianas, (carga + len(serializados[j][0]), i))
+        del serializados
+
+        resultados: Dict[int, R] = {}
+        parciales = ejecutor.map(
+            plegar_serializado, [d for d, _, _ in tandas], [g for _, g, _ in tandas], repeat(f_hoja), repeat(f_combinar)
+        )
+        for (_, _, raices), de_la_tanda in zip(tandas, parciales):
+            for j, resultado in zip(raices, de_la_tanda):
+                resultados[id(frontera[j])] = resultado
+
+        # arriba de la frontera: los subárboles ya plegados cuentan como hojas
+        hijos = lambda t: [] if id(t) in resultados else t._subarboles
+        def combinar(t: ArbolN[T], de_los_hijos: List[R]) -> R:
+            if id(t) in resultados:
+                return resultados[id(t)]
+            return f_combinar(t._dato, de_los_hijos) if de_los_hijos else f_hoja(t._dato)
+        return plegar(self, hijos, combinar)
+
+    @staticmethod
+    def _serializar(arbol: "ArbolN[T]") -> Tuple[List[T], array]:
+        nodos = list(preorden(arbol, ArbolN._hijos))
+        return [t._dato for t in nodos], array('I', [len(t._subarboles) for t in nodos])
+
     def recorrido_guiado(self, direcciones: List[int]) -> T:
         actual = self
         for direccion in direcciones:
-            if direccion < 0 or direccion >= len(actual.subarboles):
+            if direccion < 0 or direccion >= len(actual._subarboles):
                 raise IndexError("Dirección fuera de rango")
-            actual = actual.subarboles[direccion]
+            actual = actual._subarboles[direccion]
         return actual.dato
 
+    def recorrido_guiado_lote(self, caminos: Iterable[List[int]]) -> List[T]:
+        '''
+        recorrido_guiado de cada camino. Los caminos se juntan en un trie y los
+        prefijos compartidos se bajan una sola vez para todo el lote.
+        '''
+        def bajar(t: ArbolN[T], direccion: int) -> ArbolN[T]:
+            if direccion < 0 or direccion >= len(t._subarboles):
+                raise IndexError("Dirección fuera de rango")
+            return t._subarboles[direccion]
+
+        caminos = list(caminos)
+        try:
+            # con direcciones de 0 a 255 los caminos van como bytes, que se ordenan y
+            # se comparan sin un objeto por paso; si no, quedan como tuplas
+            claves: List[Sequence[int]] = [bytes(camino) for camino in caminos]
+        except (ValueError, TypeError):
+            claves = [tuple(camino) for camino in caminos]
+        return [t.dato for t in resolver_caminos(self, claves, bajar)]
+
+class VistaN(Generic[T]):
+    '''
+    Vista perezosa de un ArbolN: guarda el nodo de origen y una función que da sus
+    subárboles ya transformados (nodos del origen). sin_hojas(), espejo() y
+    filtrar() componen una función nueva, así que crear una vista es O(1) y no
+    crea nada por nodo: los recorridos corren sobre los nodos del origen y los
+    hijos se calculan al pasar. Sólo subarboles crea vistas, las de un nivel.
+    materializar() arma el ArbolN equivalente. El origen no se tiene que modificar
+    mientras se usa la vista.
+    '''
+    __slots__ = ('_origen', '_hijos_de')
+
+    def __init__(self, origen: ArbolN[T], hijos_de: Callable[[ArbolN[T]], List[ArbolN[T]]]):
+        self._origen = origen
+        self._hijos_de = hijos_de
+
+    @property
+    def dato(self) -> T:
+        return self._origen._dato
+
+    @property
+    def subarboles(self) -> "List[VistaN[T]]":
+        return [VistaN(t, self._hijos_de) for t in self._hijos_de(self._origen)]
+
+    def es_hoja(self) -> bool:
+        return not self._hijos_de(self._origen)
+
+    def altura(self) -> int:
+        return 1 + max(nivel for _, nivel in preorden_con_nivel(self._origen, self._hijos_de))
+
+    def __len__(self) -> int:
+        return sum(1 for _ in preorden(self._origen, self._hijos_de))
+
+    def __iter__(self) -> Iterator[T]:
+        return self.iter_preorder()
+
+    def iter_preorder(self) -> Iterator[T]:
+        for t in preorden(self._origen, self._hijos_de):
+            yield t._dato
+
+    def iter_posorder(self) -> Iterator[T]:
+        for t in posorden(self._origen, self._hijos_de):
+            yield t._dato
+
+    def iter_bfs(self) -> Iterator[T]:
+        for t in por_niveles(self._origen, self._hijos_de):
+            yield t._dato
+
+    def preorder(self) -> List[T]:
+        return list(self.iter_preorder())
+
+    def posorder(self) -> List[T]:
+        return list(self.iter_posorder())
+
+    def bfs(self) -> List[T]:
+        return list(self.iter_bfs())
+
+    def niveles(self) -> Iterator[List[T]]:
+        for nivel in niveles(self._origen, self._hijos_de):
+            yield [t._dato for t in nivel]
+
+    def __str__(self):
+        salida = StringIO()
+        self.render(salida)
+        return salida.getvalue()
+
+    def render(
+        self, sink: Optional[TextIO] = None, max_nodes: Optional[int] = None, max_depth: Optional[int] = None
+    ) -> None:
+        escribir_sangrado(self._origen, self._hijos_de, lambda t: str(t._dato), sink, max_nodes, max_depth)
+
+    def sin_hojas(self) -> "Optional[VistaN[T]]":
+        '''
+        Como ArbolN.sin_hojas: None si la raíz es una hoja.
+        '''
+        hijos_de = self._hijos_de
+        if not hijos_de(self._origen):
+            return None
+        return VistaN(self._origen, lambda t: [h for h in hijos_de(t) if hijos_de(h)])
+
+    def espejo(self) -> "VistaN[T]":
+        hijos_de = self._hijos_de
+        return VistaN(self._origen, lambda t: hijos_de(t)[::-1])
+
+    def filtrar(self, predicado: Callable[[T], bool]) -> "Optional[VistaN[T]]":
+        '''
+        Sólo los subárboles cuya raíz cumple el predicado (si un nodo no lo cumple
+        se va con todo su subárbol). None si no lo cumple la raíz.
+        '''
+        if not predicado(self._origen._dato):
+            return None
+        hijos_de = self._hijos_de
+        return VistaN(self._origen, lambda t: [h for h in hijos_de(t) if predicado(h._dato)])
+
+    def materializar(self) -> ArbolN[T]:
+        familia = _Familia()
+
+        def armar(t: ArbolN[T], hijos: List[ArbolN[T]]) -> ArbolN[T]:
+            nuevo = ArbolN(t._dato)
+            nuevo._subarboles = hijos
+            nuevo._enlazar(hijos)
+            nuevo._familia = familia
+            return nuevo
+
+        return plegar(self._origen, self._hijos_de, armar)
+
+
+# posiciones por bloque en la tabla de mínimos de IndiceEuler: dentro de un bloque
+# se busca con min() sobre el arreglo, entre bloques con la tabla
+_BLOQUE = 64
+
+
+class IndiceEuler(Generic[T]):
+    '''
+    Índice de ancestros de un ArbolN armado en una pasada (O(n)). Numera los nodos
+    en preorden: el subárbol de un nodo ocupa las posiciones entrada ..
+    entrada + tamaño - 1 del recorrido, así que es_ancestro y tamanio_subarbol son
+    O(1). Para lca, el ancestro común más bajo de a y b (con a antes que b en
+    preorden) es el padre del nodo menos profundo entre las posiciones de a
+    (sin incluirla) y b; ese mínimo sale de una tabla de mínimos por bloques en O(1)
+    más dos búsquedas de a lo sumo _BLOQUE posiciones, con memoria O(n).
+
+    Los nodos se identifican por objeto (los datos se pueden repetir). Como
+    indexar(), el índice queda viejo con la próxima modificación de cualquier ArbolN
+    y se rearma solo en la consulta siguiente: un lote de modificaciones paga una
+    sola reconstrucción. reconstruir() lo rearma en el momento.
+    '''
+
+    def __init__(self, arbol: ArbolN[T]):
+        self._arbol = arbol
+        self.reconstruir()
+
+    def reconstruir(self) -> None:
+        nodos: List[ArbolN[T]] = []
+        padres: List[int] = []
+        profundidades: List[int] = []
+        pila = [(self._arbol, -1, 0)]
+        while pila:
+            t, padre, profundidad = pila.pop()
+            posicion = len(nodos)
+            nodos.append(t)
+            padres.append(padre)
+            profundidades.append(profundidad)
+            if t._subarboles:
+                pila.extend([(h, posicion, profundidad + 1) for h in reversed(t._subarboles)])
+        tamanios = [1] * len(nodos)
+        for i in range(len(nodos) - 1, 0, -1):
+            tamanios[padres[i]] += tamanios[i]
+        posiciones = {id(t): i for i, t in enumerate(nodos)}
+        if len(posiciones) != len(nodos):
+            raise ValueError('Un mismo subárbol aparece más de una vez en el árbol')
+
+        # profundidad y posición en un solo entero: el mínimo es el menos profundo
+        claves = array('q', [profundidad << 32 | i for i, profundidad in enumerate(profundidades)])
+        tabla = [array('q', [min(claves[k:k + _BLOQUE]) for k in range(0, len(claves), _BLOQUE)])]
+        salto = 1
+        while 2 * salto <= len(tabla[0]):
+            anterior = tabla[-1]
+            tabla.append(array('q', map(min, anterior, anterior[salto:])))
+            salto *= 2
+
+        self._nodos = nodos
+        self._padres, self._profundidades, self._tamanios = array('q', padres), array('q', profundidades), array('q', tamanios)
+        self._posiciones, self._claves, self._tabla = posiciones, claves, tabla
+        self._version = self._arbol._version()
+
+    def _posicion(self, nodo: ArbolN[T]) -> int:
+        if self._version != self._arbol._version():
+            self.reconstruir()
+        i = self._posiciones.get(id(nodo))
+        if i is None or self._nodos[i] is not nodo:
+            raise ValueError('El nodo no pertenece al árbol indexado')
+        return i
+
+    def _minimo(self, desde: int, hasta: int) -> int:
+        claves = self._claves
+        bloque_desde, bloque_hasta = desde // _BLOQUE, hasta // _BLOQUE
+        if bloque_desde == bloque_hasta:
+            return min(claves[desde:hasta + 1])
+        minimo = min(min(claves[desde:(bloque_desde + 1) * _BLOQUE]), min(claves[bloque_hasta * _BLOQUE:hasta + 1]))
+        primero, ultimo = bloque_desde + 1, bloque_hasta - 1
+        if primero <= ultimo:
+            k = (ultimo - primero + 1).bit_length() - 1
+            nivel = self._tabla[k]
+            minimo = min(minimo, nivel[primero], nivel[ultimo - (1 << k) + 1])
+        return minimo
+
+    def es_ancestro(self, a: ArbolN[T], b: ArbolN[T]) -> bool:
+        '''
+        True si b está en el subárbol de a (un nodo es ancestro de sí mismo).
+        '''
+        i, j = self._posicion(a), self._posicion(b)
+        return i <= j < i + self._tamanios[i]
+
+    def lca(self, a: ArbolN[T], b: ArbolN[T]) -> ArbolN[T]:
+        i, j = self._posicion(a), self._posicion(b)
+        if i == j:
+            return a
+        if i > j:
+            i, j = j, i
+        menos_profundo = self._minimo(i + 1, j) & 0xFFFFFFFF
+        return self._nodos[self._padres[menos_profundo]]
+
+    def distancia(self, a: ArbolN[T], b: ArbolN[T]) -> int:
+        '''
+        Cantidad de aristas entre a y b.
+        '''
+        profundidades = self._profundidades
+        comun = self._posicion(self.lca(a, b))
+        return profundidades[self._posicion(a)] + profundidades[self._posicion(b)] - 2 * profundidades[comun]
+
+    def tamanio_subarbol(self, nodo: ArbolN[T]) -> int:
+        return self._tamanios[self._posicion(nodo)]
+
+
 def main():
     t = ArbolN(1)
     n2 = ArbolN(2)
@@ -152,22 +723,36 @@ def main():
     print(f'Nodos: {len(t)}')
 
     print(f'BFS: {t.bfs()}')
+    print(f'Niveles: {list(t.niveles())}  Ancho máximo: {t.ancho_maximo()}')
+    print(f'Primer mayor que 6 por niveles: {t.buscar_bfs(lambda x: x > 6)}')
     print(f'DFS preorder : {t.preorder()}')
     print(f'DFS preorder2: {t.preorder2()}')
     print(f'DFS preorder3: {t.preorder3()}')
     print(f'DFS posorder: {t.posorder()}')
 
+    print(f'Suma con fold: {t.fold(lambda dato: dato, lambda dato, hijos: dato + sum(hijos))}')
     print(f'Nivel de 9: {t.nivel(9)}')
     print(f'Nivel de 13: {t.nivel(13)}')
+    print(f'Niveles de 9, 13 y 5 con el índice: {t.nivel_muchos([9, 13, 5])}  Camino a 9: {t.camino(9)}')
 
     t2 = t.copy()
     t3 = t2.sin_hojas()
     print(t)
     print(t2)
     print(t3)
-    print(f't == t2 {t == t2}')
+    vista = t.vista().sin_hojas()
+    print(f'Vista sin hojas: {vista.preorder()} ({len(vista)} nodos)  espejo: {t.vista().espejo().preorder()}')
+    print(f'Vista filtrada (pares y la raíz): {t.vista().filtrar(lambda x: x % 2 == 0 or x == 1).materializar().bfs()}')
+    print(f't == t2 {t == t2}  huellas: {t.huella() == t2.huella()}, sin hojas: {t.huella() == t3.huella()}')
+
+    euler = IndiceEuler(t)
+    print(
+        f'lca(9, 8): {euler.lca(n9, n8).dato}  lca(5, 9): {euler.lca(n5, n9).dato}  distancia(5, 9): {euler.distancia(n5, n9)}  '
+        f'4 ancestro de 9: {euler.es_ancestro(n4, n9)}  tamaño del subárbol de 4: {euler.tamanio_subarbol(n4)}'
+    )
 
     print(f'recorrido_guiado [2,0,0]: {t2.recorrido_guiado([2,0,0])}')
+    print(f'recorrido_guiado_lote [2,0,0] [2,0] [0,1] []: {t2.recorrido_guiado_lote([[2,0,0], [2,0], [0,1], []])}')
 
 if __name__ == '__main__':
     main()
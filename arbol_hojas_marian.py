@@ -1,33 +1,135 @@
-from typing import Generic, TypeVar
+from io import StringIO
+from itertools import count
+from typing import Any, Generic, Iterable, Iterator, List, Optional, TextIO, Tuple, TypeVar
+from recorridos import escribir_sangrado, por_niveles, posorden, preorden
 '''
 los nodos intermedios tienen un tipo de dato distinto a los nodos hojas.
 '''
 T = TypeVar('T')
 S = TypeVar('S')
 
+# next() sobre un count es atómico: dos inserciones a la vez, aunque sea desde
+# hilos distintos, nunca terminan con la misma versión
+_versiones = count(1)
+
+
+class _Familia:
+    '''
+    Como en arbolNarioMarian: conjunto de unión y búsqueda de los nodos enlazados
+    entre sí. La versión de la raíz cambia con cada inserción en cualquiera de sus
+    nodos y es la que valida el resultado guardado de es_valido().
+    '''
+    __slots__ = ('padre', 'version')
+
+    def __init__(self):
+        self.padre: Optional[_Familia] = None
+        self.version: int = next(_versiones)
+
+
 class ArbolH(Generic[T, S]):
+    __slots__ = ('_dato', '_subarboles', '_tipo_hoja', '_tipo_nodo', '_familia', '_valido')
+
     def __init__(self, dato: T | S):
         self._dato: T | S = dato
         self._subarboles: list[ArbolH[T, S]] = []
         self._tipo_hoja = type(dato)
         self._tipo_nodo = None
+        # None mientras el nodo está solo, sin subárboles ni padre; ver _Familia
+        self._familia: Optional[_Familia] = None
+        # (versión de la familia al calcularlo, resultado), ver es_valido()
+        self._valido: Optional[Tuple[int, bool]] = None
     
     @staticmethod
     def crear_nodo_y_hojas(dato_raiz: S, *datos_hojas: T) -> "ArbolH[T, S]":
         if not datos_hojas:
             raise ValueError("Se requiere al menos un dato para las hojas")
-        if (not all([isinstance(dato, type(datos_hojas[0])) for dato in datos_hojas])):
+        tipo_hoja = type(datos_hojas[0])
+        if not all(isinstance(dato, tipo_hoja) for dato in datos_hojas):
             raise ValueError("Todos los datos de las hojas deben ser del mismo tipo")
         
         nuevo = ArbolH(dato_raiz)
+        nuevo._familia = _Familia()
         for dato in datos_hojas:
             subarbol = ArbolH(dato)
             subarbol._tipo_nodo = type(dato_raiz)
+            subarbol._familia = nuevo._familia
             nuevo._subarboles.append(subarbol)
         nuevo._tipo_nodo = type(dato_raiz)
-        nuevo._tipo_hoja = type(datos_hojas[0])
+        nuevo._tipo_hoja = tipo_hoja
         return nuevo
 
+    @classmethod
+    def desde_preorden(cls, nodos: Iterable[Tuple[T | S, int]]) -> "ArbolH[T, S]":
+        '''
+        Arma el árbol de una sola vez a partir de (dato, cantidad de subárboles) de
+        cada nodo en preorden, 0 en las hojas; los pares se pueden ir leyendo de un
+        archivo. En lugar de controlar los tipos en cada inserción, completa
+        _tipo_hoja y _tipo_nodo al final (los del primer dato de hoja y de la raíz)
+        y controla una sola vez el conjunto de tipos de las hojas y el de los nodos,
+        lo mismo que es_valido(), cuyo resultado queda guardado.
+        '''
+        raiz: Optional[ArbolH[T, S]] = None
+        familia = _Familia()
+        # nodos a los que todavía les faltan subárboles, y cuántos
+        pendientes: List[ArbolH[T, S]] = []
+        faltan: List[int] = []
+        hojas: List[ArbolH[T, S]] = []
+        internos: List[ArbolH[T, S]] = []
+        for dato, cantidad in nodos:
+            nuevo = cls(dato)
+            nuevo._familia = familia
+            if pendientes:
+                pendientes[-1]._subarboles.append(nuevo)
+                faltan[-1] -= 1
+                if not faltan[-1]:
+                    pendientes.pop()
+                    faltan.pop()
+            elif raiz is None:
+                raiz = nuevo
+            else:
+                raise ValueError("Sobran nodos después de completar el árbol")
+            if cantidad > 0:
+                internos.append(nuevo)
+                pendientes.append(nuevo)
+                faltan.append(cantidad)
+            else:
+                hojas.append(nuevo)
+        if raiz is None or pendientes:
+            raise ValueError("La descripción del árbol está incompleta")
+
+        tipo_hoja = type(hojas[0]._dato)
+        tipo_nodo = type(raiz._dato) if internos else None
+        for t in hojas:
+            t._tipo_hoja, t._tipo_nodo = tipo_hoja, tipo_nodo
+        for t in internos:
+            t._tipo_hoja, t._tipo_nodo = tipo_hoja, tipo_nodo
+        hoja_valida, nodo_valido = raiz._tipos()
+        if not (
+            all(issubclass(tipo, hoja_valida) for tipo in {type(t._dato) for t in hojas})
+            and all(issubclass(tipo, nodo_valido) for tipo in {type(t._dato) for t in internos})
+        ):
+            raise ValueError("Todos los datos de las hojas y todos los de los nodos deben ser de un mismo tipo")
+        raiz._valido = (familia.version, True)
+        return raiz
+
+    @classmethod
+    def desde_anidado(cls, descripcion: Any) -> "ArbolH[T, S]":
+        '''
+        desde_preorden con el árbol escrito como (dato_nodo, [subárboles]) en cada
+        nodo y el dato solo en cada hoja, por ejemplo ('a', [1, 2, ('b', [6, 7])]).
+        '''
+        def en_preorden() -> Iterator[Tuple[T | S, int]]:
+            pila = [descripcion]
+            while pila:
+                actual = pila.pop()
+                if isinstance(actual, tuple) and len(actual) == 2 and isinstance(actual[1], list):
+                    yield actual[0], len(actual[1])
+                    pila.extend(reversed(actual[1]))
+                else:
+                    yield actual, 0
+
+        return cls.desde_preorden(en_preorden())
+
     def dato_hoja(self) -> T:
         if self.es_hoja():
             return self._dato
@@ -39,12 +141,40 @@ class ArbolH(Generic[T, S]):
         raise ValueError("El nodo actual es una hoja")
     
     @property
-    def subarboles(self) -> "list[ArbolH[T,S]]":
-        return self._subarboles
+    def subarboles(self) -> "Tuple[ArbolH[T,S], ...]":
+        # tupla y no la lista, como en ArbolN: los cambios pasan por insertar_subarbol,
+        # que es la que descarta el resultado guardado de es_valido()
+        return tuple(self._subarboles)
 
     def _insertar_subarbol_nocheck(self, subarbol: "ArbolH[T,S]") -> None:
         subarbol._tipo_nodo = self._tipo_nodo
-        self.subarboles.append(subarbol)
+        self._subarboles.append(subarbol)
+        self._modificado(subarbol)
+
+    def _raiz_familia(self) -> _Familia:
+        familia = self._familia
+        if familia is None:
+            familia = self._familia = _Familia()
+            return familia
+        raiz = familia
+        while raiz.padre is not None:
+            raiz = raiz.padre
+        # compresión de caminos
+        while familia is not raiz:
+            familia.padre, familia = raiz, familia.padre
+        self._familia = raiz
+        return raiz
+
+    def _modificado(self, enlazado: "ArbolH[T, S]") -> None:
+        # une la familia con la del subárbol recién enlazado y le da una versión nueva
+        familia = self._raiz_familia()
+        if enlazado._familia is None:
+            enlazado._familia = familia
+        else:
+            otra = enlazado._raiz_familia()
+            if otra is not familia:
+                otra.padre = familia
+        familia.version = next(_versiones)
 
     def insertar_subarbol(self, subarbol: "ArbolH[T,S]")-> None:
         if self.es_hoja():
@@ -55,22 +185,43 @@ class ArbolH(Generic[T, S]):
         self._insertar_subarbol_nocheck(subarbol)
 
     def es_hoja(self) -> bool:
-        return self.subarboles == []
+        return not self._subarboles
+
+    def _hijos(self) -> "list[ArbolH[T, S]]":
+        return self._subarboles
+
+    # Recorridos perezosos: generan los datos (de nodos y de hojas) de a uno.
+    def __iter__(self) -> Iterator[T | S]:
+        return self.iter_preorder()
+
+    def iter_preorder(self) -> Iterator[T | S]:
+        for t in preorden(self, ArbolH._hijos):
+            yield t._dato
+
+    def iter_posorder(self) -> Iterator[T | S]:
+        for t in posorden(self, ArbolH._hijos):
+            yield t._dato
+
+    def iter_bfs(self) -> Iterator[T | S]:
+        for t in por_niveles(self, ArbolH._hijos):
+            yield t._dato
     
     def __str__(self) -> str:
-        def mostrar(t: ArbolH[T,S], nivel: int):
-            tab = '.' * 4
-            indent = tab * nivel
-            if t.es_hoja():
-                dato = f'[{t.dato_hoja()}]'
-            else:
-                dato = str(t.dato_nodo())
-            out = f'{indent} {dato} \n'
-            for subarbol in t.subarboles:
-                out += mostrar(subarbol, nivel + 1)
-            return out
-            
-        return mostrar(self, 0)
+        salida = StringIO()
+        self.render(salida)
+        return salida.getvalue()
+
+    def render(
+        self, sink: Optional[TextIO] = None, max_nodes: Optional[int] = None, max_depth: Optional[int] = None
+    ) -> None:
+        '''
+        Escribe en sink (por defecto la salida estándar) lo mismo que __str__ (las
+        hojas entre corchetes), de a bloques de renglones y sin recursión. max_nodes
+        y max_depth cortan la salida y agregan un renglón con lo que quedó sin mostrar.
+        '''
+        escribir_sangrado(
+            self, ArbolH._hijos, lambda t: f' {t._dato} ' if t._subarboles else f' [{t._dato}] ', sink, max_nodes, max_depth
+        )
 
     def _son_mismos_tipos(self, otro: "ArbolH[T,S]") -> bool:
         return (
@@ -79,9 +230,31 @@ class ArbolH(Generic[T, S]):
             ) and self._tipo_hoja == otro._tipo_hoja
         )
     
+    def _tipos(self) -> Tuple[Any, Any]:
+        '''
+        (tipo de las hojas, tipo de los nodos) contra los que es_valido controla los
+        datos con isinstance; una subclase puede dar tipos más amplios.
+        '''
+        return self._tipo_hoja, self._tipo_nodo
+
     def es_valido(self) -> bool:
-        pass
-        
+        '''
+        True si los datos de todas las hojas son del tipo de hoja del árbol y los de
+        todos los demás nodos del tipo de nodo. Es una sola pasada sin recursión y
+        el resultado queda guardado hasta la próxima inserción en algún nodo de su
+        familia (ver _Familia).
+        '''
+        version = self._raiz_familia().version
+        if self._valido is not None and self._valido[0] == version:
+            return self._valido[1]
+        tipo_hoja, tipo_nodo = self._tipos()
+        valido = all(
+            isinstance(t._dato, tipo_hoja) if not t._subarboles else tipo_nodo is not None and isinstance(t._dato, tipo_nodo)
+            for t in preorden(self, ArbolH._hijos)
+        )
+        self._valido = (version, valido)
+        return valido
+
 
 def main():
     nodo_b = ArbolH.crear_nodo_y_hojas('b', 6, 7)
@@ -92,8 +265,17 @@ def main():
     nodo_c.insertar_subarbol(ArbolH(10))
     print(arbol)
 
+    print(f'Válido: {arbol.es_valido()}')
+
     nodo_int = ArbolH.crear_nodo_y_hojas(1, 2, 3)
     # arbol.insertar_subarbol(nodo_int)  # Debería lanzar una excepción
 
+    armado = ArbolH.desde_anidado(('a', [1, 2, 3, 4, 5, ('b', [6, 7, ('c', [8, 9, 10])])]))
+    print(f'Armado de una vez: {list(armado)}  válido: {armado.es_valido()}')
+    try:
+        ArbolH.desde_anidado(('a', [1, ('b', ['x'])]))
+    except ValueError as e:
+        print(f'Con una hoja de otro tipo: {e}')
+
 if __name__ == '__main__':
     main()
\ No newline at end of file
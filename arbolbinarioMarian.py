@@ -1,23 +1,63 @@
 from collections.abc import Callable
-from typing import Any, Generic, Optional, TypeVar, List
+from typing import Any, Dict, Generic, Iterable, Iterator, Optional, TextIO, Tuple, TypeVar, List
 from functools import wraps
-from copy import deepcopy
-from queue import Queue
+from copy import copy as copia_superficial
+from io import StringIO
+from arbolbinariocompacto import ArbolBinarioCompacto
+from recorridos import (
+    Entrada, ancho_maximo, buscar_por_niveles, camino_de, escribir_sangrado, indice_de_valores, inorden, niveles,
+    plegar, por_niveles, posorden, preorden, preorden_con_nivel
+)
+from versiones import CONGELADA, Version, a_desprender, antecesor, cerrar, compartir, desanotar, es_ajeno, ultima, version_para_copiar
 
 T = TypeVar('T')
 
 class NodoAB(Generic[T]):
+    __slots__ = ('dato', 'si', 'sd')
+
     def __init__(self, dato: T, si: "Optional[ArbolBinario[T]]" = None, sd: "Optional[ArbolBinario[T]]" = None):
         self.dato = dato
-        self.si: ArbolBinario[T] = ArbolBinario() if si is None else si
-        self.sd: ArbolBinario[T] = ArbolBinario() if sd is None else sd
+        self.si: ArbolBinario[T] = ArbolBinario.vacio() if si is None else si
+        self.sd: ArbolBinario[T] = ArbolBinario.vacio() if sd is None else sd
 
     def __str__(self):
         return str(self.dato)
     
+# un único árbol vacío por clase para todos los hijos que faltan, ver ArbolBinario.vacio()
+_VACIOS: "Dict[type, ArbolBinario]" = {}
+
 class ArbolBinario(Generic[T]):
+    __slots__ = ('raiz', '_antecesor', '_duenio', '_ajenos', '_indice', '__weakref__')
+
     def __init__(self):
         self.raiz: Optional[NodoAB[T]] = None
+        # subárbol del que cuelga en su árbol (el vacío compartido no tiene): con él se
+        # sube hasta la raíz para saber qué copiar antes de escribir. Ver antecesor
+        self._antecesor: Any = None
+        # versión a la que pertenece el subárbol (ver versiones.py); None si es la de su antecesor
+        self._duenio: Optional[Version] = None
+        # referencias débiles a los subárboles de las copias que apuntan a este, ver versiones.compartir
+        self._ajenos: Optional[list] = None
+        # dato -> entrada, ver indexar(); None si no hay o quedó viejo
+        self._indice: Optional[Dict[T, Entrada]] = None
+
+    @property
+    def antecesor(self) -> "Optional[ArbolBinario[T]]":
+        return antecesor(self)
+
+    @classmethod
+    def vacio(cls) -> "ArbolBinario[T]":
+        '''
+        Árbol vacío compartido de la clase. No se modifica: para colgar un subárbol
+        donde está se reemplaza la referencia en el nodo padre (insertar_si/sd).
+        '''
+        vacio = _VACIOS.get(cls)
+        if vacio is None:
+            vacio = _VACIOS[cls] = cls()
+        return vacio
+
+    def _es_compartido(self) -> bool:
+        return _VACIOS.get(type(self)) is self
         
     class _Decoradores:
         @classmethod
@@ -33,6 +73,7 @@ class ArbolBinario(Generic[T]):
     def crear_nodo(dato: T, si: "Optional[ArbolBinario[T]]" = None, sd: "Optional[ArbolBinario[T]]" = None) -> "ArbolBinario[T]":
         t = ArbolBinario()
         t.raiz = NodoAB(dato, si, sd)
+        t._enlazar()
         return t
 
     def es_vacio(self) -> bool:
@@ -41,15 +82,91 @@ class ArbolBinario(Generic[T]):
     @_Decoradores.valida_es_vacio
     def si(self) -> "ArbolBinario[T]":
         assert self.raiz is not None
-        return self.raiz.si
+        si = self.raiz.si
+        if si._duenio is not self._duenio and es_ajeno(si._duenio, self._duenio):
+            si = self.raiz.si = self._copia_propia(si)
+        return si
     
     @_Decoradores.valida_es_vacio
     def sd(self) -> "ArbolBinario[T]":
         assert self.raiz is not None
-        return self.raiz.sd
+        sd = self.raiz.sd
+        if sd._duenio is not self._duenio and es_ajeno(sd._duenio, self._duenio):
+            sd = self.raiz.sd = self._copia_propia(sd)
+        return sd
+
+    def _copia_propia(self, hijo: "ArbolBinario[T]") -> "ArbolBinario[T]":
+        '''
+        Copia por camino (ver copy()): el hijo es de otra versión, así que se lo
+        reemplaza por un subárbol de esta versión con una copia de su nodo. Los
+        nietos siguen compartidos hasta que se los toque.
+        '''
+        nuevo = type(hijo)()
+        nuevo.raiz = copia_superficial(hijo.raiz)
+        nuevo._duenio = self._duenio
+        nuevo._antecesor = self
+        if nuevo.raiz is not None:
+            compartir(nuevo._hijos_propios(), hijo._duenio, nuevo, hijo)
+        return nuevo
+
+    def _hijos_propios(self) -> "List[ArbolBinario[T]]":
+        # los hijos menos el vacío compartido, que no tiene versión
+        return [h for h in (self.raiz.si, self.raiz.sd) if not h._es_compartido()]
+
+    def _enlazar(self) -> None:
+        # los hijos de otra versión (ver copy()) tienen su antecesor allá, y anotan a
+        # este subárbol, que ahora también apunta a ellos (las rotaciones los mueven)
+        if self.raiz is None:
+            return
+        for hijo in (self.raiz.si, self.raiz.sd):
+            if hijo._es_compartido():
+                continue
+            if es_ajeno(hijo._duenio, self._duenio):
+                compartir((hijo,), None, self)
+            else:
+                hijo._antecesor = self
+
+    def _antes_de_escribir(self) -> None:
+        duenio = self._duenio
+        # una raíz sin versión nunca se copió (copy() la marca)
+        if (duenio is None and self._antecesor is None) or (duenio is not None and duenio.atajo is None):
+            return
+        for t, version in a_desprender(self):
+            t._desprender(version)
+
+    def _desprender(self, version: Version) -> None:
+        '''
+        El subárbol, de una versión cerrada, se queda con una copia de su nodo en la
+        versión actual; el nodo viejo pasa a un subárbol congelado, que es el que
+        ven desde ahora las copias que apuntaban a este (ver versiones.py).
+        '''
+        viejo = type(self)()
+        viejo.raiz = self.raiz
+        viejo._duenio = CONGELADA
+        if self.raiz is not None:
+            self.raiz = copia_superficial(self.raiz)
+            compartir(viejo._hijos_propios(), version, viejo, self)
+        for copia in desanotar(self):
+            copia._cambiar_hijo(self, viejo)
+        self._duenio = ultima(version)
+
+    def _modificado(self) -> None:
+        # el índice de nivel() queda viejo en este subárbol y en los que lo contienen,
+        # que son sus antecesores: los de otros árboles, y los de las copias, no cambian
+        t = self
+        while t is not None:
+            t._indice = None
+            t = antecesor(t)
+
+    def _cambiar_hijo(self, anterior: "ArbolBinario[T]", nuevo: "ArbolBinario[T]") -> None:
+        if self.raiz is not None:
+            if self.raiz.si is anterior:
+                self.raiz.si = nuevo
+            if self.raiz.sd is anterior:
+                self.raiz.sd = nuevo
     
     def es_hoja(self) -> bool:
-        return not self.es_vacio() and self.si().es_vacio() and self.sd().es_vacio()
+        return not self.es_vacio() and self.raiz.si.es_vacio() and self.raiz.sd.es_vacio()
 
     @_Decoradores.valida_es_vacio
     def dato(self) -> T:
@@ -59,59 +176,122 @@ class ArbolBinario(Generic[T]):
     @_Decoradores.valida_es_vacio
     def insertar_si(self, si: "ArbolBinario[T]"):
         assert self.raiz is not None
+        self._antes_de_escribir()
         self.raiz.si = si
+        self._enlazar()
+        self._modificado()
 
     @_Decoradores.valida_es_vacio
     def insertar_sd(self, sd: "ArbolBinario[T]"):
         assert self.raiz is not None
+        self._antes_de_escribir()
         self.raiz.sd = sd
+        self._enlazar()
+        self._modificado()
 
     def set_raiz(self, nodo: NodoAB[T]):
+        if self._es_compartido():
+            raise TypeError('El árbol vacío compartido no se puede modificar')
+        self._antes_de_escribir()
         self.raiz = nodo
+        self._enlazar()
+        self._modificado()
         
+    # Hijos de un subárbol para el motor de recorridos.py: los recorridos usan una
+    # pila explícita en lugar de recursión, así que sirven en árboles degenerados.
+    def _hijos(self) -> "List[ArbolBinario[T]]":
+        return [] if self.raiz is None else [self.raiz.si, self.raiz.sd]
+
+    def _no_vacios(self) -> "List[ArbolBinario[T]]":
+        # lo llaman todos los recorridos por cada nodo: sin comprensión ni llamadas
+        if self.raiz is None:
+            return []
+        si, sd = self.raiz.si, self.raiz.sd
+        if si.raiz is None:
+            return [] if sd.raiz is None else [sd]
+        return [si] if sd.raiz is None else [si, sd]
+
     def altura(self) -> int:
         if self.es_vacio():
             return 0
-        else:
-            return 1 + max(self.si().altura(), self.sd().altura())
+        return 1 + max(nivel for _, nivel in preorden_con_nivel(self, ArbolBinario._no_vacios))
         
     def __len__(self) -> int:
         if self.es_vacio():
             return 0
-        else:
-            return 1 + len(self.si()) + len(self.sd())
+        return sum(1 for _ in preorden(self, ArbolBinario._no_vacios))
     
     def __str__(self):
-        def mostrar(t: ArbolBinario[T], nivel: int):
-            tab = '.' * 4
-            indent = tab * nivel
-            if t.es_vacio():
-                return indent + 'AV\n'
-            else:
-                out = indent + str(t.dato()) + '\n'
-                out += mostrar(t.si(), nivel + 1)
-                out += mostrar(t.sd(), nivel + 1)
-                return out
-            
-        return mostrar(self, 0)
+        salida = StringIO()
+        self.render(salida)
+        return salida.getvalue()
+
+    def render(
+        self, sink: Optional[TextIO] = None, max_nodes: Optional[int] = None, max_depth: Optional[int] = None
+    ) -> None:
+        '''
+        Escribe en sink (por defecto la salida estándar) lo mismo que __str__, sin
+        armar el texto entero: los renglones se mandan de a bloques. max_nodes y
+        max_depth cortan la salida y agregan un renglón con la cantidad de
+        subárboles que quedaron sin mostrar.
+        '''
+        escribir_sangrado(
+            self, ArbolBinario._hijos, lambda t: 'AV' if t.raiz is None else str(t.raiz.dato),
+            sink, max_nodes, max_depth, ArbolBinario.es_vacio
+        )
+
+    def guardar(self, ruta: str, tipo: Optional[str] = None) -> None:
+        '''
+        Guarda el árbol en el formato binario de ArbolBinarioCompacto. Con un código
+        de tipo de array ('q', 'd', ...) los datos se escriben empaquetados en lugar
+        de en pickle.
+        '''
+        ArbolBinarioCompacto.desde_arbol(self, tipo).guardar(ruta)
+
+    @classmethod
+    def cargar(cls, ruta: str, permitir_pickle: bool = False) -> 'ArbolBinario[T]':
+        '''
+        Lee un árbol escrito con guardar() y lo arma con la forma original, sin
+        comparaciones ni rebalanceos: cls.cargar devuelve un árbol de la clase cls.
+        Para sólo consultarlo alcanza con ArbolBinarioCompacto.cargar, que no crea nodos.
+        Si se guardó sin tipo, los datos están en pickle y hace falta
+        permitir_pickle=True, sólo para archivos de confianza (ver ArbolBinarioCompacto.cargar).
+        '''
+        arbol = ArbolBinarioCompacto.cargar(ruta, permitir_pickle).a_arbol(cls.crear_nodo)
+        return cls() if arbol is None else arbol
 
     def inorder(self) -> List[T]:
-        if self.es_vacio():
-            return []
-        else:
-            return self.si().inorder() + [self.dato()] + self.sd().inorder()
+        return list(self.iter_inorder())
     
     def preorder(self) -> List[T]:
-        if self.es_vacio():
-            return []
-        else:
-            return [self.dato()] + self.si().preorder() + self.sd().preorder()
+        return list(self.iter_preorder())
 
     def posorder(self) -> List[T]:
-        if self.es_vacio():
-            return []
-        else:
-            return self.si().posorder() + self.sd().posorder() + [self.dato()]
+        return list(self.iter_posorder())
+
+    def __iter__(self) -> Iterator[T]:
+        return self.iter_inorder()
+
+    # Versiones perezosas de los recorridos: generan un dato por vez y sólo guardan
+    # la pila (o la cola, en bfs) del recorrido, sin armar ninguna lista.
+    def iter_inorder(self) -> Iterator[T]:
+        for t in inorden(self, lambda t: t.raiz.si, lambda t: t.raiz.sd, ArbolBinario.es_vacio):
+            yield t.raiz.dato
+
+    def iter_preorder(self) -> Iterator[T]:
+        if not self.es_vacio():
+            for t in preorden(self, ArbolBinario._no_vacios):
+                yield t.raiz.dato
+
+    def iter_posorder(self) -> Iterator[T]:
+        if not self.es_vacio():
+            for t in posorden(self, ArbolBinario._no_vacios):
+                yield t.raiz.dato
+
+    def iter_bfs(self) -> Iterator[T]:
+        if not self.es_vacio():
+            for t in por_niveles(self, ArbolBinario._no_vacios):
+                yield t.raiz.dato
     
     def inorder_tail(self) -> List[T]:
         resultado: List[T] = []
@@ -120,58 +300,296 @@ class ArbolBinario(Generic[T]):
         while not actual.es_vacio() or pila:
             while not actual.es_vacio():
                 pila.append(actual)
-                actual = actual.si()
+                actual = actual.raiz.si
             actual = pila.pop()
             resultado.append(actual.dato())
-            actual = actual.sd()
+            actual = actual.raiz.sd
         return resultado
 
-    def bfs(self) -> List[T]:
-        resultado: List[T] = []
+    # Recorrido por niveles (recorridos.niveles): cada nivel se arma a partir del
+    # anterior, sin cola, y se puede cortar en cuanto se encuentra lo buscado.
+    def niveles(self) -> Iterator[List[T]]:
+        if not self.es_vacio():
+            for nivel in niveles(self, ArbolBinario._no_vacios):
+                yield [t.raiz.dato for t in nivel]
+
+    def ancho_maximo(self) -> int:
+        return 0 if self.es_vacio() else ancho_maximo(self, ArbolBinario._no_vacios)
+
+    def buscar_bfs(self, predicado: Callable[[T], bool]) -> Optional[T]:
+        '''
+        Primer dato por niveles (el más cercano a la raíz) que cumple el predicado, o None.
+        '''
         if self.es_vacio():
-            return resultado
-        cola = Queue()
-        cola.put(self)
-        while not cola.empty():
-            actual: ArbolBinario[T] = cola.get()
-            resultado.append(actual.dato())
-            if not actual.si().es_vacio():
-                cola.put(actual.si())
-            if not actual.sd().es_vacio():
-                cola.put(actual.sd())
-        return resultado
+            return None
+        encontrado = buscar_por_niveles(self, ArbolBinario._no_vacios, lambda t: predicado(t.raiz.dato))
+        return None if encontrado is None else encontrado[0].raiz.dato
+
+    def bfs(self) -> List[T]:
+        return [dato for nivel in self.niveles() for dato in nivel]
 
     def nivel(self, x: T) -> int:
         if self.es_vacio():
             return -1
-        cola = Queue()
-        cola.put((self, 0))
-        while not cola.empty():
-            actual, nivel = cola.get()
-            if actual.dato() == x:
-                return nivel
-            if not actual.si().es_vacio():
-                cola.put((actual.si(), nivel + 1))
-            if not actual.sd().es_vacio():
-                cola.put((actual.sd(), nivel + 1))
-        return -1
+        indice = self._indice_vigente()
+        if indice is not None:
+            entrada = indice.get(x)
+            return -1 if entrada is None else entrada[0]
+        encontrado = buscar_por_niveles(self, ArbolBinario._no_vacios, lambda t: t.raiz.dato == x)
+        return -1 if encontrado is None else encontrado[1]
+
+    def _hijos_con_direccion(self) -> "List[Tuple[str, ArbolBinario[T]]]":
+        si, sd = self.raiz.si, self.raiz.sd
+        return [(d, h) for d, h in (('izquierda', si), ('derecha', sd)) if h.raiz is not None]
+
+    def indexar(self) -> None:
+        '''
+        Arma en una pasada el índice dato -> (nivel, camino desde la raíz) que usan
+        nivel, nivel_muchos y camino. Queda descartado con la próxima modificación
+        (insertar_si, insertar_sd, set_raiz, altas y bajas de los ordenados) del
+        árbol o de cualquiera de sus subárboles. Con datos
+        repetidos vale el más cercano a la raíz, como en nivel. Los datos tienen que
+        ser hashables.
+        '''
+        if not self.es_vacio():
+            indice = indice_de_valores(self, ArbolBinario._hijos_con_direccion, lambda t: t.raiz.dato, por_niveles=True)
+            self._indice = indice
+
+    def _indice_vigente(self) -> "Optional[Dict[T, Entrada]]":
+        return self._indice
+
+    def nivel_muchos(self, valores: Iterable[T]) -> List[int]:
+        '''
+        nivel de cada valor: O(n) para armar el índice si no está y O(1) por valor.
+        '''
+        if self.es_vacio():
+            return [-1 for _ in valores]
+        indice = self._indice_vigente()
+        if indice is None:
+            self.indexar()
+            indice = self._indice
+        return [-1 if (entrada := indice.get(valor)) is None else entrada[0] for valor in valores]
+
+    def camino(self, valor: T) -> Optional[List[str]]:
+        '''
+        Lados ('izquierda'/'derecha') desde la raíz hasta valor, o None si no está.
+        '''
+        if self.es_vacio():
+            return None
+        indice = self._indice_vigente()
+        if indice is None:
+            self.indexar()
+            indice = self._indice
+        entrada = indice.get(valor)
+        return None if entrada is None else camino_de(entrada)
 
     def copy(self) -> "ArbolBinario[T]":
-        return deepcopy(self)
+        '''
+        Copia persistente: la copia y el original comparten los nodos. Los accesos
+        si() y sd() de la copia le dan una copia propia del nodo compartido la
+        primera vez que lo tocan, y los cambios desde la raíz de los árboles
+        ordenados (insertar, eliminar) copian sólo el camino que modifican. Los
+        recorridos leen los nodos sin copiarlos.
+
+        En el original se sigue escribiendo a través de cualquier subárbol (obtenido
+        antes o después de copiar): antes de escribir en un nodo que las copias
+        pueden estar compartiendo se copia el camino desde la raíz hasta él, y las
+        copias se quedan con los nodos viejos (ver versiones.py). Los datos no se
+        copian.
+
+        Cuesta O(1): sólo se marcan los hijos de la raíz.
+        '''
+        copia = type(self)()
+        if not self.es_vacio():
+            copia.raiz = copia_superficial(self.raiz)
+            copia._duenio = Version()
+            version = version_para_copiar(self)
+            compartir(copia._hijos_propios(), version, copia, self)
+            if version.atajo is None:
+                # todo lo que está en la versión actual puede estar en la copia desde ahora
+                sigue = cerrar(version)
+                if self._antecesor is None:
+                    self._duenio = sigue
+        return copia
 
     def espejo(self) -> "ArbolBinario[T]":
         if self.es_vacio():
             return ArbolBinario()
-        si_espejo = self.sd().espejo()
-        sd_espejo = self.si().espejo()
-        return ArbolBinario.crear_nodo(self.dato(), si_espejo, sd_espejo)
+        return plegar(
+            self, ArbolBinario._hijos,
+            lambda t, espejos: ArbolBinario.vacio() if t.es_vacio() else ArbolBinario.crear_nodo(t.dato(), espejos[1], espejos[0])
+        )
         
     def sin_hojas(self):
-        if self.es_vacio() or self.es_hoja():
+        podado = plegar(
+            self, ArbolBinario._hijos,
+            lambda t, podados: ArbolBinario.vacio() if t.es_vacio() or t.es_hoja() else ArbolBinario.crear_nodo(t.dato(), *podados)
+        )
+        return ArbolBinario() if podado.es_vacio() else podado
+
+    def _par(self) -> "Tuple[ArbolBinario[T], ArbolBinario[T]]":
+        return self.raiz.si, self.raiz.sd
+
+    def vista(self) -> "VistaBinaria[T]":
+        '''
+        Vista de sólo lectura del árbol, sin copiarlo; de ahí salen las vistas
+        perezosas sin_hojas(), espejo() y filtrar(). Ver VistaBinaria.
+        '''
+        return VistaBinaria(self, ArbolBinario._par)
+
+
+class VistaBinaria(Generic[T]):
+    '''
+    Vista perezosa de un ArbolBinario: guarda el subárbol de origen y una función
+    que da sus dos hijos ya transformados (subárboles del origen, el vacío donde
+    no hay). sin_hojas(), espejo() y filtrar() componen una función nueva, así que
+    crear una vista es O(1) y no crea nada por nodo: los recorridos corren sobre
+    los subárboles del origen. Sólo si() y sd() crean una vista, la del hijo.
+    materializar() arma el ArbolBinario equivalente. El origen no se tiene que
+    modificar mientras se usa la vista.
+    '''
+    __slots__ = ('_origen', '_par')
+
+    def __init__(self, origen: ArbolBinario[T], par: "Callable[[ArbolBinario[T]], Tuple[ArbolBinario[T], ArbolBinario[T]]]"):
+        self._origen = origen
+        self._par = par
+
+    def es_vacio(self) -> bool:
+        return self._origen.raiz is None
+
+    def _valida_no_vacio(self) -> None:
+        if self._origen.raiz is None:
+            raise TypeError('Arbol Vacio')
+
+    def si(self) -> "VistaBinaria[T]":
+        self._valida_no_vacio()
+        return VistaBinaria(self._par(self._origen)[0], self._par)
+
+    def sd(self) -> "VistaBinaria[T]":
+        self._valida_no_vacio()
+        return VistaBinaria(self._par(self._origen)[1], self._par)
+
+    def dato(self) -> T:
+        self._valida_no_vacio()
+        return self._origen.raiz.dato
+
+    def es_hoja(self) -> bool:
+        if self._origen.raiz is None:
+            return False
+        si, sd = self._par(self._origen)
+        return si.raiz is None and sd.raiz is None
+
+    def _no_vacios(self) -> "Callable[[ArbolBinario[T]], List[ArbolBinario[T]]]":
+        par = self._par
+        return lambda t: [h for h in par(t) if h.raiz is not None]
+
+    def altura(self) -> int:
+        if self.es_vacio():
+            return 0
+        return 1 + max(nivel for _, nivel in preorden_con_nivel(self._origen, self._no_vacios()))
+
+    def __len__(self) -> int:
+        if self.es_vacio():
+            return 0
+        return sum(1 for _ in preorden(self._origen, self._no_vacios()))
+
+    def __iter__(self) -> Iterator[T]:
+        return self.iter_inorder()
+
+    def iter_inorder(self) -> Iterator[T]:
+        par = self._par
+        for t in inorden(self._origen, lambda t: par(t)[0], lambda t: par(t)[1], ArbolBinario.es_vacio):
+            yield t.raiz.dato
+
+    def iter_preorder(self) -> Iterator[T]:
+        if not self.es_vacio():
+            for t in preorden(self._origen, self._no_vacios()):
+                yield t.raiz.dato
+
+    def iter_posorder(self) -> Iterator[T]:
+        if not self.es_vacio():
+            for t in posorden(self._origen, self._no_vacios()):
+                yield t.raiz.dato
+
+    def iter_bfs(self) -> Iterator[T]:
+        if not self.es_vacio():
+            for t in por_niveles(self._origen, self._no_vacios()):
+                yield t.raiz.dato
+
+    def inorder(self) -> List[T]:
+        return list(self.iter_inorder())
+
+    def preorder(self) -> List[T]:
+        return list(self.iter_preorder())
+
+    def posorder(self) -> List[T]:
+        return list(self.iter_posorder())
+
+    def bfs(self) -> List[T]:
+        return list(self.iter_bfs())
+
+    def __str__(self):
+        salida = StringIO()
+        self.render(salida)
+        return salida.getvalue()
+
+    def render(
+        self, sink: Optional[TextIO] = None, max_nodes: Optional[int] = None, max_depth: Optional[int] = None
+    ) -> None:
+        par = self._par
+        escribir_sangrado(
+            self._origen, lambda t: [] if t.raiz is None else list(par(t)),
+            lambda t: 'AV' if t.raiz is None else str(t.raiz.dato), sink, max_nodes, max_depth, ArbolBinario.es_vacio
+        )
+
+    def sin_hojas(self) -> "VistaBinaria[T]":
+        '''
+        Como ArbolBinario.sin_hojas: si la raíz es una hoja queda la vista vacía.
+        '''
+        par, vacio = self._par, ArbolBinario.vacio()
+
+        def es_hoja(t: ArbolBinario[T]) -> bool:
+            si, sd = par(t)
+            return si.raiz is None and sd.raiz is None
+
+        def podar(t: ArbolBinario[T]) -> "Tuple[ArbolBinario[T], ArbolBinario[T]]":
+            si, sd = par(t)
+            return (
+                vacio if si.raiz is None or es_hoja(si) else si,
+                vacio if sd.raiz is None or es_hoja(sd) else sd
+            )
+
+        return VistaBinaria(vacio if self.es_vacio() or es_hoja(self._origen) else self._origen, podar)
+
+    def espejo(self) -> "VistaBinaria[T]":
+        par = self._par
+        return VistaBinaria(self._origen, lambda t: par(t)[::-1])
+
+    def filtrar(self, predicado: Callable[[T], bool]) -> "VistaBinaria[T]":
+        '''
+        Sólo los subárboles cuya raíz cumple el predicado (si un nodo no lo cumple
+        se va con todo su subárbol). Vacía si no lo cumple la raíz.
+        '''
+        par, vacio = self._par, ArbolBinario.vacio()
+
+        def quedan(t: ArbolBinario[T]) -> "Tuple[ArbolBinario[T], ArbolBinario[T]]":
+            si, sd = par(t)
+            return (
+                si if si.raiz is not None and predicado(si.raiz.dato) else vacio,
+                sd if sd.raiz is not None and predicado(sd.raiz.dato) else vacio
+            )
+
+        origen = self._origen if not self.es_vacio() and predicado(self._origen.raiz.dato) else vacio
+        return VistaBinaria(origen, quedan)
+
+    def materializar(self) -> ArbolBinario[T]:
+        if self.es_vacio():
             return ArbolBinario()
-        nuevo_si = self.si().sin_hojas()
-        nuevo_sd = self.sd().sin_hojas()
-        return ArbolBinario.crear_nodo(self.dato(), nuevo_si, nuevo_sd)
+        par = self._par
+        return plegar(
+            self._origen, lambda t: [] if t.raiz is None else list(par(t)),
+            lambda t, hijos: ArbolBinario.vacio() if t.raiz is None else ArbolBinario.crear_nodo(t.raiz.dato, *hijos)
+        )
 
 def main():
     t = ArbolBinario.crear_nodo(1)
@@ -196,6 +614,8 @@ def main():
     print(f'Nodos: {len(t)}')
 
     print(f'BFS: {t.bfs()}')
+    print(f'Niveles: {list(t.niveles())}  Ancho máximo: {t.ancho_maximo()}')
+    print(f'Primer par por niveles: {t.buscar_bfs(lambda x: x % 2 == 0)}')
 
     t2 = t.copy()
     print(t2)
@@ -204,10 +624,14 @@ def main():
     print(f'DFS posorder: {t2.posorder()}')
     print(f'DFS inorder tail:  {t2.inorder_tail()}')
     print(f'Nivel de 8: {t2.nivel(8)}')
+    print(f'Niveles de 8, 3 y 99 con el índice: {t2.nivel_muchos([8, 3, 99])}  Camino a 8: {t2.camino(8)}')
 
     t3 = t2.espejo()
     print(t3)
     print(t3.sin_hojas())
+    vista = t3.vista().sin_hojas()
+    print(f'Vista sin hojas: {vista.preorder()} ({len(vista)} nodos)  espejo: {t3.vista().espejo().inorder()}')
+    print(f'Vista filtrada (menores que 6): {t.vista().filtrar(lambda x: x < 6).materializar().inorder()}')
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -0,0 +1,425 @@
+'''
+Árbol binario guardado como "estructura de arreglos": en lugar de un objeto
+ArbolBinario y un NodoAB por nodo (más dos árboles vacíos por cada hijo que falta),
+cada nodo es un índice entero y sus campos viven en arreglos paralelos:
+
+    datos[i]        dato del nodo i
+    izquierdos[i]   índice del hijo izquierdo (VACIO si no tiene)
+    derechos[i]     índice del hijo derecho (VACIO si no tiene)
+
+Los índices de nodos eliminados quedan en una lista de libres y se reusan.
+Si los datos son numéricos se puede pasar el código de tipo de array (por ejemplo
+'q' o 'd') para guardarlos sin un objeto de Python por dato.
+
+Para el código que usa la interfaz de ArbolBinario, vista() devuelve una
+VistaArbol que tiene si(), sd(), dato() y es_vacio() sobre los mismos arreglos.
+
+guardar() escribe los arreglos tal cual en un archivo binario:
+
+    cabecera        _CABECERA: marca, versión, orden de bytes, tipo, cantidad, raíz
+    izquierdos      cantidad enteros de 8 bytes
+    derechos        cantidad enteros de 8 bytes
+    datos           cantidad valores del tipo de array, o la lista en pickle si no hay tipo
+
+cargar() mapea el archivo en memoria y copia cada bloque directo a su arreglo, sin
+recorrer los nodos, así que abrir un árbol grande cuesta lo que copiar sus bytes.
+
+Cargar datos en pickle puede ejecutar cualquier código que venga en el archivo, así
+que cargar() los rechaza salvo que se pase permitir_pickle=True, y eso sólo se hace
+con archivos de confianza (escritos por uno mismo). Con datos de un tipo de array
+no se usa pickle.
+'''
+import gc
+import mmap
+import pickle
+import struct
+import sys
+from array import array
+from collections import deque
+from typing import Any, Callable, Dict, Generic, Iterator, List, Optional, TypeVar
+
+T = TypeVar('T')
+
+VACIO = -1
+
+_MARCA = b'ABC1'
+# marca, orden de bytes (0 little, 1 big), tipo de array (b'-' si son objetos), cantidad, raíz
+_CABECERA = struct.Struct('<4sBc2xqq')
+_ORDEN = 0 if sys.byteorder == 'little' else 1
+
+
+class ArbolBinarioCompacto(Generic[T]):
+    def __init__(self, tipo: Optional[str] = None):
+        self.datos: Any = [] if tipo is None else array(tipo)
+        self.izquierdos: array = array('q')
+        self.derechos: array = array('q')
+        self.raiz: int = VACIO
+        self._libres: List[int] = []
+        self._cantidad: int = 0
+
+    @staticmethod
+    def desde_arbol(arbol: Any, tipo: Optional[str] = None) -> "ArbolBinarioCompacto[T]":
+        '''
+        Copia cualquier árbol con la interfaz es_vacio()/si()/sd()/dato() (los
+        ArbolBinario de arboles.py y de arbolbinarioMarian.py) al formato compacto.
+        '''
+        compacto: ArbolBinarioCompacto[T] = ArbolBinarioCompacto(tipo)
+        if arbol.es_vacio():
+            return compacto
+        compacto.raiz = compacto.crear_nodo(arbol.dato())
+        pila = [(arbol, compacto.raiz)]
+        while pila:
+            actual, i = pila.pop()
+            si, sd = actual.si(), actual.sd()
+            if not si.es_vacio():
+                j = compacto.crear_nodo(si.dato())
+                compacto.izquierdos[i] = j
+                pila.append((si, j))
+            if not sd.es_vacio():
+                j = compacto.crear_nodo(sd.dato())
+                compacto.derechos[i] = j
+                pila.append((sd, j))
+        return compacto
+
+    def guardar(self, ruta: str) -> None:
+        '''
+        Si hubo eliminaciones, primero se renumeran los nodos en preorden para no
+        escribir los índices libres.
+        '''
+        arbol = self._sin_libres() if self._libres else self
+        tipo = b'-' if isinstance(arbol.datos, list) else arbol.datos.typecode.encode()
+        with open(ruta, 'wb') as archivo:
+            archivo.write(_CABECERA.pack(_MARCA, _ORDEN, tipo, len(arbol.izquierdos), arbol.raiz))
+            arbol.izquierdos.tofile(archivo)
+            arbol.derechos.tofile(archivo)
+            if tipo == b'-':
+                pickle.dump(arbol.datos, archivo, pickle.HIGHEST_PROTOCOL)
+            else:
+                arbol.datos.tofile(archivo)
+
+    @staticmethod
+    def cargar(ruta: str, permitir_pickle: bool = False) -> "ArbolBinarioCompacto[T]":
+        '''
+        Con datos guardados en pickle (sin tipo de array) hace falta
+        permitir_pickle=True: pickle puede ejecutar código del archivo, así que sólo
+        para archivos de confianza.
+        '''
+        with open(ruta, 'rb') as archivo, mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+            if len(mapa) < _CABECERA.size or mapa[:len(_MARCA)] != _MARCA:
+                raise ValueError(f'{ruta} no es un árbol guardado con ArbolBinarioCompacto.guardar')
+            _, orden, tipo, cantidad, raiz = _CABECERA.unpack_from(mapa)
+            if tipo == b'-' and not permitir_pickle:
+                raise ValueError(
+                    f'{ruta} tiene los datos en pickle, que puede ejecutar código al cargarlo: '
+                    'usar permitir_pickle=True sólo si el archivo es de confianza'
+                )
+            if cantidad < 0:
+                raise ValueError(f'{ruta} está dañado: la cabecera dice {cantidad} nodos')
+            compacto: ArbolBinarioCompacto[T] = ArbolBinarioCompacto(None if tipo == b'-' else tipo.decode())
+            desde = _CABECERA.size
+            with memoryview(mapa) as bloque:
+                for arreglo in (compacto.izquierdos, compacto.derechos):
+                    hasta = desde + cantidad * arreglo.itemsize
+                    if hasta > len(mapa):
+                        raise ValueError(f'{ruta} está cortado: faltan bytes de los {cantidad} nodos de la cabecera')
+                    arreglo.frombytes(bloque[desde:hasta])
+                    desde = hasta
+                if tipo == b'-':
+                    compacto.datos = pickle.loads(bloque[desde:])
+                else:
+                    compacto.datos.frombytes(bloque[desde:desde + cantidad * compacto.datos.itemsize])
+            if not isinstance(compacto.datos, (list, array)) or len(compacto.datos) != cantidad:
+                raise ValueError(f'{ruta} está cortado: faltan datos de los {cantidad} nodos de la cabecera')
+        if orden != _ORDEN:
+            compacto.izquierdos.byteswap()
+            compacto.derechos.byteswap()
+            if tipo != b'-':
+                compacto.datos.byteswap()
+        # un índice fuera de rango haría que los recorridos lean fuera de los arreglos
+        if not VACIO <= raiz < cantidad or (cantidad and not all(
+            VACIO <= min(hijos) and max(hijos) < cantidad for hijos in (compacto.izquierdos, compacto.derechos)
+        )):
+            raise ValueError(f'{ruta} está dañado: hay índices de nodos fuera de [0, {cantidad})')
+        compacto.raiz = raiz
+        compacto._cantidad = cantidad
+        return compacto
+
+    def _sin_libres(self) -> "ArbolBinarioCompacto[T]":
+        tipo = None if isinstance(self.datos, list) else self.datos.typecode
+        nuevo: ArbolBinarioCompacto[T] = ArbolBinarioCompacto(tipo)
+        orden = list(self.iter_indices_preorder())
+        nuevo_indice = array('q', [VACIO]) * (len(self.izquierdos) + 1)  # el último cubre VACIO
+        for k, j in enumerate(orden):
+            nuevo_indice[j] = k
+        datos, izquierdos, derechos = self.datos, self.izquierdos, self.derechos
+        nuevo.datos.extend(datos[j] for j in orden)
+        nuevo.izquierdos.extend(nuevo_indice[izquierdos[j]] for j in orden)
+        nuevo.derechos.extend(nuevo_indice[derechos[j]] for j in orden)
+        nuevo.raiz = 0 if orden else VACIO
+        nuevo._cantidad = len(orden)
+        return nuevo
+
+    def a_arbol(self, crear_nodo: Callable[[T, Any, Any], Any]) -> Any:
+        '''
+        Arma el árbol de nodos equivalente de abajo hacia arriba, con
+        crear_nodo(dato, si, sd) y None en los hijos que faltan (por ejemplo
+        ArbolBinarioOrdenado.crear_nodo). Devuelve None si el árbol es vacío.
+        '''
+        datos, izquierdos, derechos = self.datos, self.izquierdos, self.derechos
+        armados: Dict[int, Any] = {}
+        # como en ArbolBinarioOrdenado.desde_ordenados, no hay ciclos que liberar mientras se arma
+        recolector_activo = gc.isenabled()
+        gc.disable()
+        try:
+            for j in self.iter_indices_posorder():
+                i, d = izquierdos[j], derechos[j]
+                armados[j] = crear_nodo(
+                    datos[j], None if i == VACIO else armados.pop(i), None if d == VACIO else armados.pop(d)
+                )
+        finally:
+            if recolector_activo:
+                gc.enable()
+        return armados.pop(self.raiz, None)
+
+    def crear_nodo(self, dato: T, si: int = VACIO, sd: int = VACIO) -> int:
+        self._cantidad += 1
+        if self._libres:
+            i = self._libres.pop()
+            self.datos[i] = dato
+            self.izquierdos[i] = si
+            self.derechos[i] = sd
+            return i
+        self.datos.append(dato)
+        self.izquierdos.append(si)
+        self.derechos.append(sd)
+        return len(self.izquierdos) - 1
+
+    def insertar_si(self, i: int, j: int) -> None:
+        self.izquierdos[i] = j
+
+    def insertar_sd(self, i: int, j: int) -> None:
+        self.derechos[i] = j
+
+    def eliminar_subarbol(self, i: int) -> None:
+        '''
+        Libera el subárbol que empieza en i. Quien lo tenga como hijo tiene que
+        desengancharlo (insertar_si/insertar_sd con VACIO), o cambiar la raíz.
+        '''
+        if i == self.raiz:
+            self.raiz = VACIO
+        objetos = isinstance(self.datos, list)
+        for j in list(self.iter_indices_preorder(i)):
+            if objetos:
+                self.datos[j] = None
+            self.izquierdos[j] = VACIO
+            self.derechos[j] = VACIO
+            self._libres.append(j)
+            self._cantidad -= 1
+
+    def es_vacio(self) -> bool:
+        return self.raiz == VACIO
+
+    def __len__(self) -> int:
+        return self._cantidad
+
+    def altura(self, i: Optional[int] = None) -> int:
+        i = self.raiz if i is None else i
+        izquierdos, derechos = self.izquierdos, self.derechos
+        nivel = [i] if i != VACIO else []
+        altura = 0
+        while nivel:
+            altura += 1
+            siguiente = []
+            for j in nivel:
+                if izquierdos[j] != VACIO:
+                    siguiente.append(izquierdos[j])
+                if derechos[j] != VACIO:
+                    siguiente.append(derechos[j])
+            nivel = siguiente
+        return altura
+
+    # Recorridos sobre índices: no crean objetos por nodo, sólo la pila de enteros.
+    def iter_indices_preorder(self, i: Optional[int] = None) -> Iterator[int]:
+        izquierdos, derechos = self.izquierdos, self.derechos
+        pila = [self.raiz if i is None else i]
+        while pila:
+            j = pila.pop()
+            if j != VACIO:
+                yield j
+                pila.append(derechos[j])
+                pila.append(izquierdos[j])
+
+    def iter_indices_inorder(self, i: Optional[int] = None) -> Iterator[int]:
+        izquierdos, derechos = self.izquierdos, self.derechos
+        pila: List[int] = []
+        j = self.raiz if i is None else i
+        while j != VACIO or pila:
+            while j != VACIO:
+                pila.append(j)
+                j = izquierdos[j]
+            j = pila.pop()
+            yield j
+            j = derechos[j]
+
+    def iter_indices_posorder(self, i: Optional[int] = None) -> Iterator[int]:
+        izquierdos, derechos = self.izquierdos, self.derechos
+        inicio = self.raiz if i is None else i
+        if inicio == VACIO:
+            return
+        # preorden raíz-derecho-izquierdo invertido = posorden izquierdo-derecho-raíz
+        pila = [inicio]
+        salida: List[int] = []
+        while pila:
+            j = pila.pop()
+            salida.append(j)
+            if izquierdos[j] != VACIO:
+                pila.append(izquierdos[j])
+            if derechos[j] != VACIO:
+                pila.append(derechos[j])
+        yield from reversed(salida)
+
+    def iter_indices_bfs(self, i: Optional[int] = None) -> Iterator[int]:
+        izquierdos, derechos = self.izquierdos, self.derechos
+        inicio = self.raiz if i is None else i
+        if inicio == VACIO:
+            return
+        cola = deque([inicio])
+        while cola:
+            j = cola.popleft()
+            yield j
+            if izquierdos[j] != VACIO:
+                cola.append(izquierdos[j])
+            if derechos[j] != VACIO:
+                cola.append(derechos[j])
+
+    def __iter__(self) -> Iterator[T]:
+        return self.iter_inorder()
+
+    def iter_inorder(self, i: Optional[int] = None) -> Iterator[T]:
+        datos = self.datos
+        return (datos[j] for j in self.iter_indices_inorder(i))
+
+    def iter_preorder(self, i: Optional[int] = None) -> Iterator[T]:
+        datos = self.datos
+        return (datos[j] for j in self.iter_indices_preorder(i))
+
+    def iter_posorder(self, i: Optional[int] = None) -> Iterator[T]:
+        datos = self.datos
+        return (datos[j] for j in self.iter_indices_posorder(i))
+
+    def iter_bfs(self, i: Optional[int] = None) -> Iterator[T]:
+        datos = self.datos
+        return (datos[j] for j in self.iter_indices_bfs(i))
+
+    def inorder(self) -> List[T]:
+        return list(self.iter_inorder())
+
+    def preorder(self) -> List[T]:
+        return list(self.iter_preorder())
+
+    def posorder(self) -> List[T]:
+        return list(self.iter_posorder())
+
+    def bfs(self) -> List[T]:
+        return list(self.iter_bfs())
+
+    def vista(self) -> "VistaArbol[T]":
+        return VistaArbol(self, self.raiz)
+
+
+class VistaArbol(Generic[T]):
+    '''
+    Subárbol de un ArbolBinarioCompacto con la misma interfaz de lectura que
+    ArbolBinario. Es sólo el par (arreglos, índice): crear una vista no copia nada.
+    '''
+    __slots__ = ('_arbol', '_indice')
+
+    def __init__(self, arbol: ArbolBinarioCompacto[T], indice: int):
+        self._arbol = arbol
+        self._indice = indice
+
+    def es_vacio(self) -> bool:
+        return self._indice == VACIO
+
+    def _valida_no_vacio(self) -> None:
+        if self._indice == VACIO:
+            raise TypeError('Árbol vacío')
+
+    def si(self) -> "VistaArbol[T]":
+        self._valida_no_vacio()
+        return VistaArbol(self._arbol, self._arbol.izquierdos[self._indice])
+
+    def sd(self) -> "VistaArbol[T]":
+        self._valida_no_vacio()
+        return VistaArbol(self._arbol, self._arbol.derechos[self._indice])
+
+    def dato(self) -> T:
+        self._valida_no_vacio()
+        return self._arbol.datos[self._indice]
+
+    def es_hoja(self) -> bool:
+        return (
+            not self.es_vacio()
+            and self._arbol.izquierdos[self._indice] == VACIO
+            and self._arbol.derechos[self._indice] == VACIO
+        )
+
+    def altura(self) -> int:
+        return self._arbol.altura(self._indice)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self._arbol.iter_indices_preorder(self._indice))
+
+    def __iter__(self) -> Iterator[T]:
+        return self.iter_inorder()
+
+    def iter_inorder(self) -> Iterator[T]:
+        return self._arbol.iter_inorder(self._indice)
+
+    def iter_preorder(self) -> Iterator[T]:
+        return self._arbol.iter_preorder(self._indice)
+
+    def iter_posorder(self) -> Iterator[T]:
+        return self._arbol.iter_posorder(self._indice)
+
+    def iter_bfs(self) -> Iterator[T]:
+        return self._arbol.iter_bfs(self._indice)
+
+    def inorder(self) -> List[T]:
+        return list(self.iter_inorder())
+
+    def preorder(self) -> List[T]:
+        return list(self.iter_preorder())
+
+    def posorder(self) -> List[T]:
+        return list(self.iter_posorder())
+
+
+def main():
+    from arbolbinarioMarian import ArbolBinario
+
+    t = ArbolBinario.crear_nodo(1)
+    n2 = ArbolBinario.crear_nodo(2)
+    n3 = ArbolBinario.crear_nodo(3)
+    n2.insertar_si(ArbolBinario.crear_nodo(4))
+    n2.insertar_sd(ArbolBinario.crear_nodo(5))
+    n3.insertar_si(ArbolBinario.crear_nodo(6))
+    t.insertar_si(n2)
+    t.insertar_sd(n3)
+
+    compacto = ArbolBinarioCompacto.desde_arbol(t, 'q')
+    print(f'Nodos: {len(compacto)}  Altura: {compacto.altura()}')
+    print(f'inorder:  {compacto.inorder()}  (original: {t.inorder()})')
+    print(f'preorder: {compacto.preorder()}')
+    print(f'posorder: {compacto.posorder()}')
+    print(f'bfs:      {compacto.bfs()}')
+
+    vista = compacto.vista()
+    print(f'raiz: {vista.dato()}, si: {vista.si().dato()}, sd.si: {vista.sd().si().dato()}')
+
+    compacto.eliminar_subarbol(compacto.izquierdos[compacto.raiz])
+    compacto.insertar_si(compacto.raiz, compacto.crear_nodo(7))
+    print(f'Después de reemplazar el subárbol izquierdo: {compacto.inorder()} ({len(compacto)} nodos)')
+
+if __name__ == '__main__':
+    main()
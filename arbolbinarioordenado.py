@@ -1,5 +1,11 @@
-from typing import TypeVar, Optional, Protocol, Tuple
+import gc
+import os
+import tempfile
+from io import StringIO
+from bisect import bisect_left
+from typing import Dict, Iterable, List, TypeVar, Optional, Protocol, Tuple
 from arboles import ArbolBinario, NodoAB
+from recorridos import posorden
 
 # Definimos un protocolo para tipos comparables
 class Comparable(Protocol):
@@ -15,8 +21,16 @@ T = TypeVar('T', bound=Comparable)
 
 # Nodo para el árbol binario ordenado
 class NodoABO(NodoAB[T]):
-    def __init__(self, dato: T):
-        super().__init__(dato, ArbolBinarioOrdenado(), ArbolBinarioOrdenado())
+    __slots__ = ('cota',)
+
+    def __init__(self, dato: T, si: "Optional[ArbolBinarioOrdenado[T]]" = None, sd: "Optional[ArbolBinarioOrdenado[T]]" = None):
+        super().__init__(
+            dato,
+            ArbolBinarioOrdenado.vacio() if si is None else si,
+            ArbolBinarioOrdenado.vacio() if sd is None else sd
+        )
+        # (ordenado, mínimo, máximo) del subárbol; None hasta que se lo calcula
+        self.cota: Optional[Tuple[bool, Optional[T], Optional[T]]] = None
     
     def __lt__(self, otro: "NodoABO[T]") -> bool:
         return isinstance(otro, NodoABO) and self.dato < otro.dato
@@ -29,62 +43,232 @@ class NodoABO(NodoAB[T]):
 
 # Árbol binario ordenado
 class ArbolBinarioOrdenado(ArbolBinario[T]):
+    '''
+    Con el tamaño de cada subárbol que guardan los nodos (NodoAB.tamanio), rank,
+    select, floor, ceiling y count_between bajan por un solo camino: O(altura).
+
+    Las operaciones que modifican un subárbol actualizan los tamaños hacia arriba
+    siguiendo los antecesores.
+    '''
+    __slots__ = ()
+
     @staticmethod
-    def crear_nodo(dato: T) -> "ArbolBinarioOrdenado[T]":
+    def crear_nodo(dato: T, si: "Optional[ArbolBinarioOrdenado[T]]" = None, sd: "Optional[ArbolBinarioOrdenado[T]]" = None) -> "ArbolBinarioOrdenado[T]":
         nuevo = ArbolBinarioOrdenado()
-        nuevo.set_raiz(NodoABO(dato))
+        nuevo.set_raiz(NodoABO(dato, si, sd))
         return nuevo
+
+    @classmethod
+    def desde_ordenados(cls, datos: Iterable[T]) -> "ArbolBinarioOrdenado[T]":
+        '''
+        Arma en O(n) un árbol perfectamente balanceado con datos que ya vienen en
+        orden estrictamente creciente: la raíz de cada subárbol es el elemento del
+        medio de su rango.
+        '''
+        valores = list(datos)
+        for i in range(1, len(valores)):
+            if not valores[i - 1] < valores[i]:
+                raise ValueError("Los datos deben estar en orden creciente y sin repetidos")
+
+        def construir(desde: int, hasta: int) -> "ArbolBinarioOrdenado[T]":
+            if desde >= hasta:
+                return cls.vacio()
+            medio = (desde + hasta) // 2
+            return cls.crear_nodo(valores[medio], construir(desde, medio), construir(medio + 1, hasta))
+
+        # armar millones de nodos dispara el recolector de ciclos una y otra vez
+        # sin que haya nada para liberar, así que se lo pausa durante la carga
+        recolector_activo = gc.isenabled()
+        gc.disable()
+        try:
+            return construir(0, len(valores)) if valores else cls()
+        finally:
+            if recolector_activo:
+                gc.enable()
+
+    def _actualizar(self) -> None:
+        super()._actualizar()
+        self.raiz.cota = None
     
+    @staticmethod
+    def _cotas(arbol: ArbolBinario[T]) -> Tuple[bool, Optional[T], Optional[T]]:
+        '''
+        Devuelve (ordenado, mínimo, máximo) del subárbol. En los NodoABO el resultado
+        queda guardado hasta que _actualizar lo invalida, así que sólo se recorren
+        los subárboles que cambiaron desde la última consulta.
+        '''
+        if arbol.es_vacio():
+            return True, None, None
+        cota = getattr(arbol.raiz, 'cota', None)
+        if cota is not None:
+            return cota
+
+        # posorden (recorridos.posorden, sin recursión) sólo sobre los subárboles sin
+        # cota guardada: al llegar a un nodo sus dos hijos ya la tienen. Los nodos que
+        # no son NodoABO no tienen dónde guardarla y la dejan en calculadas.
+        calculadas: Dict[int, Tuple[bool, Optional[T], Optional[T]]] = {}
+
+        def cota_de(t: ArbolBinario[T]) -> Tuple[bool, Optional[T], Optional[T]]:
+            if t.es_vacio():
+                return True, None, None
+            guardada = getattr(t.raiz, 'cota', None)
+            return guardada if guardada is not None else calculadas[id(t)]
+
+        def sin_cota(t: ArbolBinario[T]) -> List[ArbolBinario[T]]:
+            return [h for h in (t.raiz.si, t.raiz.sd) if not h.es_vacio() and getattr(h.raiz, 'cota', None) is None]
+
+        for t in posorden(arbol, sin_cota):
+            ordenado_si, minimo_si, maximo_si = cota_de(t.raiz.si)
+            ordenado_sd, minimo_sd, maximo_sd = cota_de(t.raiz.sd)
+            dato = t.raiz.dato
+            cota = (
+                ordenado_si and ordenado_sd
+                    and (maximo_si is None or maximo_si < dato)
+                    and (minimo_sd is None or dato < minimo_sd),
+                dato if minimo_si is None else minimo_si,
+                dato if maximo_sd is None else maximo_sd
+            )
+            if isinstance(t.raiz, NodoABO):
+                t.raiz.cota = cota
+            else:
+                calculadas[id(t)] = cota
+        return cota_de(arbol)
+
+    @staticmethod
+    def _encaja(arbol: ArbolBinario[T], minimo: Optional[T], maximo: Optional[T]) -> bool:
+        ordenado, menor, mayor = ArbolBinarioOrdenado._cotas(arbol)
+        return ordenado and (arbol.es_vacio() or (
+            (minimo is None or minimo < menor) and (maximo is None or mayor < maximo)
+        ))
+
     def es_ordenado(self) -> bool:
-        def es_ordenado_interna(
-            arbol: "ArbolBinarioOrdenado[T]", 
-            minimo: Optional[T] = None, 
-            maximo: Optional[T] = None
-        ) -> bool:
-            if arbol.es_vacio():
-                return True
-            if (minimo is not None and arbol.dato() <= minimo) or (maximo is not None and arbol.dato() >= maximo):
-                return False
-            return es_ordenado_interna(arbol.si(), minimo, arbol.dato()) and es_ordenado_interna(arbol.sd(), arbol.dato(), maximo)
-        
-        return es_ordenado_interna(self)
+        return self._cotas(self)[0]
     
     def es_hoja(self) -> bool:
         return self.si().es_vacio() and self.sd().es_vacio()
     
     def insertar_si(self, arbol: "ArbolBinarioOrdenado[T]"):
-        si = self.si()
-        super().insertar_si(arbol)
-        if not self.es_ordenado():
-            super().insertar_si(si)
+        # se valida antes de colgarlo: el árbol nuevo contra el dato de la raíz y
+        # el otro subárbol (que ya tiene sus cotas calculadas) contra el mismo dato
+        if not (self._encaja(arbol, None, self.dato()) and self._encaja(self.sd(), self.dato(), None)):
             raise ValueError("El árbol a insertar no es ordenado o viola la propiedad de orden del árbol actual")
+        super().insertar_si(arbol)
     
     def insertar_sd(self, arbol: "ArbolBinarioOrdenado[T]"):
-        sd = self.sd()
-        super().insertar_sd(arbol)
-        if not self.es_ordenado():
-            super().insertar_sd(sd)
+        # se valida antes de colgarlo: el árbol nuevo contra el dato de la raíz y
+        # el otro subárbol (que ya tiene sus cotas calculadas) contra el mismo dato
+        if not (self._encaja(arbol, self.dato(), None) and self._encaja(self.si(), None, self.dato())):
             raise ValueError("El árbol a insertar no es ordenado o viola la propiedad de orden del árbol actual")
+        super().insertar_sd(arbol)
     
     def insertar(self, valor: T):
+        self._insertar(valor)
+        self._actualizar_antecesores()
+
+    def _insertar(self, valor: T):
         if self.es_vacio():
-            self.set_raiz(NodoABO(valor))
+            self._reemplazar_raiz(NodoABO(valor))
+            self._enlazar()
+            return
         elif valor == self.dato():
             raise ValueError("No se admiten repetidos!")
         elif valor < self.dato():
-            self.si().insertar(valor)
+            self._si_propio()._insertar(valor)
         else:
-            self.sd().insertar(valor)
+            self._sd_propio()._insertar(valor)
+        self._actualizar()
+
+    @classmethod
+    def convertir_ordenado(cls, arbol_binario: ArbolBinario[T]) -> "ArbolBinarioOrdenado[T]":
+        '''
+        Junta los datos de cualquier árbol binario, los ordena y arma con ellos un
+        árbol ordenado balanceado en O(n log n).
+        '''
+        datos: List[T] = []
+        arbol_binario.inorder(datos)
+        return cls.desde_ordenados(sorted(datos))
 
     def pertenece(self, valor: T) -> bool:
-        def buscar_interna(arbol: "ArbolBinarioOrdenado[T]") -> bool:
-            if arbol.es_vacio():
-                return False
-            elif valor == arbol.dato():
+        actual = self
+        while not actual.es_vacio():
+            if valor == actual.dato():
                 return True
-            return buscar_interna(arbol.si()) or buscar_interna(arbol.sd())
-        
-        return buscar_interna(self)
+            actual = actual.si() if valor < actual.dato() else actual.sd()
+        return False
+
+    def _contar_menores(self, valor: T, incluir_igual: bool) -> int:
+        cantidad = 0
+        actual = self
+        while not actual.es_vacio():
+            if actual.dato() < valor or (incluir_igual and actual.dato() == valor):
+                cantidad += len(actual.si()) + 1
+                actual = actual.sd()
+            else:
+                actual = actual.si()
+        return cantidad
+
+    def rank(self, valor: T) -> int:
+        '''
+        Cantidad de claves del árbol menores que valor (valor no tiene que pertenecer).
+        '''
+        return self._contar_menores(valor, False)
+
+    def select(self, k: int) -> T:
+        '''
+        Devuelve la k-ésima clave en orden, contando desde 0: select(rank(x)) == x.
+        '''
+        if k < 0 or k >= len(self):
+            raise IndexError("Posición fuera de rango")
+        actual = self
+        while True:
+            izquierda = len(actual.si())
+            if k < izquierda:
+                actual = actual.si()
+            elif k == izquierda:
+                return actual.dato()
+            else:
+                k -= izquierda + 1
+                actual = actual.sd()
+
+    def floor(self, valor: T) -> Optional[T]:
+        '''
+        Mayor clave menor o igual que valor, o None si no hay ninguna.
+        '''
+        candidato = None
+        actual = self
+        while not actual.es_vacio():
+            if actual.dato() == valor:
+                return actual.dato()
+            elif actual.dato() < valor:
+                candidato = actual.dato()
+                actual = actual.sd()
+            else:
+                actual = actual.si()
+        return candidato
+
+    def ceiling(self, valor: T) -> Optional[T]:
+        '''
+        Menor clave mayor o igual que valor, o None si no hay ninguna.
+        '''
+        candidato = None
+        actual = self
+        while not actual.es_vacio():
+            if actual.dato() == valor:
+                return actual.dato()
+            elif actual.dato() > valor:
+                candidato = actual.dato()
+                actual = actual.si()
+            else:
+                actual = actual.sd()
+        return candidato
+
+    def count_between(self, a: T, b: T) -> int:
+        '''
+        Cantidad de claves x con a <= x <= b.
+        '''
+        if b < a:
+            return 0
+        return self._contar_menores(b, True) - self._contar_menores(a, False)
     
     def max(self) -> "ArbolBinarioOrdenado[T]":
         if self.es_vacio():
@@ -105,34 +289,235 @@ class ArbolBinarioOrdenado(ArbolBinario[T]):
             return self.sd().max_con_pred()
 
     def eliminar(self, valor: T) -> None:
+        self._eliminar(valor)
+        self._actualizar_antecesores()
+
+    def _eliminar(self, valor: T) -> None:
         if self.es_vacio():
             return
         elif self.dato() == valor:
-            if self.es_hoja():
-                self.raiz = None
-            elif not self.sd().es_vacio() and not self.si().es_vacio():
-                self.si().max().insertar_sd(self.sd())
-                self.raiz = self.si().raiz
-            elif not self.si().es_vacio():
-                self.raiz = self.si().raiz
-            else:
-                self.raiz = self.si().raiz
+            self._quitar_raiz()
+            if self.es_vacio():
+                return
         elif self.dato() < valor:
-            self.sd().eliminar(valor)
+            self.sd()._eliminar(valor)
         else:
-            self.si().eliminar(valor)
+            self.si()._eliminar(valor)
+        self._actualizar()
 
-    def __str__(self) -> str: 
-        def recorrer(t:ArbolBinario[T], nivel:int) -> str:
-            tab = '.' * 4 * nivel
-            if t.es_vacio():
-                return tab + 'AV\n' # Árbol Vacío (AV)
+    def _quitar_raiz(self) -> None:
+        '''
+        Saca el dato de la raíz sin que el árbol gane altura: una hoja se vacía, un
+        nodo con un solo hijo se reemplaza por ese hijo y un nodo con dos hijos toma
+        el dato de su predecesor en orden, que se desengancha del subárbol izquierdo.
+        '''
+        if self.es_hoja():
+            self._reemplazar_raiz(None)
+        elif self.si().es_vacio() or self.sd().es_vacio():
+            hijo = self.sd() if self.si().es_vacio() else self.si()
+            self._reemplazar_raiz(hijo.raiz)
+            self._enlazar()
+            self._actualizar()
+        else:
+            maximo, padre = self.si().max_con_pred()
+            self.raiz.dato = maximo.dato()
+            if padre is None:
+                maximo._reemplazar_raiz(maximo.si().raiz)
+                if not maximo.es_vacio():
+                    maximo._enlazar()
+                    maximo._actualizar()
             else:
-                tab += str(t.dato()) + "\n"
-                tab += recorrer(t.si(),nivel+1)
-                tab += recorrer(t.sd(),nivel+1)
-                return tab
-        return recorrer(self,0)
+                padre.raiz.sd = maximo.si()
+                padre._enlazar()
+                while padre is not self:
+                    padre._actualizar()
+                    padre = padre.antecesor
+            self._actualizar()
+
+    def eliminar_rango(self, a: T, b: T) -> None:
+        '''
+        Elimina todas las claves x con a <= x <= b. Cada llamada interna conoce las
+        claves de los antecesores que acotan su subárbol; si esas cotas quedan dentro
+        del rango el subárbol entero se descarta de una vez, así que el costo es
+        O(k + altura) para k claves eliminadas.
+        '''
+        if b < a:
+            return
+        self._eliminar_rango(a, b, None, None)
+        self._actualizar_antecesores()
+
+    def _eliminar_rango(self, a: T, b: T, minimo: Optional[T], maximo: Optional[T]) -> None:
+        if self.es_vacio():
+            return
+        if minimo is not None and maximo is not None and a <= minimo and maximo <= b:
+            self._reemplazar_raiz(None)
+            return
+        dato = self.dato()
+        if dato < a:
+            self.sd()._eliminar_rango(a, b, dato, maximo)
+        elif b < dato:
+            self.si()._eliminar_rango(a, b, minimo, dato)
+        else:
+            self.si()._eliminar_rango(a, b, minimo, dato)
+            self.sd()._eliminar_rango(a, b, dato, maximo)
+            self._quitar_raiz()
+            if self.es_vacio():
+                return
+        self._actualizar()
+
+    def eliminar_muchos(self, valores: Iterable[T]) -> None:
+        '''
+        Elimina todas las claves dadas en una única bajada: se ordenan y en cada nodo
+        se reparten entre los dos subárboles, así los caminos que comparten las
+        claves se recorren una sola vez en lugar de una vez por clave.
+        '''
+        ordenados = sorted(set(valores))
+        self._eliminar_muchos(ordenados, 0, len(ordenados))
+        self._actualizar_antecesores()
+
+    def _eliminar_muchos(self, valores: List[T], desde: int, hasta: int) -> None:
+        if self.es_vacio() or desde >= hasta:
+            return
+        corte = bisect_left(valores, self.dato(), desde, hasta)
+        encontrado = corte < hasta and valores[corte] == self.dato()
+        self.si()._eliminar_muchos(valores, desde, corte)
+        self.sd()._eliminar_muchos(valores, corte + 1 if encontrado else corte, hasta)
+        if encontrado:
+            self._quitar_raiz()
+            if self.es_vacio():
+                return
+        self._actualizar()
+
+    def _claves_entre(self, a: T, b: T, resultado: List[T]) -> None:
+        if self.es_vacio():
+            return
+        if a < self.dato():
+            self.si()._claves_entre(a, b, resultado)
+        if a <= self.dato() <= b:
+            resultado.append(self.dato())
+        if self.dato() < b:
+            self.sd()._claves_entre(a, b, resultado)
+
+    def __str__(self) -> str: 
+        # 'AV' es Árbol Vacío; el texto lo arma render() (ver arboles.ArbolBinario)
+        salida = StringIO()
+        self.render(salida)
+        return salida.getvalue()
+
+# Nodo del árbol AVL: los hijos que faltan son el ArbolAVL vacío (la altura ya la guarda NodoAB)
+class NodoAVL(NodoABO[T]):
+    __slots__ = ()
+
+    def __init__(self, dato: T, si: "Optional[ArbolAVL[T]]" = None, sd: "Optional[ArbolAVL[T]]" = None):
+        super().__init__(dato, ArbolAVL.vacio() if si is None else si, ArbolAVL.vacio() if sd is None else sd)
+
+# Árbol binario ordenado autobalanceado (AVL)
+class ArbolAVL(ArbolBinarioOrdenado[T]):
+    '''
+    Después de cada insertar/eliminar se recalcula la altura de los nodos del camino
+    recorrido y se rota donde la diferencia de alturas entre subárboles supera 1,
+    así la altura se mantiene en O(log n) aunque las claves lleguen ordenadas.
+
+    Las rotaciones intercambian nodos entre los mismos objetos ArbolAVL, por lo que
+    un subárbol sigue colgando del mismo antecesor y si(), sd() y dato() no cambian.
+    '''
+    __slots__ = ()
+
+    @staticmethod
+    def crear_nodo(dato: T, si: "Optional[ArbolAVL[T]]" = None, sd: "Optional[ArbolAVL[T]]" = None) -> "ArbolAVL[T]":
+        nuevo = ArbolAVL()
+        nuevo.set_raiz(NodoAVL(dato, si, sd))
+        return nuevo
+
+    def _balance(self) -> int:
+        return self.si().altura() - self.sd().altura()
+
+    def _rotar_derecha(self) -> None:
+        izq = self.si()
+        nodo, nodo_izq = self.raiz, izq.raiz
+        nodo.si = nodo_izq.sd
+        izq._reemplazar_raiz(nodo)
+        nodo_izq.sd = izq
+        self._reemplazar_raiz(nodo_izq)
+        izq._enlazar()
+        self._enlazar()
+        izq._actualizar()
+        self._actualizar()
+
+    def _rotar_izquierda(self) -> None:
+        der = self.sd()
+        nodo, nodo_der = self.raiz, der.raiz
+        nodo.sd = nodo_der.si
+        der._reemplazar_raiz(nodo)
+        nodo_der.si = der
+        self._reemplazar_raiz(nodo_der)
+        der._enlazar()
+        self._enlazar()
+        der._actualizar()
+        self._actualizar()
+
+    def _rebalancear(self) -> None:
+        self._actualizar()
+        balance = self._balance()
+        if balance > 1:
+            if self.si()._balance() < 0:
+                self.si()._rotar_izquierda()
+            self._rotar_derecha()
+        elif balance < -1:
+            if self.sd()._balance() > 0:
+                self.sd()._rotar_derecha()
+            self._rotar_izquierda()
+
+    def insertar_si(self, arbol: "ArbolBinarioOrdenado[T]"):
+        raise TypeError("Un ArbolAVL sólo se modifica con insertar y eliminar")
+
+    def insertar_sd(self, arbol: "ArbolBinarioOrdenado[T]"):
+        raise TypeError("Un ArbolAVL sólo se modifica con insertar y eliminar")
+
+    def _insertar(self, valor: T):
+        if self.es_vacio():
+            self._reemplazar_raiz(NodoAVL(valor))
+            self._enlazar()
+            return
+        elif valor == self.dato():
+            raise ValueError("No se admiten repetidos!")
+        elif valor < self.dato():
+            self._si_propio()._insertar(valor)
+        else:
+            self._sd_propio()._insertar(valor)
+        self._rebalancear()
+
+    def _eliminar(self, valor: T) -> None:
+        if self.es_vacio():
+            return
+        elif valor < self.dato():
+            self.si()._eliminar(valor)
+        elif valor > self.dato():
+            self.sd()._eliminar(valor)
+        elif self.si().es_vacio() or self.sd().es_vacio():
+            hijo = self.sd() if self.si().es_vacio() else self.si()
+            self._reemplazar_raiz(hijo.raiz)
+            if self.es_vacio():
+                return
+            self._enlazar()
+        else:
+            # se reemplaza por el predecesor y se lo elimina del subárbol izquierdo
+            predecesor = self.si().max().dato()
+            self.raiz.dato = predecesor
+            self.si()._eliminar(predecesor)
+        self._rebalancear()
+
+    # En el AVL las bajas en bloque se hacen de a una para que cada una rebalancee
+    # su camino: O(k log n), sin que el árbol pierda el balance.
+    def eliminar_rango(self, a: T, b: T) -> None:
+        claves: List[T] = []
+        self._claves_entre(a, b, claves)
+        self.eliminar_muchos(claves)
+
+    def eliminar_muchos(self, valores: Iterable[T]) -> None:
+        for valor in set(valores):
+            self._eliminar(valor)
+        self._actualizar_antecesores()
 
 # Función principal para probar el funcionamiento del árbol binario ordenado
 def main():
@@ -158,10 +543,31 @@ def main():
     print(f'Ordenado?: {t.es_ordenado()}')
 
     print(f'Tiene 10: {t.pertenece(10)}')
+    print(f'Claves menores que 12: {t.rank(12)}, tercera clave: {t.select(2)}')
+    print(f'floor(14): {t.floor(14)}, ceiling(14): {t.ceiling(14)}, entre 5 y 15: {t.count_between(5, 15)}')
 
     print("se elimino")
     t.eliminar(10)
     print(t)
 
+    t.eliminar_rango(12, 17)
+    t.eliminar_muchos([2, 20])
+    print(f'Después de eliminar [12, 17], 2 y 20 quedan {len(t)} claves')
+    print(t)
+
+    avl: ArbolAVL[int] = ArbolAVL()
+    for i in range(1, 16):
+        avl.insertar(i)
+    print(avl)
+    print(f'Altura AVL con 15 claves ordenadas: {avl.altura()}')
+
+    t4 = ArbolBinarioOrdenado.desde_ordenados(range(1, 16))
+    print(f'Altura armando 15 claves de una vez: {t4.altura()}')
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta = os.path.join(carpeta, 't4.bin')
+        t4.guardar(ruta, 'q')
+        print(f'Guardado y cargado de nuevo: {ArbolBinarioOrdenado.cargar(ruta) == t4}')
+    print(ArbolBinarioOrdenado.convertir_ordenado(t))
+
 if __name__ == "__main__":
     main()
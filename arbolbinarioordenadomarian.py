@@ -1,5 +1,8 @@
-from typing import TypeVar, Optional, Protocol
+import gc
+from typing import Dict, Iterable, List, TypeVar, Optional, Protocol, Tuple
 from arbolbinarioMarian import ArbolBinario, NodoAB
+from recorridos import posorden
+from versiones import es_ajeno
 
 class Comparable(Protocol):
     def __lt__(self: 'T', otro: 'T') -> bool: ...
@@ -13,8 +16,17 @@ T = TypeVar('T', bound=Comparable)
 
 
 class NodoABO(NodoAB[T]):
-    def __init__(self, dato: T):
-        super().__init__(dato, ArbolBinarioOrdenado(), ArbolBinarioOrdenado())
+    __slots__ = ('tamanio', 'cota')
+
+    def __init__(self, dato: T, si: "Optional[ArbolBinarioOrdenado[T]]" = None, sd: "Optional[ArbolBinarioOrdenado[T]]" = None):
+        super().__init__(
+            dato,
+            ArbolBinarioOrdenado.vacio() if si is None else si,
+            ArbolBinarioOrdenado.vacio() if sd is None else sd
+        )
+        self.tamanio: int = 1 + len(self.si) + len(self.sd)
+        # (ordenado, mínimo, máximo) del subárbol; None hasta que se lo calcula
+        self.cota: Optional[Tuple[bool, Optional[T], Optional[T]]] = None
     
     def __lt__(self, otro: "NodoABO[T]") -> bool:
         return isinstance(otro, NodoABO) and self.dato < otro.dato
@@ -27,54 +39,382 @@ class NodoABO(NodoAB[T]):
     
     
 class ArbolBinarioOrdenado(ArbolBinario[T]):
+    '''
+    Los nodos guardan el tamaño de su subárbol, así len(), rank, select, floor,
+    ceiling y count_between bajan por un único camino y cuestan O(altura).
+
+    Con el antecesor de cada subárbol se corrigen los tamaños de los nodos de
+    arriba cuando se lo modifica directamente (por ejemplo con insertar_si).
+    El vacío compartido de la clase no tiene antecesor: insertar lo reemplaza por
+    un subárbol propio (_si_propio/_sd_propio) antes de colgarle el nodo nuevo.
+    '''
+    __slots__ = ()
+
     @staticmethod
-    def crear_nodo(dato: T) -> "ArbolBinarioOrdenado[T]":
+    def crear_nodo(dato: T, si: "Optional[ArbolBinarioOrdenado[T]]" = None, sd: "Optional[ArbolBinarioOrdenado[T]]" = None) -> "ArbolBinarioOrdenado[T]":
         nuevo = ArbolBinarioOrdenado()
-        nuevo.set_raiz(NodoABO(dato))
+        nuevo.set_raiz(NodoABO(dato, si, sd))
         return nuevo
+
+    @classmethod
+    def desde_ordenados(cls, datos: Iterable[T]) -> "ArbolBinarioOrdenado[T]":
+        '''
+        Arma en O(n) un árbol perfectamente balanceado con datos que ya vienen en
+        orden estrictamente creciente: la raíz de cada subárbol es el elemento del
+        medio de su rango.
+        '''
+        valores = list(datos)
+        for i in range(1, len(valores)):
+            if not valores[i - 1] < valores[i]:
+                raise ValueError("Los datos deben estar en orden creciente y sin repetidos")
+
+        def construir(desde: int, hasta: int) -> "ArbolBinarioOrdenado[T]":
+            if desde >= hasta:
+                return cls.vacio()
+            medio = (desde + hasta) // 2
+            return cls.crear_nodo(valores[medio], construir(desde, medio), construir(medio + 1, hasta))
+
+        # armar millones de nodos dispara el recolector de ciclos una y otra vez
+        # sin que haya nada para liberar, así que se lo pausa durante la carga
+        recolector_activo = gc.isenabled()
+        gc.disable()
+        try:
+            return construir(0, len(valores)) if valores else cls()
+        finally:
+            if recolector_activo:
+                gc.enable()
+
+    def __len__(self) -> int:
+        return 0 if self.es_vacio() else self.raiz.tamanio
+
+    # Hijo en el que se va a escribir: el vacío compartido y uno de otra versión
+    # (ver ArbolBinario.copy) se reemplazan por una copia, y uno de esta versión
+    # que las copias pueden estar compartiendo se desprende antes.
+    def _si_propio(self) -> "ArbolBinarioOrdenado[T]":
+        si = self.raiz.si
+        if si._es_compartido() or es_ajeno(si._duenio, self._duenio):
+            si = self.raiz.si = self._copia_propia(si)
+        elif si._duenio is not None and si._duenio.atajo is not None:
+            si._desprender(si._duenio)
+        return si
+
+    def _sd_propio(self) -> "ArbolBinarioOrdenado[T]":
+        sd = self.raiz.sd
+        if sd._es_compartido() or es_ajeno(sd._duenio, self._duenio):
+            sd = self.raiz.sd = self._copia_propia(sd)
+        elif sd._duenio is not None and sd._duenio.atajo is not None:
+            sd._desprender(sd._duenio)
+        return sd
+
+    def _actualizar(self) -> None:
+        self.raiz.tamanio = 1 + len(self.raiz.si) + len(self.raiz.sd)
+        self.raiz.cota = None
+        # los antecesores se actualizan después (ver _actualizar_antecesores)
+        self._indice = None
+
+    def _actualizar_antecesores(self) -> None:
+        t = self.antecesor
+        while t is not None and not t.es_vacio():
+            t._actualizar()
+            t = t.antecesor
     
+    @staticmethod
+    def _cotas(arbol: ArbolBinario[T]) -> Tuple[bool, Optional[T], Optional[T]]:
+        '''
+        Devuelve (ordenado, mínimo, máximo) del subárbol. En los NodoABO el resultado
+        queda guardado hasta que _actualizar lo invalida, así que sólo se recorren
+        los subárboles que cambiaron desde la última consulta.
+        '''
+        if arbol.es_vacio():
+            return True, None, None
+        cota = getattr(arbol.raiz, 'cota', None)
+        if cota is not None:
+            return cota
+
+        # posorden (recorridos.posorden, sin recursión) sólo sobre los subárboles sin
+        # cota guardada: al llegar a un nodo sus dos hijos ya la tienen. Los nodos que
+        # no son NodoABO no tienen dónde guardarla y la dejan en calculadas.
+        calculadas: Dict[int, Tuple[bool, Optional[T], Optional[T]]] = {}
+
+        def cota_de(t: ArbolBinario[T]) -> Tuple[bool, Optional[T], Optional[T]]:
+            if t.es_vacio():
+                return True, None, None
+            guardada = getattr(t.raiz, 'cota', None)
+            return guardada if guardada is not None else calculadas[id(t)]
+
+        def sin_cota(t: ArbolBinario[T]) -> List[ArbolBinario[T]]:
+            return [h for h in (t.raiz.si, t.raiz.sd) if not h.es_vacio() and getattr(h.raiz, 'cota', None) is None]
+
+        for t in posorden(arbol, sin_cota):
+            ordenado_si, minimo_si, maximo_si = cota_de(t.raiz.si)
+            ordenado_sd, minimo_sd, maximo_sd = cota_de(t.raiz.sd)
+            dato = t.raiz.dato
+            cota = (
+                ordenado_si and ordenado_sd
+                    and (maximo_si is None or maximo_si < dato)
+                    and (minimo_sd is None or dato < minimo_sd),
+                dato if minimo_si is None else minimo_si,
+                dato if maximo_sd is None else maximo_sd
+            )
+            if isinstance(t.raiz, NodoABO):
+                t.raiz.cota = cota
+            else:
+                calculadas[id(t)] = cota
+        return cota_de(arbol)
+
+    @staticmethod
+    def _encaja(arbol: ArbolBinario[T], minimo: Optional[T], maximo: Optional[T]) -> bool:
+        ordenado, menor, mayor = ArbolBinarioOrdenado._cotas(arbol)
+        return ordenado and (arbol.es_vacio() or (
+            (minimo is None or minimo < menor) and (maximo is None or mayor < maximo)
+        ))
+
     def es_ordenado(self) -> bool:
-        def es_ordenado_interna(
-            arbol: "ArbolBinarioOrdenado[T]", 
-            minimo: Optional[T] = None, 
-            maximo: Optional[T] = None
-        ) -> bool:
-            if arbol.es_vacio():
-                return True
-            if (minimo is not None and arbol.dato() <= minimo) or (maximo is not None and arbol.dato() >= maximo):
-                return False
-            return es_ordenado_interna(arbol.si(), minimo, arbol.dato()) and es_ordenado_interna(arbol.sd(), arbol.dato(), maximo)
-        
-        return es_ordenado_interna(self)
+        return self._cotas(self)[0]
     
     def insertar_si(self, arbol: "ArbolBinarioOrdenado[T]"):
-        si = self.si()
-        super().insertar_si(arbol)
-        if not self.es_ordenado():
-            super().insertar_si(si)
+        # se valida antes de colgarlo: el árbol nuevo contra el dato de la raíz y
+        # el otro subárbol (que ya tiene sus cotas calculadas) contra el mismo dato
+        if not (self._encaja(arbol, None, self.dato()) and self._encaja(self.raiz.sd, self.dato(), None)):
             raise ValueError("El árbol a insertar no es ordenado o viola la propiedad de orden del árbol actual")
+        super().insertar_si(arbol)
+        self._actualizar()
+        self._actualizar_antecesores()
     
     def insertar_sd(self, arbol: "ArbolBinarioOrdenado[T]"):
-        sd = self.sd()
-        super().insertar_sd(arbol)
-        if not self.es_ordenado():
-            super().insertar_sd(sd)
+        # se valida antes de colgarlo: el árbol nuevo contra el dato de la raíz y
+        # el otro subárbol (que ya tiene sus cotas calculadas) contra el mismo dato
+        if not (self._encaja(arbol, self.dato(), None) and self._encaja(self.raiz.si, None, self.dato())):
             raise ValueError("El árbol a insertar no es ordenado o viola la propiedad de orden del árbol actual")
+        super().insertar_sd(arbol)
+        self._actualizar()
+        self._actualizar_antecesores()
     
     def insertar(self, valor: T):
+        self._antes_de_escribir()
+        self._insertar(valor)
+        self._actualizar_antecesores()
+
+    def _insertar(self, valor: T):
         if self.es_vacio():
-            self.set_raiz(NodoABO(valor))
+            # el subárbol ya está listo para escribir (insertar y _si_propio/_sd_propio)
+            self.raiz = NodoABO(valor)
+            self._indice = None
+            return
         elif valor < self.dato():
-            self.si().insertar(valor)
+            self._si_propio()._insertar(valor)
         else:
-            self.sd().insertar(valor)
+            self._sd_propio()._insertar(valor)
+        self._actualizar()
 
     def pertenece(self, valor: T) -> bool:
-        pass
+        actual = self
+        while not actual.es_vacio():
+            if valor == actual.dato():
+                return True
+            actual = actual.raiz.si if valor < actual.dato() else actual.raiz.sd
+        return False
+
+    def _contar_menores(self, valor: T, incluir_igual: bool) -> int:
+        cantidad = 0
+        actual = self
+        while not actual.es_vacio():
+            if actual.dato() < valor or (incluir_igual and actual.dato() == valor):
+                cantidad += len(actual.raiz.si) + 1
+                actual = actual.raiz.sd
+            else:
+                actual = actual.raiz.si
+        return cantidad
+
+    def rank(self, x: T) -> int:
+        '''
+        Cantidad de claves menores que x.
+        '''
+        return self._contar_menores(x, False)
+
+    def select(self, k: int) -> T:
+        '''
+        k-ésima clave en orden, empezando en 0.
+        '''
+        if k < 0 or k >= len(self):
+            raise IndexError("Posición fuera de rango")
+        actual = self
+        while True:
+            izquierda = len(actual.raiz.si)
+            if k < izquierda:
+                actual = actual.raiz.si
+            elif k == izquierda:
+                return actual.dato()
+            else:
+                k -= izquierda + 1
+                actual = actual.raiz.sd
+
+    def floor(self, x: T) -> Optional[T]:
+        '''
+        Mayor clave <= x, o None.
+        '''
+        candidato = None
+        actual = self
+        while not actual.es_vacio():
+            if actual.dato() == x:
+                return actual.dato()
+            elif actual.dato() < x:
+                candidato = actual.dato()
+                actual = actual.raiz.sd
+            else:
+                actual = actual.raiz.si
+        return candidato
+
+    def ceiling(self, x: T) -> Optional[T]:
+        '''
+        Menor clave >= x, o None.
+        '''
+        candidato = None
+        actual = self
+        while not actual.es_vacio():
+            if actual.dato() == x:
+                return actual.dato()
+            elif actual.dato() > x:
+                candidato = actual.dato()
+                actual = actual.raiz.si
+            else:
+                actual = actual.raiz.sd
+        return candidato
+
+    def count_between(self, a: T, b: T) -> int:
+        '''
+        Cantidad de claves x con a <= x <= b.
+        '''
+        if b < a:
+            return 0
+        return self._contar_menores(b, True) - self._contar_menores(a, False)
+
+    @classmethod
+    def convertir_ordenado(cls, arbol_binario: ArbolBinario[T]) -> "ArbolBinarioOrdenado[T]":
+        '''
+        Junta los datos de cualquier árbol binario, los ordena y arma con ellos un
+        árbol ordenado balanceado en O(n log n).
+        '''
+        return cls.desde_ordenados(sorted(arbol_binario.inorder()))
+
+
+class NodoAVL(NodoABO[T]):
+    __slots__ = ('altura',)
+
+    def __init__(self, dato: T, si: "Optional[ArbolAVL[T]]" = None, sd: "Optional[ArbolAVL[T]]" = None):
+        super().__init__(dato, ArbolAVL.vacio() if si is None else si, ArbolAVL.vacio() if sd is None else sd)
+        self.altura: int = 1 + max(self.si.altura(), self.sd.altura())
+
+
+class ArbolAVL(ArbolBinarioOrdenado[T]):
+    '''
+    Árbol binario ordenado autobalanceado (AVL). Cada nodo guarda la altura de su
+    subárbol; insertar y eliminar la recalculan en el camino de vuelta y rotan
+    cuando un nodo queda desbalanceado, así la altura queda en O(log n).
+
+    Las rotaciones mueven nodos entre los mismos objetos ArbolAVL: si(), sd() y
+    dato() se siguen usando igual que en el árbol sin balancear. Como insertar,
+    bajan por _si_propio/_sd_propio, que no escriben nodos que comparte otra versión.
+    '''
+    __slots__ = ()
 
     @staticmethod
-    def convertir_ordenado(arbol_binario: ArbolBinario[T]) -> "ArbolBinarioOrdenado[T]":
-        pass
+    def crear_nodo(dato: T, si: "Optional[ArbolAVL[T]]" = None, sd: "Optional[ArbolAVL[T]]" = None) -> "ArbolAVL[T]":
+        nuevo = ArbolAVL()
+        nuevo.set_raiz(NodoAVL(dato, si, sd))
+        return nuevo
+
+    def altura(self) -> int:
+        return 0 if self.es_vacio() else self.raiz.altura
+
+    def _actualizar(self) -> None:
+        super()._actualizar()
+        self.raiz.altura = 1 + max(self.raiz.si.altura(), self.raiz.sd.altura())
+
+    def _balance(self) -> int:
+        return self.raiz.si.altura() - self.raiz.sd.altura()
+
+    def _rotar_derecha(self) -> None:
+        izq = self._si_propio()
+        nodo, nodo_izq = self.raiz, izq.raiz
+        nodo.si = nodo_izq.sd
+        izq.raiz = nodo
+        nodo_izq.sd = izq
+        self.raiz = nodo_izq
+        izq._enlazar()
+        self._enlazar()
+        izq._actualizar()
+        self._actualizar()
+
+    def _rotar_izquierda(self) -> None:
+        der = self._sd_propio()
+        nodo, nodo_der = self.raiz, der.raiz
+        nodo.sd = nodo_der.si
+        der.raiz = nodo
+        nodo_der.si = der
+        self.raiz = nodo_der
+        der._enlazar()
+        self._enlazar()
+        der._actualizar()
+        self._actualizar()
+
+    def _rebalancear(self) -> None:
+        self._actualizar()
+        balance = self._balance()
+        if balance > 1:
+            if self.raiz.si._balance() < 0:
+                self._si_propio()._rotar_izquierda()
+            self._rotar_derecha()
+        elif balance < -1:
+            if self.raiz.sd._balance() > 0:
+                self._sd_propio()._rotar_derecha()
+            self._rotar_izquierda()
+
+    def insertar_si(self, arbol: "ArbolBinarioOrdenado[T]"):
+        raise TypeError("Un ArbolAVL sólo se modifica con insertar y eliminar")
+
+    def insertar_sd(self, arbol: "ArbolBinarioOrdenado[T]"):
+        raise TypeError("Un ArbolAVL sólo se modifica con insertar y eliminar")
+
+    def _insertar(self, valor: T):
+        if self.es_vacio():
+            # el subárbol ya está listo para escribir (insertar y _si_propio/_sd_propio)
+            self.raiz = NodoAVL(valor)
+            self._indice = None
+            return
+        elif valor < self.dato():
+            self._si_propio()._insertar(valor)
+        else:
+            self._sd_propio()._insertar(valor)
+        self._rebalancear()
+
+    def eliminar(self, valor: T) -> None:
+        self._antes_de_escribir()
+        self._eliminar(valor)
+        self._actualizar_antecesores()
+
+    def _eliminar(self, valor: T) -> None:
+        if self.es_vacio():
+            return
+        elif valor < self.dato():
+            self._si_propio()._eliminar(valor)
+        elif valor > self.dato():
+            self._sd_propio()._eliminar(valor)
+        elif self.raiz.si.es_vacio() or self.raiz.sd.es_vacio():
+            if self.raiz.si.es_vacio() and self.raiz.sd.es_vacio():
+                self.raiz = None
+                return
+            hijo = self._sd_propio() if self.raiz.si.es_vacio() else self._si_propio()
+            self.raiz = hijo.raiz
+            self._enlazar()
+        else:
+            # se reemplaza por el predecesor (máximo del subárbol izquierdo)
+            predecesor = self.raiz.si
+            while not predecesor.raiz.sd.es_vacio():
+                predecesor = predecesor.raiz.sd
+            self.raiz.dato = predecesor.dato()
+            self._si_propio()._eliminar(predecesor.dato())
+        self._rebalancear()
         
 
 def main():
@@ -100,6 +440,24 @@ def main():
     print(f'Ordenado?: {t.es_ordenado()}')
 
     print(f'Tiene 12: {t.pertenece(12)}')
+    print(f'Claves menores que 12: {t.rank(12)}, tercera clave: {t.select(2)}')
+    print(f'floor(14): {t.floor(14)}, ceiling(14): {t.ceiling(14)}, entre 5 y 15: {t.count_between(5, 15)}')
+
+    avl: ArbolAVL[int] = ArbolAVL()
+    for i in range(1, 16):
+        avl.insertar(i)
+    print(avl)
+    print(f'Altura AVL con 15 claves ordenadas: {avl.altura()}')
+
+    instantanea = avl.copy()
+    avl.insertar(16)
+    avl.eliminar(1)
+    print(f'Instantánea: {instantanea.inorder()}')
+    print(f'AVL después de insertar 16 y eliminar 1: {avl.inorder()}')
+
+    t4 = ArbolBinarioOrdenado.desde_ordenados(range(1, 16))
+    print(f'Altura armando 15 claves de una vez: {t4.altura()}')
+    print(ArbolBinarioOrdenado.convertir_ordenado(t))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
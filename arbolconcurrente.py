@@ -0,0 +1,115 @@
+'''
+Árbol ordenado compartido entre hilos, con lecturas sobre instantáneas.
+
+Los escritores se turnan con un lock y nunca tocan la versión que están leyendo
+los demás: cada modificación se hace sobre una copy() de la versión publicada
+(arbolbinarioordenadomarian: copia por camino, O(altura) nodos nuevos) y al
+terminar la versión nueva se publica con una sola asignación. Los lectores toman
+la versión publicada sin lock y leen un árbol que ya nadie modifica, así que
+nunca esperan a un escritor ni ven un estado a medias: una excepción en medio
+de una modificación (por ejemplo insertar_si con un subárbol que no encaja)
+descarta la copia y la versión publicada queda como estaba.
+
+Las consultas de la instantánea (pertenece, rank, select, floor, ceiling,
+count_between, los recorridos) leen los nodos sin copiarlos. Para varias
+consultas que tienen que ver el mismo estado, instantanea() devuelve la versión
+entera; no hay que modificarla.
+'''
+import threading
+from typing import Callable, Generic, Iterable, Iterator, List, Optional, TypeVar
+
+from arbolbinarioordenadomarian import ArbolAVL, ArbolBinarioOrdenado
+
+T = TypeVar('T')
+
+
+class ArbolConcurrente(Generic[T]):
+    def __init__(self, arbol: Optional[ArbolBinarioOrdenado[T]] = None):
+        '''
+        arbol es la versión inicial (por defecto un ArbolAVL vacío). No se copia:
+        después de pasarlo sólo hay que modificarlo a través de ArbolConcurrente.
+        '''
+        self._publicado: ArbolBinarioOrdenado[T] = ArbolAVL() if arbol is None else arbol
+        self._escritura = threading.Lock()
+
+    def instantanea(self) -> ArbolBinarioOrdenado[T]:
+        return self._publicado
+
+    def modificar(self, cambio: Callable[[ArbolBinarioOrdenado[T]], None]) -> None:
+        '''
+        Aplica cambio a una versión nueva y la publica: todo lo que haga cambio se
+        ve junto o no se ve. Es la forma de agrupar varias altas y bajas en una
+        sola copia.
+        '''
+        with self._escritura:
+            nuevo = self._publicado.copy()
+            cambio(nuevo)
+            self._publicado = nuevo
+
+    def insertar(self, valor: T) -> None:
+        self.modificar(lambda t: t.insertar(valor))
+
+    def eliminar(self, valor: T) -> None:
+        self.modificar(lambda t: t.eliminar(valor))
+
+    def insertar_muchos(self, valores: Iterable[T]) -> None:
+        def insertar_todos(t: ArbolBinarioOrdenado[T]) -> None:
+            for valor in valores:
+                t.insertar(valor)
+        self.modificar(insertar_todos)
+
+    def __len__(self) -> int:
+        return len(self._publicado)
+
+    def __iter__(self) -> Iterator[T]:
+        return self._publicado.iter_inorder()
+
+    def inorder(self) -> List[T]:
+        return self._publicado.inorder()
+
+    def pertenece(self, valor: T) -> bool:
+        return self._publicado.pertenece(valor)
+
+    def rank(self, x: T) -> int:
+        return self._publicado.rank(x)
+
+    def select(self, k: int) -> T:
+        return self._publicado.select(k)
+
+    def floor(self, x: T) -> Optional[T]:
+        return self._publicado.floor(x)
+
+    def ceiling(self, x: T) -> Optional[T]:
+        return self._publicado.ceiling(x)
+
+    def count_between(self, a: T, b: T) -> int:
+        return self._publicado.count_between(a, b)
+
+
+def main():
+    arbol: ArbolConcurrente[int] = ArbolConcurrente()
+    arbol.insertar_muchos(range(0, 100, 2))
+
+    def escritor(desde: int) -> None:
+        for x in range(desde, 100, 4):
+            arbol.insertar(x)
+            arbol.eliminar(x - 1)
+
+    def lector(validas: List[bool]) -> None:
+        for _ in range(200):
+            t = arbol.instantanea()
+            validas.append(t.es_ordenado() and len(t) == len(t.inorder()))
+
+    validas: List[bool] = []
+    hilos = [threading.Thread(target=escritor, args=(d,)) for d in (1, 3)]
+    hilos += [threading.Thread(target=lector, args=(validas,)) for _ in range(2)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    print(f'Claves al final: {len(arbol)}  ordenado: {arbol.instantanea().es_ordenado()}')
+    print(f'Instantáneas leídas: {len(validas)}  todas consistentes: {all(validas)}')
+    print(f'rank(50): {arbol.rank(50)}  select(10): {arbol.select(10)}  floor(51): {arbol.floor(51)}')
+
+if __name__ == '__main__':
+    main()
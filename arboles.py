@@ -1,24 +1,95 @@
-from typing import Generic, Optional, TypeVar,List,Callable
+from typing import Any, Dict, Generic, Iterable, Iterator, Optional, TextIO, Tuple, TypeVar,List,Callable, Union
+from arbolbinariocompacto import ArbolBinarioCompacto
+from recorridos import (
+    Entrada, ancho_maximo, buscar_por_niveles, camino_de, escribir_sangrado, iguales, indice_de_valores, inorden,
+    niveles, plegar, por_niveles, posorden, preorden, preorden_con_nivel, resolver_caminos
+)
 
 
 T = TypeVar('T')
 
 class NodoAB(Generic[T]):
+    __slots__ = ('dato', 'si', 'sd', 'tamanio', 'altura', 'huella')
+
     def __init__(self, dato: T, si: Optional['ArbolBinario[T]'] = None, sd: Optional['ArbolBinario[T]'] = None):
         self.dato: T = dato
-        self.si: 'ArbolBinario[T]' = ArbolBinario() if si is None else si
-        self.sd: 'ArbolBinario[T]' = ArbolBinario() if sd is None else sd
+        self.si: 'ArbolBinario[T]' = ArbolBinario.vacio() if si is None else si
+        self.sd: 'ArbolBinario[T]' = ArbolBinario.vacio() if sd is None else sd
+        # cantidad de nodos y altura del subárbol, se leen de los hijos en O(1)
+        self.tamanio: int = 1 + len(self.si) + len(self.sd)
+        self.altura: int = 1 + max(self.si.altura(), self.sd.altura())
+        # hash estructural del subárbol, se calcula recién cuando se pide (ver ArbolBinario.huella)
+        self.huella: Optional[int] = None
+
+# árbol vacío compartido de cada clase, ver ArbolBinario.vacio()
+_VACIOS: Dict[type, 'ArbolBinario'] = {}
+
+# bit de cada instrucción en un camino compilado, ver ArbolBinario.compilar_camino()
+_BITS = {'izquierda': '0', 'derecha': '1'}
+
+# huella del árbol vacío, ver ArbolBinario.huella()
+_HUELLA_VACIO = 0
 
 class ArbolBinario(Generic[T]):
+    '''
+    Los hijos que faltan no son un ArbolBinario() nuevo por nodo sino el árbol vacío
+    compartido de la clase (vacio()). Ese árbol no se modifica nunca: las operaciones
+    que cuelgan algo donde no había nada piden primero un hijo propio con
+    _si_propio()/_sd_propio(), que reemplaza la referencia en el nodo padre.
+
+    Cada nodo guarda el tamaño y la altura de su subárbol, así len() y altura() son
+    O(1). insertar_si, insertar_sd y set_raiz los recalculan en el nodo modificado y
+    en sus antecesores: O(profundidad) por modificación. es_consistente() verifica
+    que los valores guardados coincidan con los del árbol.
+
+    Por eso un subárbol cuelga de un único padre: insertar_si, insertar_sd,
+    set_raiz y crear_nodo rechazan (ValueError) uno que ya es hijo de otro nodo,
+    porque el recálculo sólo llegaría a uno de los dos. Para ponerlo en dos lugares
+    hay que insertar una copia.
+
+    indexar() es opcional: arma un índice dato -> nivel y camino para las consultas
+    repetidas; el mismo recálculo de los antecesores lo descarta, igual que la
+    huella() guardada en cada nodo que usa __eq__ para descartar en O(1).
+    '''
+    __slots__ = ('raiz', 'antecesor', '_indice')
+
     def __init__(self):
         self.raiz: Optional[NodoAB[T]] = None
         self.antecesor: Optional['ArbolBinario[T]'] = None
+        self._indice: Optional[Dict[T, Entrada]] = None
+
+    @classmethod
+    def vacio(cls) -> 'ArbolBinario[T]':
+        vacio = _VACIOS.get(cls)
+        if vacio is None:
+            vacio = _VACIOS[cls] = cls()
+        return vacio
+
+    def _es_compartido(self) -> bool:
+        return _VACIOS.get(type(self)) is self
+
+    def _es_inmutable(self) -> bool:
+        # el vacío compartido y los árboles de una FabricaArboles (ArbolInmutable):
+        # pueden colgar de varios padres, así que no tienen antecesor
+        return self._es_compartido()
 
     def set_raiz(self, nueva_raiz: Optional[NodoAB[T]]) -> None:
         """
         Establece la raíz del árbol como el nodo dado.
         """
+        if nueva_raiz is not None:
+            self._comprobar_injerto(nueva_raiz.si)
+            self._comprobar_injerto(nueva_raiz.sd)
+        self._reemplazar_raiz(nueva_raiz)
+        if nueva_raiz is not None:
+            self._enlazar()
+        self._actualizar_antecesores()
+
+    def _reemplazar_raiz(self, nueva_raiz: Optional[NodoAB[T]]) -> None:
+        if self._es_compartido():
+            raise TypeError('El árbol vacío compartido no se puede modificar')
         self.raiz = nueva_raiz
+        self._indice = None
     
     def es_vacio(self) -> bool:
         return self.raiz is None
@@ -26,24 +97,88 @@ class ArbolBinario(Generic[T]):
     @staticmethod
     def crear_nodo(dato: T, si: Optional['ArbolBinario[T]'] = None, sd: Optional['ArbolBinario[T]'] = None) -> 'ArbolBinario[T]':
         t = ArbolBinario()
+        for hijo in (si, sd):
+            if hijo is not None:
+                t._comprobar_injerto(hijo)
         t.raiz = NodoAB(dato, si, sd)
-        if si:
-            si.antecesor = t
-        if sd:
-            sd.antecesor = t
+        t._enlazar()
         return t
 
+    def _enlazar(self) -> None:
+        # un subárbol inmutable no vacío (de una FabricaArboles) no se puede modificar
+        # desde acá, así que se cuelga una copia; al vacío compartido no se le asigna
+        # antecesor porque no tiene uno solo
+        nodo = self.raiz
+        if nodo.si._es_inmutable() and not nodo.si._es_compartido():
+            nodo.si = self._copia_mutable(nodo.si)
+        if nodo.sd._es_inmutable() and not nodo.sd._es_compartido():
+            nodo.sd = self._copia_mutable(nodo.sd)
+        for hijo in (nodo.si, nodo.sd):
+            if not hijo._es_inmutable():
+                hijo.antecesor = self
+
+    def _copia_mutable(self, arbol: 'ArbolBinario[T]') -> 'ArbolBinario[T]':
+        clase = type(self)
+        return plegar(
+            arbol, ArbolBinario._hijos,
+            lambda t, hijos: clase.vacio() if t.es_vacio() else clase.crear_nodo(t.raiz.dato, *hijos)
+        )
+
+    def _comprobar_injerto(self, arbol: 'ArbolBinario[T]', actual: Optional['ArbolBinario[T]'] = None) -> None:
+        # actual es el subárbol que está en el lugar donde se cuelga arbol: volver a
+        # colgar el mismo no cambia nada
+        padre = arbol.antecesor
+        if arbol is actual or padre is None or padre.raiz is None:
+            return
+        if padre.raiz.si is arbol or padre.raiz.sd is arbol:
+            raise ValueError('El subárbol ya cuelga de otro nodo: hay que insertar una copia')
+
+    def _actualizar(self) -> None:
+        nodo = self.raiz
+        nodo.tamanio = 1 + len(nodo.si) + len(nodo.sd)
+        nodo.altura = 1 + max(nodo.si.altura(), nodo.sd.altura())
+        nodo.huella = None
+        self._indice = None
+
+    def _actualizar_antecesores(self) -> None:
+        # se recalcula a partir de los hijos, no se suma una diferencia: un antecesor
+        # que quedó viejo (el subárbol ya no cuelga de él) sólo cuesta trabajo de más
+        t = self.antecesor
+        while t is not None and not t.es_vacio():
+            t._actualizar()
+            t = t.antecesor
+
+    def _si_propio(self) -> 'ArbolBinario[T]':
+        si = self.raiz.si
+        if si._es_compartido():
+            si = self.raiz.si = type(si)()
+            si.antecesor = self
+        return si
+
+    def _sd_propio(self) -> 'ArbolBinario[T]':
+        sd = self.raiz.sd
+        if sd._es_compartido():
+            sd = self.raiz.sd = type(sd)()
+            sd.antecesor = self
+        return sd
+
     def insertar_si(self, si: 'ArbolBinario[T]'):
         if self.es_vacio():
             raise TypeError('Árbol vacío')
+        self._comprobar_injerto(si, self.raiz.si)
         self.raiz.si = si
-        self.raiz.si.antecesor = self
+        self._enlazar()
+        self._actualizar()
+        self._actualizar_antecesores()
 
     def insertar_sd(self, sd: 'ArbolBinario[T]'):
         if self.es_vacio():
             raise TypeError('Árbol vacío')
+        self._comprobar_injerto(sd, self.raiz.sd)
         self.raiz.sd = sd
-        self.raiz.sd.antecesor = self
+        self._enlazar()
+        self._actualizar()
+        self._actualizar_antecesores()
 
 
     def si(self) -> 'ArbolBinario[T]':
@@ -64,52 +199,226 @@ class ArbolBinario(Generic[T]):
     def es_hoja(self) -> bool:
         return not self.es_vacio() and self.si().es_vacio() and self.sd().es_vacio()
 
+    # Los recorridos usan el motor de recorridos.py (pila explícita), así no dependen
+    # del límite de recursión de Python en árboles degenerados.
+    def _hijos(self) -> List['ArbolBinario[T]']:
+        return [] if self.raiz is None else [self.raiz.si, self.raiz.sd]
+
+    def _no_vacios(self) -> List['ArbolBinario[T]']:
+        # lo llaman todos los recorridos por cada nodo: sin comprensión ni llamadas
+        if self.raiz is None:
+            return []
+        si, sd = self.raiz.si, self.raiz.sd
+        if si.raiz is None:
+            return [] if sd.raiz is None else [sd]
+        return [si] if sd.raiz is None else [si, sd]
+
     def altura(self) -> int:
-        if self.es_vacio():
-            return 0
-        else:
-            return 1 + max(self.si().altura(), self.sd().altura())
+        return 0 if self.raiz is None else self.raiz.altura
 
     def __len__(self) -> int:
+        return 0 if self.raiz is None else self.raiz.tamanio
+
+    def es_consistente(self) -> bool:
+        '''
+        Recorre todo el árbol (O(n)) comprobando que cada nodo tenga guardados el
+        tamaño y la altura correctos y que sus hijos lo tengan como antecesor.
+        Pensado para pruebas: altura() y len() confían en esos valores.
+        '''
         if self.es_vacio():
-            return 0
-        else:
-            return 1 + len(self.si()) + len(self.sd())
+            return True
+        for t in posorden(self, ArbolBinario._no_vacios):
+            nodo = t.raiz
+            si, sd = nodo.si, nodo.sd
+            # en posorden los hijos ya se comprobaron, así que sus valores son correctos
+            if nodo.tamanio != 1 + len(si) + len(sd) or nodo.altura != 1 + max(si.altura(), sd.altura()):
+                return False
+            if any(not h._es_inmutable() and h.antecesor is not t for h in (si, sd)):
+                return False
+        return True
         
     
     def nivel_nodo(self, valor: T, nivel: int = 0) -> int:
         if self.es_vacio():
             return -1
-        if self.raiz.dato == valor:
-            return nivel
-        si_nivel = self.si().nivel_nodo(valor, nivel + 1)
-        if si_nivel != -1:
-            return si_nivel
-        return self.sd().nivel_nodo(valor, nivel + 1)
+        if self._indice is not None:
+            entrada = self._indice.get(valor)
+            return -1 if entrada is None else nivel + entrada[0]
+        for t, profundidad in preorden_con_nivel(self, ArbolBinario._no_vacios):
+            if t.raiz.dato == valor:
+                return nivel + profundidad
+        return -1
     
+    def _hijos_con_direccion(self) -> List[Tuple[str, 'ArbolBinario[T]']]:
+        si, sd = self.raiz.si, self.raiz.sd
+        return [(d, h) for d, h in (('izquierda', si), ('derecha', sd)) if h.raiz is not None]
+
+    def indexar(self) -> None:
+        '''
+        Arma en una pasada el índice dato -> (nivel, camino desde la raíz) que usan
+        nivel_nodo, nivel_muchos y camino. insertar_si, insertar_sd, set_raiz y las
+        altas y bajas del árbol ordenado lo descartan en el subárbol modificado y en
+        sus antecesores. Con datos repetidos vale el primero en preorden, como en
+        nivel_nodo. Los datos tienen que ser hashables.
+        '''
+        if not self.es_vacio():
+            self._indice = indice_de_valores(self, ArbolBinario._hijos_con_direccion, lambda t: t.raiz.dato)
+
+    def nivel_muchos(self, valores: Iterable[T]) -> List[int]:
+        '''
+        nivel_nodo de cada valor: O(n) para armar el índice si no está y O(1) por valor.
+        '''
+        if self.es_vacio():
+            return [-1 for _ in valores]
+        if self._indice is None:
+            self.indexar()
+        indice = self._indice
+        return [-1 if (entrada := indice.get(valor)) is None else entrada[0] for valor in valores]
+
+    def camino(self, valor: T) -> Optional[List[str]]:
+        '''
+        Instrucciones para recorrido_guiado desde la raíz hasta valor, o None si no está.
+        '''
+        if self.es_vacio():
+            return None
+        if self._indice is None:
+            self.indexar()
+        entrada = self._indice.get(valor)
+        return None if entrada is None else camino_de(entrada)
+
+    def render(
+        self, sink: Optional[TextIO] = None, max_nodes: Optional[int] = None, max_depth: Optional[int] = None
+    ) -> None:
+        '''
+        Escribe el árbol en sink (por defecto la salida estándar), un renglón por
+        subárbol con sangría según el nivel y 'AV' para los vacíos, sin recursión y
+        de a bloques de renglones. max_nodes y max_depth cortan la salida y agregan
+        un renglón con la cantidad de subárboles que quedaron sin mostrar.
+        '''
+        escribir_sangrado(
+            self, ArbolBinario._hijos, lambda t: 'AV' if t.raiz is None else str(t.raiz.dato),
+            sink, max_nodes, max_depth, ArbolBinario.es_vacio
+        )
+
+    def guardar(self, ruta: str, tipo: Optional[str] = None) -> None:
+        '''
+        Guarda el árbol en el formato binario de ArbolBinarioCompacto. Con un código
+        de tipo de array ('q', 'd', ...) los datos se escriben empaquetados en lugar
+        de en pickle.
+        '''
+        ArbolBinarioCompacto.desde_arbol(self, tipo).guardar(ruta)
+
+    @classmethod
+    def cargar(cls, ruta: str, permitir_pickle: bool = False) -> 'ArbolBinario[T]':
+        '''
+        Lee un árbol escrito con guardar() y lo arma con la forma original, sin
+        comparaciones ni rebalanceos: cls.cargar devuelve un árbol de la clase cls.
+        Para sólo consultarlo alcanza con ArbolBinarioCompacto.cargar, que no crea nodos.
+        Si se guardó sin tipo, los datos están en pickle y hace falta
+        permitir_pickle=True, sólo para archivos de confianza (ver ArbolBinarioCompacto.cargar).
+        '''
+        arbol = ArbolBinarioCompacto.cargar(ruta, permitir_pickle).a_arbol(cls.crear_nodo)
+        return cls() if arbol is None else arbol
+
+    def _sin_huella(self) -> List['ArbolBinario[T]']:
+        return [h for h in (self.raiz.si, self.raiz.sd) if h.raiz is not None and h.raiz.huella is None]
+
+    def huella(self) -> int:
+        '''
+        Hash estructural (de Merkle) del subárbol: el hash del dato combinado con
+        las huellas de los hijos. Queda guardada en cada nodo y el recálculo de los
+        antecesores de cada modificación la borra, así que sólo se vuelve a calcular
+        el camino modificado. Árboles iguales tienen la misma huella; con huellas
+        distintas los árboles son distintos. Los datos tienen que ser hashables.
+        '''
+        if self.raiz is None:
+            return _HUELLA_VACIO
+        if self.raiz.huella is None:
+            for t in posorden(self, ArbolBinario._sin_huella):
+                nodo = t.raiz
+                si, sd = nodo.si.raiz, nodo.sd.raiz
+                nodo.huella = hash((
+                    nodo.dato, _HUELLA_VACIO if si is None else si.huella, _HUELLA_VACIO if sd is None else sd.huella
+                ))
+        return self.raiz.huella
+
     def __eq__(self, other: 'ArbolBinario[T]') -> bool:
-        if self.es_vacio() and other.es_vacio():
+        if self is other:
             return True
-        if self.es_vacio() or other.es_vacio():
-            return False
-        if self.raiz.dato != other.raiz.dato:
-            return False
-        return self.si() == other.si() and self.sd() == other.sd()
+        if isinstance(other, ArbolBinario):
+            # tamaño y huella guardados: casi todos los distintos se descartan en O(1)
+            if len(self) != len(other):
+                return False
+            try:
+                if self.huella() != other.huella():
+                    return False
+            except TypeError:
+                pass  # datos no hashables: queda la comparación nodo a nodo
+        return iguales(
+            self, other, ArbolBinario._hijos,
+            lambda a, b: a.es_vacio() == b.es_vacio() and (a.es_vacio() or a.raiz.dato == b.raiz.dato)
+        )
     
 
 
 
-    def recorrido_guiado(self, instrucciones: List[str]) -> Optional[T]:
-        if self.es_vacio():
-            return None
-        if not instrucciones:
-            return self.dato()
-        if instrucciones[0] == 'izquierda':
-            return self.si().recorrido_guiado(instrucciones[1:])
-        elif instrucciones[0] == 'derecha':
-            return self.sd().recorrido_guiado(instrucciones[1:])
+    @staticmethod
+    def compilar_camino(instrucciones: Iterable[str]) -> int:
+        '''
+        Codifica un camino de recorrido_guiado en un entero: un 1 de marca seguido de
+        un bit por paso (0 izquierda, 1 derecha). Se valida una sola vez y después
+        se puede guardar, usar como clave o pasar a recorrido_guiado(_lote).
+        '''
+        try:
+            return int('1' + ''.join([_BITS[instruccion] for instruccion in instrucciones]), 2)
+        except KeyError as error:
+            raise ValueError(f"Instrucción no válida: {error.args[0]}") from None
+
+    @staticmethod
+    def _bits(compilado: int) -> str:
+        if compilado < 1:
+            raise ValueError(f"Camino compilado no válido: {compilado}")
+        return bin(compilado)[3:]
+
+    def recorrido_guiado(self, instrucciones: Union[List[str], int]) -> Optional[T]:
+        '''
+        Dato al que se llega siguiendo las instrucciones ('izquierda'/'derecha', o
+        un camino ya compilado), o None si el camino se sale del árbol. Es iterativo:
+        O(k) para un camino de k pasos.
+        '''
+        actual = self
+        if isinstance(instrucciones, int):
+            for bit in ArbolBinario._bits(instrucciones):
+                if actual.raiz is None:
+                    return None
+                actual = actual.raiz.si if bit == '0' else actual.raiz.sd
         else:
-            raise ValueError(f"Instrucción no válida: {instrucciones[0]}")
+            for instruccion in instrucciones:
+                if actual.raiz is None:
+                    return None
+                if instruccion == 'izquierda':
+                    actual = actual.raiz.si
+                elif instruccion == 'derecha':
+                    actual = actual.raiz.sd
+                else:
+                    raise ValueError(f"Instrucción no válida: {instruccion}")
+        return None if actual.raiz is None else actual.raiz.dato
+
+    def recorrido_guiado_lote(self, caminos: Iterable[Union[List[str], int]]) -> List[Optional[T]]:
+        '''
+        recorrido_guiado de cada camino. Los caminos se compilan (una instrucción
+        inválida da ValueError aunque el camino se salga antes del árbol) y se
+        resuelven juntos con un trie: los prefijos compartidos se bajan una vez.
+        '''
+        bits = [ArbolBinario._bits(c if isinstance(c, int) else ArbolBinario.compilar_camino(c)) for c in caminos]
+        if self.es_vacio():
+            return [None] * len(bits)
+
+        def bajar(t: ArbolBinario[T], bit: str) -> Optional[ArbolBinario[T]]:
+            hijo = t.raiz.si if bit == '0' else t.raiz.sd
+            return None if hijo.raiz is None else hijo
+
+        return [None if t is None else t.raiz.dato for t in resolver_caminos(self, bits, bajar)]
         
 
     '''
@@ -123,22 +432,37 @@ class ArbolBinario(Generic[T]):
       para almacenar los nodos que deben ser visitados. DFS explora tan profundo como sea posible a lo largo de cada rama antes de retroceder.
     '''
     def preorder(self, resultado: List[T]):
-        if not self.es_vacio():
-            resultado.append(self.dato())
-            self.si().preorder(resultado)
-            self.sd().preorder(resultado)
+        resultado.extend(self.iter_preorder())
 
     def inorder(self, resultado: List[T]):
-        if not self.es_vacio():
-            self.si().inorder(resultado)
-            resultado.append(self.dato())
-            self.sd().inorder(resultado)
+        resultado.extend(self.iter_inorder())
 
     def postorder(self, resultado: List[T]):
+        resultado.extend(self.iter_posorder())
+
+    #Iteradores: devuelven los datos de a uno, sin armar la lista completa.
+    #Sólo guardan la pila del camino actual, así se puede cortar el recorrido en cualquier momento.
+    def __iter__(self) -> Iterator[T]:
+        return self.iter_inorder()
+
+    def iter_inorder(self) -> Iterator[T]:
+        for t in inorden(self, lambda t: t.raiz.si, lambda t: t.raiz.sd, ArbolBinario.es_vacio):
+            yield t.raiz.dato
+
+    def iter_preorder(self) -> Iterator[T]:
         if not self.es_vacio():
-            self.si().postorder(resultado)
-            self.sd().postorder(resultado)
-            resultado.append(self.dato())
+            for t in preorden(self, ArbolBinario._no_vacios):
+                yield t.raiz.dato
+
+    def iter_posorder(self) -> Iterator[T]:
+        if not self.es_vacio():
+            for t in posorden(self, ArbolBinario._no_vacios):
+                yield t.raiz.dato
+
+    def iter_bfs(self) -> Iterator[T]:
+        if not self.es_vacio():
+            for t in por_niveles(self, ArbolBinario._no_vacios):
+                yield t.raiz.dato
 
     
     #inorden con cola
@@ -166,21 +490,103 @@ si estuviéramos buscando un nodo que cumpla cierto requisito dentro de un árbo
    primero se procesan todos los nodos del nivel actual antes de pasar al siguiente nivel.
 '''
 
+    # Recorrido por niveles (recorridos.niveles): cada nivel se arma a partir del
+    # anterior, sin cola, y se puede cortar en cuanto se encuentra lo buscado.
+    def niveles(self) -> Iterator[List[T]]:
+        if not self.es_vacio():
+            for nivel in niveles(self, ArbolBinario._no_vacios):
+                yield [t.raiz.dato for t in nivel]
+
+    def ancho_maximo(self) -> int:
+        return 0 if self.es_vacio() else ancho_maximo(self, ArbolBinario._no_vacios)
+
+    def buscar_bfs(self, predicado: Callable[[T], bool]) -> Optional[T]:
+        '''
+        Primer dato por niveles (el más cercano a la raíz) que cumple el predicado, o None.
+        '''
+        if self.es_vacio():
+            return None
+        encontrado = buscar_por_niveles(self, ArbolBinario._no_vacios, lambda t: predicado(t.raiz.dato))
+        return None if encontrado is None else encontrado[0].raiz.dato
+
     def bfs(self) -> List[T]:
-        resultado = []
-        def recorrer(q: List['ArbolBinario[T]']):
-            if q:
-                actual = q.pop(0)  # desencolar árbol visitado
-                if not actual.es_vacio():
-                    resultado.append(actual.dato())
-                    q.append(actual.si())  # encolar subárbol izquierdo
-                    q.append(actual.sd())  # encolar subárbol derecho
-                recorrer(q)
+        return [dato for nivel in self.niveles() for dato in nivel]
+
+
+class ArbolInmutable(ArbolBinario[T]):
+    '''
+    Subárbol armado por una FabricaArboles. Puede colgar de varios padres a la vez
+    (en el mismo árbol o en otros), así que, como el árbol vacío compartido, no
+    tiene antecesor y no se modifica. Si se lo cuelga de un árbol que sí se
+    modifica (insertar_si, crear_nodo, ...) se cuelga una copia mutable.
+    '''
+    __slots__ = ()
 
-        q: List['ArbolBinario[T]'] = []
-        q.append(self)  # encolar raíz
-        recorrer(q)
-        return resultado
+    def _es_inmutable(self) -> bool:
+        return True
+
+    def _reemplazar_raiz(self, nueva_raiz: Optional[NodoAB[T]]) -> None:
+        raise TypeError('Un árbol de una FabricaArboles no se puede modificar')
+
+    def insertar_si(self, si: ArbolBinario[T]):
+        raise TypeError('Un árbol de una FabricaArboles no se puede modificar')
+
+    def insertar_sd(self, sd: ArbolBinario[T]):
+        raise TypeError('Un árbol de una FabricaArboles no se puede modificar')
+
+    def __hash__(self) -> int:
+        return self.huella()
+
+
+class FabricaArboles(Generic[T]):
+    '''
+    Hash-consing: cada subárbol distinto existe una sola vez. crear_nodo devuelve
+    el ArbolInmutable ya creado si hay uno con el mismo dato y los mismos hijos, y
+    como los hijos también son únicos alcanza con compararlos por identidad. Dos
+    árboles de la misma fábrica son iguales si y sólo si son el mismo objeto.
+    '''
+    __slots__ = ('_nodos',)
+
+    def __init__(self):
+        self._nodos: Dict[Tuple[type, Any, int, int], ArbolInmutable[T]] = {}
+
+    def __len__(self) -> int:
+        return len(self._nodos)
+
+    @staticmethod
+    def _clave(dato: T, si: ArbolBinario[T], sd: ArbolBinario[T]) -> Tuple[type, Any, int, int]:
+        # con el tipo, 1, 1.0 y True no terminan en el mismo nodo
+        return type(dato), dato, id(si), id(sd)
+
+    def _es_propio(self, arbol: ArbolBinario[T]) -> bool:
+        if arbol.es_vacio():
+            return arbol is ArbolBinario.vacio()
+        nodo = arbol.raiz
+        return self._nodos.get(self._clave(nodo.dato, nodo.si, nodo.sd)) is arbol
+
+    def crear_nodo(
+        self, dato: T, si: Optional[ArbolBinario[T]] = None, sd: Optional[ArbolBinario[T]] = None
+    ) -> ArbolBinario[T]:
+        si = ArbolBinario.vacio() if si is None else si if self._es_propio(si) else self.importar(si)
+        sd = ArbolBinario.vacio() if sd is None else sd if self._es_propio(sd) else self.importar(sd)
+        clave = self._clave(dato, si, sd)
+        arbol = self._nodos.get(clave)
+        if arbol is None:
+            arbol = self._nodos[clave] = ArbolInmutable()
+            arbol.raiz = NodoAB(dato, si, sd)
+        return arbol
+
+    def importar(self, arbol: ArbolBinario[T]) -> ArbolBinario[T]:
+        '''
+        Versión de la fábrica de cualquier ArbolBinario: los subárboles que ya
+        estaban se reusan y sólo se crean los nodos nuevos.
+        '''
+        if self._es_propio(arbol):
+            return arbol
+        return plegar(
+            arbol, ArbolBinario._hijos,
+            lambda t, hijos: ArbolBinario.vacio() if t.es_vacio() else self.crear_nodo(t.raiz.dato, *hijos)
+        )
 
 
 # Ejemplo de uso
@@ -202,13 +608,28 @@ if __name__ == "__main__":
     arbol2.insertar_si(ArbolBinario.crear_nodo(5))
     arbol2.insertar_sd(ArbolBinario.crear_nodo(15))
 
+    # altura y cantidad de nodos guardadas en la raíz
+    print(f"Altura: {arbol.altura()}, nodos: {len(arbol)}, consistente: {arbol.es_consistente()}")
+
     # Obtener el nivel de un nodo
     valor = 7
     nivel = arbol.nivel_nodo(valor)
     print(f"El nivel del nodo con valor {valor} es: {nivel}")
+    print(f"Niveles de 5, 7 y 99 con el índice: {arbol.nivel_muchos([5, 7, 99])}, camino a 7: {arbol.camino(7)}")
 
     # Verificar igualdad de árboles
     print(arbol == arbol2)  
+    print(f"Huellas iguales: {arbol.huella() == arbol2.huella()}; con los mismos nodos: ", end='')
+    arbol2.si().insertar_si(ArbolBinario.crear_nodo(3))
+    arbol2.si().insertar_sd(ArbolBinario.crear_nodo(7))
+    arbol2.sd().insertar_si(ArbolBinario.crear_nodo(20))
+    arbol2.sd().insertar_sd(ArbolBinario.crear_nodo(25))
+    print(arbol == arbol2, arbol.huella() == arbol2.huella())
+
+    # con hash-consing los dos árboles son el mismo objeto y comparten los nodos
+    fabrica = FabricaArboles()
+    unico, otro = fabrica.importar(arbol), fabrica.importar(arbol2)
+    print(f"Fábrica: {len(fabrica)} nodos para dos árboles de {len(arbol)}, mismo objeto: {unico is otro}")
 
 
 
@@ -216,6 +637,9 @@ if __name__ == "__main__":
     instrucciones = ['izquierda', 'derecha']
     contenido = arbol.recorrido_guiado(instrucciones)
     print(f"El contenido del nodo accesible utilizando el camino {' -> '.join(instrucciones)} es: {contenido}")
+    compilado = ArbolBinario.compilar_camino(instrucciones)
+    print(f"Camino compilado: {bin(compilado)}, en lote con otros: "
+          f"{arbol.recorrido_guiado_lote([compilado, ['izquierda'], ['derecha', 'derecha'], []])}")
 
 
     
@@ -240,4 +664,6 @@ if __name__ == "__main__":
 
      # Recorrido BFS
     bfs_result = arbol.bfs()
-    print("Recorrido BFS:", bfs_result)
\ No newline at end of file
+    print("Recorrido BFS:", bfs_result)
+    print("Niveles:", list(arbol.niveles()), "ancho máximo:", arbol.ancho_maximo())
+    print("Primer múltiplo de 5 por niveles:", arbol.buscar_bfs(lambda x: x % 5 == 0 and x != 10))
\ No newline at end of file
@@ -0,0 +1,1219 @@
+'''
+Benchmarks de los árboles del repositorio.
+
+Uso:
+    python benchmarks.py <tema> [n]
+
+Cada tema es una función bench_<tema>(n) que imprime sus tiempos por pantalla.
+'''
+import bisect
+import io
+import os
+import pickle
+import random
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Any, Callable, Dict, List, Tuple
+
+import arbol_hojas_marian
+import arboles
+import arbolbinariocompacto
+import arbolbinarioMarian
+import arbolbinarioordenado
+import arbolbinarioordenadomarian
+import arbolconcurrente
+import arbolNarioMarian
+import exprecion_aritmetica_marian
+import recorridos
+
+
+def medir(f: Callable[..., Any], *args: Any) -> Tuple[float, Any]:
+    inicio = time.perf_counter()
+    resultado = f(*args)
+    return time.perf_counter() - inicio, resultado
+
+
+def claves(n: int) -> Dict[str, List[int]]:
+    aleatorias = list(range(n))
+    random.Random(0).shuffle(aleatorias)
+    return {
+        'ordenadas': list(range(n)),
+        'inversas': list(range(n - 1, -1, -1)),
+        'aleatorias': aleatorias,
+    }
+
+
+def bench_balanceo(n: int = 100_000) -> None:
+    '''
+    Inserción de n claves ordenadas, inversas y aleatorias en el árbol ordenado
+    sin balancear y en el ArbolAVL de cada implementación.
+    '''
+    def cargar(clase: type, datos: List[int]) -> Any:
+        t = clase()
+        for x in datos:
+            t.insertar(x)
+        return t
+
+    clases = [
+        ('ArbolBinarioOrdenado', arbolbinarioordenado.ArbolBinarioOrdenado),
+        ('ArbolAVL', arbolbinarioordenado.ArbolAVL),
+        ('ArbolBinarioOrdenado (marian)', arbolbinarioordenadomarian.ArbolBinarioOrdenado),
+        ('ArbolAVL (marian)', arbolbinarioordenadomarian.ArbolAVL),
+    ]
+    print(f'n = {n}')
+    for orden, datos in claves(n).items():
+        for nombre, clase in clases:
+            try:
+                tiempo, t = medir(cargar, clase, datos)
+            except RecursionError:
+                print(f'{orden:>10} {nombre:<30} RecursionError al insertar')
+                continue
+            print(f'{orden:>10} {nombre:<30} insertar: {tiempo:8.3f}s  altura: {t.altura()}')
+
+
+def bench_orden_estadistico(n: int = 100_000) -> None:
+    '''
+    Consultas rank/select sobre un ArbolAVL de n claves, comparadas con calcular
+    inorder() y bisecar la lista en cada consulta. Se informa el tiempo por consulta.
+    '''
+    t = arbolbinarioordenado.ArbolAVL()
+    for x in claves(n)['aleatorias']:
+        t.insertar(x)
+    generador = random.Random(1)
+    consultas = [generador.randrange(n) for _ in range(1000)]
+
+    def con_inorder(consultas: List[int]) -> None:
+        for x in consultas:
+            recorrido: List[int] = []
+            t.inorder(recorrido)
+            bisect.bisect_left(recorrido, x)
+            recorrido[x]
+
+    def con_tamanios(consultas: List[int]) -> None:
+        for x in consultas:
+            t.rank(x)
+            t.select(x)
+
+    print(f'n = {n}')
+    tiempo, _ = medir(con_inorder, consultas[:10])
+    print(f'inorder + bisect: {tiempo / 10 * 1e6:12.1f} us/consulta')
+    tiempo, _ = medir(con_tamanios, consultas)
+    print(f'rank/select:      {tiempo / len(consultas) * 1e6:12.1f} us/consulta')
+
+
+def bench_carga_masiva(n: int = 1_000_000) -> None:
+    '''
+    Carga de n claves con desde_ordenados (ya ordenadas o después de ordenarlas)
+    comparada con insertar una a una n / 10 claves en un ArbolAVL.
+    '''
+    datos = claves(n)
+
+    def insertar_uno_a_uno(valores: List[int]) -> Any:
+        t = arbolbinarioordenado.ArbolAVL()
+        for x in valores:
+            t.insertar(x)
+        return t
+
+    print(f'n = {n}')
+    for modulo in (arbolbinarioordenado, arbolbinarioordenadomarian):
+        clase = modulo.ArbolBinarioOrdenado
+        tiempo, t = medir(clase.desde_ordenados, datos['ordenadas'])
+        print(f'{modulo.__name__:<30} desde_ordenados:    {tiempo:8.3f}s  altura: {t.altura()}')
+        tiempo, t = medir(lambda: clase.desde_ordenados(sorted(datos['aleatorias'])))
+        print(f'{modulo.__name__:<30} ordenar + armar:    {tiempo:8.3f}s  altura: {t.altura()}')
+    tiempo, t = medir(insertar_uno_a_uno, datos['aleatorias'][:n // 10])
+    print(f'{"arbolbinarioordenado":<30} insertar n / 10:    {tiempo:8.3f}s  altura: {t.altura()}')
+
+
+def bench_injertos(n: int = 2_000) -> None:
+    '''
+    Une de a uno n fragmentos de 50 claves: cada paso cuelga lo acumulado y el
+    fragmento nuevo de un nodo pivote con insertar_si / insertar_sd. Con las
+    cotas guardadas cada injerto valida sólo lo que se cuelga, así que el
+    tiempo crece linealmente con la cantidad de fragmentos.
+    '''
+    def unir(fragmentos: int) -> Any:
+        clase = arbolbinarioordenado.ArbolBinarioOrdenado
+        acumulado = clase.desde_ordenados(range(50))
+        for i in range(1, fragmentos):
+            inicio = i * 51
+            pivote = clase.crear_nodo(inicio - 1)
+            pivote.insertar_si(acumulado)
+            pivote.insertar_sd(clase.desde_ordenados(range(inicio, inicio + 50)))
+            acumulado = pivote
+        return acumulado
+
+    for fragmentos in (n // 8, n // 4, n // 2, n):
+        tiempo, t = medir(unir, fragmentos)
+        print(f'{fragmentos:>8} fragmentos  {len(t):>9} claves  {tiempo:8.3f}s  ordenado: {t.es_ordenado()}')
+
+
+def bench_eliminar(n: int = 100_000) -> None:
+    '''
+    Altura de un ArbolBinarioOrdenado de n claves aleatorias después de n / 2
+    rondas de baja y alta, y bajas en bloque de n / 10 claves con eliminar_rango
+    y eliminar_muchos comparadas con llamar a eliminar clave por clave.
+    '''
+    clase = arbolbinarioordenado.ArbolBinarioOrdenado
+    generador = random.Random(2)
+    t = clase.desde_ordenados(range(0, 10 * n, 10))
+    print(f'n = {n}, altura inicial: {t.altura()}')
+    presentes = list(range(0, 10 * n, 10))
+    for _ in range(n // 2):
+        i = generador.randrange(len(presentes))
+        t.eliminar(presentes[i])
+        nuevo = generador.randrange(10 * n)
+        while t.pertenece(nuevo):
+            nuevo = generador.randrange(10 * n)
+        t.insertar(nuevo)
+        presentes[i] = nuevo
+    print(f'altura después de {n // 2} rondas de baja y alta: {t.altura()}')
+
+    k = n // 10
+    desde = n // 3
+    bajas = generador.sample(range(n), k)
+
+    def de_a_una(valores: List[int]) -> None:
+        for x in valores:
+            t.eliminar(x)
+
+    for nombre, operacion, argumentos in (
+        ('eliminar x k (rango)', de_a_una, [list(range(desde, desde + k))]),
+        ('eliminar_rango', None, [desde, desde + k - 1]),
+        ('eliminar x k (sueltas)', de_a_una, [bajas]),
+        ('eliminar_muchos', None, [bajas]),
+    ):
+        t = clase.desde_ordenados(range(n))
+        if operacion is None:
+            operacion = getattr(t, nombre)
+        tiempo, _ = medir(operacion, *argumentos)
+        print(f'{nombre:<24} {tiempo:8.3f}s  quedan {len(t)} claves')
+
+
+def cadena_binaria(modulo: Any, n: int) -> Any:
+    # árbol degenerado: cada nodo cuelga del subárbol izquierdo del anterior
+    t = modulo.ArbolBinario()
+    for i in range(n):
+        t = modulo.ArbolBinario.crear_nodo(i, t)
+    return t
+
+
+def cadena_n(n: int) -> Any:
+    t = arbolNarioMarian.ArbolN(0)
+    for i in range(1, n):
+        padre = arbolNarioMarian.ArbolN(i)
+        padre.insertar_subarbol(t)
+        t = padre
+    return t
+
+
+def completo_binario(modulo: Any, altura: int, valor: int = 0) -> Any:
+    if altura == 0:
+        return modulo.ArbolBinario.vacio()
+    return modulo.ArbolBinario.crear_nodo(
+        valor, completo_binario(modulo, altura - 1, 2 * valor + 1), completo_binario(modulo, altura - 1, 2 * valor + 2)
+    )
+
+
+def bench_recursion(n: int = 1_000_000) -> None:
+    '''
+    Corre las operaciones de recorrido sobre cadenas de n nodos de cada clase (con
+    recursión fallaban a los ~1000 niveles) comprobando los resultados, y compara
+    el motor de pila explícita con las versiones recursivas sobre un árbol completo.
+    '''
+    print(f'cadenas de n = {n} nodos')
+    for modulo in (arboles, arbolbinarioMarian):
+        t = cadena_binaria(modulo, n)
+        resultados: List[Tuple[str, float]] = [
+            ('altura', medir(t.altura)[0]),
+            ('len', medir(len, t)[0]),
+        ]
+        assert t.altura() == n and len(t) == n
+        if modulo is arboles:
+            otro = cadena_binaria(modulo, n)
+            resultados.append(('==', medir(lambda: t == otro)[0]))
+            assert t == otro
+            recorrido: List[int] = []
+            resultados.append(('inorder', medir(t.inorder, recorrido)[0]))
+            assert recorrido == list(range(n))
+            assert t.nivel_nodo(0) == n - 1
+        else:
+            tiempo, recorrido = medir(t.inorder)
+            resultados.append(('inorder', tiempo))
+            assert recorrido == list(range(n))
+            tiempo, copia = medir(t.copy)
+            resultados.append(('copy', tiempo))
+            resultados.append(('espejo', medir(t.espejo)[0]))
+            resultados.append(('sin_hojas', medir(t.sin_hojas)[0]))
+            assert copia.inorder() == recorrido and copia is not t
+        print(f'{modulo.__name__:<20} ' + '  '.join(f'{nombre}: {tiempo:.2f}s' for nombre, tiempo in resultados))
+    t = cadena_n(n)
+    resultados = [
+        ('altura', medir(t.altura)[0]),
+        ('len', medir(len, t)[0]),
+        ('preorder', medir(t.preorder)[0]),
+        ('nivel', medir(t.nivel, 0)[0]),
+        ('copy', medir(t.copy)[0]),
+        ('sin_hojas', medir(t.sin_hojas)[0]),
+    ]
+    assert t.altura() == n and len(t) == n and t.nivel(0) == n - 1 and t == t.copy()
+    print(f'{"arbolNarioMarian":<20} ' + '  '.join(f'{nombre}: {tiempo:.2f}s' for nombre, tiempo in resultados))
+
+    # comparación con las versiones recursivas en un árbol completo de 2^17 - 1 nodos
+    def altura_recursiva(t: Any) -> int:
+        return 0 if t.es_vacio() else 1 + max(altura_recursiva(t.si()), altura_recursiva(t.sd()))
+
+    def len_recursivo(t: Any) -> int:
+        return 0 if t.es_vacio() else 1 + len_recursivo(t.si()) + len_recursivo(t.sd())
+
+    def inorder_recursivo(t: Any) -> List[Any]:
+        return [] if t.es_vacio() else inorder_recursivo(t.si()) + [t.dato()] + inorder_recursivo(t.sd())
+
+    completo = completo_binario(arbolbinarioMarian, 17)
+    print(f'árbol completo de {len(completo)} nodos (arbolbinarioMarian)')
+    for nombre, iterativo, recursivo in (
+        ('altura', completo.altura, lambda: altura_recursiva(completo)),
+        ('len', lambda: len(completo), lambda: len_recursivo(completo)),
+        ('inorder', completo.inorder, lambda: inorder_recursivo(completo)),
+    ):
+        print(f'{nombre:<8} pila explícita: {medir(iterativo)[0]:6.3f}s  recursivo: {medir(recursivo)[0]:6.3f}s')
+
+
+def pico_memoria(f: Callable[..., Any], *args: Any) -> Tuple[float, int]:
+    tracemalloc.start()
+    try:
+        tiempo, _ = medir(f, *args)
+        return tiempo, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def bench_iteradores(n: int = 1_000_000) -> None:
+    '''
+    Recorrer un árbol de n claves armando la lista (inorder) contra consumir el
+    iterador perezoso (iter_inorder), y cortar el recorrido a los 10 elementos.
+    '''
+    t = arbolbinarioordenadomarian.ArbolBinarioOrdenado.desde_ordenados(range(n))
+    print(f'n = {n}')
+    for nombre, recorrer in (
+        ('sum(inorder())', lambda: sum(t.inorder())),
+        ('sum(iter_inorder())', lambda: sum(t.iter_inorder())),
+        ('inorder()[:10]', lambda: t.inorder()[:10]),
+        ('primeros 10 de iter', lambda: [x for _, x in zip(range(10), t)]),
+    ):
+        tiempo, pico = pico_memoria(recorrer)
+        print(f'{nombre:<22} {tiempo:8.3f}s  pico de memoria: {pico / 2 ** 20:8.2f} MiB')
+
+
+def completo_compacto(altura: int, tipo: str = 'q') -> arbolbinariocompacto.ArbolBinarioCompacto[int]:
+    # mismos datos que completo_binario, armado de abajo hacia arriba por niveles
+    t: arbolbinariocompacto.ArbolBinarioCompacto[int] = arbolbinariocompacto.ArbolBinarioCompacto(tipo)
+    hijos = [arbolbinariocompacto.VACIO] * 2 ** altura
+    for nivel in range(altura - 1, -1, -1):
+        primero = 2 ** nivel - 1
+        hijos = [t.crear_nodo(primero + k, hijos[2 * k], hijos[2 * k + 1]) for k in range(2 ** nivel)]
+    t.raiz = hijos[0]
+    return t
+
+
+def memoria_retenida(f: Callable[..., Any], *args: Any) -> Tuple[Any, int]:
+    # bytes que siguen ocupados después de construir (el resultado sigue vivo)
+    tracemalloc.start()
+    try:
+        resultado = f(*args)
+        return resultado, tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+
+def bench_compacto(n: int = 1_000_000) -> None:
+    '''
+    Memoria por nodo y tiempo de recorrido de un árbol completo de ~n nodos con
+    objetos (arboles y arbolbinarioMarian) contra ArbolBinarioCompacto.
+    '''
+    altura = max(1, n.bit_length())
+    compacto, memoria_compacto = memoria_retenida(completo_compacto, altura)
+    cantidad = len(compacto)
+    print(f'árbol completo de {cantidad} nodos')
+    por_nodo_compacto = memoria_compacto / cantidad
+    for modulo in (arboles, arbolbinarioMarian):
+        t, memoria = memoria_retenida(completo_binario, modulo, altura)
+        por_nodo = memoria / cantidad
+        tiempo, _ = medir(lambda: sum(t.iter_inorder()))
+        print(
+            f'{modulo.__name__:<20} {por_nodo:8.1f} bytes/nodo  sum(iter_inorder()): {tiempo:7.3f}s  '
+            f'({por_nodo / por_nodo_compacto:.1f} veces la memoria del compacto)'
+        )
+        del t
+    tiempo, total = medir(lambda: sum(compacto.iter_inorder()))
+    print(f'{"compacto":<20} {por_nodo_compacto:8.1f} bytes/nodo  sum(iter_inorder()): {tiempo:7.3f}s')
+    assert total == cantidad * (cantidad - 1) // 2
+    for nombre, recorrer in (
+        ('sum(datos) por índices', lambda: sum(compacto.datos[i] for i in compacto.iter_indices_preorder())),
+        ('altura', compacto.altura),
+        ('bfs', compacto.bfs),
+    ):
+        print(f'{"compacto":<20} {nombre:<24} {medir(recorrer)[0]:7.3f}s')
+    assert compacto.altura() == altura and compacto.bfs() == list(range(cantidad))
+
+
+def ternario_n(n: int) -> Any:
+    # árbol n-ario completo de grado 3 armado por niveles
+    raiz = arbolNarioMarian.ArbolN(0)
+    nivel, cantidad = [raiz], 1
+    while cantidad < n:
+        siguiente = []
+        for padre in nivel:
+            for _ in range(3):
+                if cantidad == n:
+                    break
+                hijo = arbolNarioMarian.ArbolN(cantidad)
+                padre.insertar_subarbol(hijo)
+                siguiente.append(hijo)
+                cantidad += 1
+        nivel = siguiente
+    return raiz
+
+
+def cadena_h(n: int) -> Any:
+    # cada nodo interno tiene dos hojas y cuelga del nodo de arriba: 3 nodos por paso
+    t = arbol_hojas_marian.ArbolH.crear_nodo_y_hojas('x', 0, 1)
+    for _ in range(n // 3 - 1):
+        padre = arbol_hojas_marian.ArbolH.crear_nodo_y_hojas('x', 0, 1)
+        padre.insertar_subarbol(t)
+        t = padre
+    return t
+
+
+def bench_memoria(n: int = 200_000) -> None:
+    '''
+    Bytes por nodo (medidos con tracemalloc) de cada clase de árbol con ~n nodos.
+    '''
+    altura = max(1, n.bit_length() - 1)
+    casos: List[Tuple[str, Callable[[], Any]]] = [
+        ('arboles.ArbolBinario', lambda: completo_binario(arboles, altura)),
+        ('arbolbinarioMarian.ArbolBinario', lambda: completo_binario(arbolbinarioMarian, altura)),
+        ('ArbolBinarioOrdenado', lambda: arbolbinarioordenado.ArbolBinarioOrdenado.desde_ordenados(range(n))),
+        ('ArbolAVL', lambda: arbolbinarioordenado.ArbolAVL.desde_ordenados(range(n))),
+        ('ArbolBinarioOrdenado (marian)', lambda: arbolbinarioordenadomarian.ArbolBinarioOrdenado.desde_ordenados(range(n))),
+        ('ArbolAVL (marian)', lambda: arbolbinarioordenadomarian.ArbolAVL.desde_ordenados(range(n))),
+        ('ArbolN', lambda: ternario_n(n)),
+        ('ArbolH', lambda: cadena_h(n)),
+    ]
+    print(f'n ~ {n}')
+    for nombre, construir in casos:
+        t, memoria = memoria_retenida(construir)
+        cantidad = sum(1 for _ in t)
+        print(f'{nombre:<34} {memoria / cantidad:8.1f} bytes/nodo')
+        del t
+
+
+def bench_copias(n: int = 200_000) -> None:
+    '''
+    Tomar una instantánea con copy() antes de cada inserción en un ArbolAVL (marian)
+    de n claves, contra copiar el árbol entero nodo por nodo. Se informa el tiempo
+    y la memoria por instantánea y se comprueba que las instantáneas no cambian.
+    '''
+    t = arbolbinarioordenadomarian.ArbolAVL.desde_ordenados(range(0, 2 * n, 2))
+    generador = random.Random(2)
+    nuevas = [2 * x + 1 for x in generador.sample(range(n), 1005)]
+
+    def con_copy(rondas: int) -> List[Any]:
+        instantaneas = []
+        for x in nuevas[:rondas]:
+            instantaneas.append(t.copy())
+            t.insertar(x)
+        return instantaneas
+
+    def copia_completa(rondas: int) -> List[Any]:
+        instantaneas = []
+        for x in nuevas[-rondas:]:
+            instantaneas.append(arbolbinarioordenadomarian.ArbolAVL.desde_ordenados(t.iter_inorder()))
+            t.insertar(x)
+        return instantaneas
+
+    print(f'n = {n}')
+    for nombre, copiar, rondas in (('copy()', con_copy, 1000), ('copia completa', copia_completa, 5)):
+        inicial = len(t)
+        tracemalloc.start()
+        try:
+            tiempo, instantaneas = medir(copiar, rondas)
+            memoria = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+        print(f'{nombre:<16} {tiempo / rondas * 1e3:9.3f} ms y {memoria / rondas / 1024:9.1f} KiB por instantánea')
+        for i in (0, len(instantaneas) // 2, len(instantaneas) - 1):
+            assert len(instantaneas[i]) == inicial + i and instantaneas[i].es_ordenado()
+        del instantaneas
+
+
+def bench_cache(n: int = 1_000_000) -> None:
+    '''
+    altura() y len() de un arboles.ArbolBinario de ~n nodos, que ahora leen el valor
+    guardado en la raíz, contra recorrer el árbol; y el costo de un injerto en una
+    hoja, que actualiza los valores guardados de todos sus antecesores.
+    '''
+    t = completo_binario(arboles, max(1, n.bit_length() - 1))
+    print(f'árbol completo de {len(t)} nodos')
+    no_vacios = arboles.ArbolBinario._no_vacios
+    consultas = 100_000
+    for nombre, guardado, recorriendo in (
+        ('altura', t.altura, lambda: 1 + max(nivel for _, nivel in recorridos.preorden_con_nivel(t, no_vacios))),
+        ('len', t.__len__, lambda: sum(1 for _ in recorridos.preorden(t, no_vacios))),
+    ):
+        tiempo_guardado, _ = medir(lambda: [guardado() for _ in repeat(None, consultas)])
+        tiempo_recorrido, valor = medir(recorriendo)
+        assert guardado() == valor
+        print(f'{nombre:<8} guardado: {tiempo_guardado / consultas * 1e6:8.3f} µs  recorriendo: {tiempo_recorrido * 1e6:12.0f} µs')
+
+    hoja = t
+    while not hoja.si().es_vacio():
+        hoja = hoja.si()
+    injertos = 10_000
+    def injertar() -> None:
+        for i in range(injertos):
+            hoja.insertar_si(arboles.ArbolBinario.crear_nodo(i) if i % 2 == 0 else arboles.ArbolBinario())
+    tiempo, _ = medir(injertar)
+    print(f'injerto a profundidad {t.altura() - 1}: {tiempo / injertos * 1e6:8.2f} µs')
+    assert t.es_consistente()
+
+
+def bench_bfs(n: int = 1_000_000) -> None:
+    '''
+    bfs() de las tres clases sobre árboles anchos de n/8 a n nodos (con pop(0) el
+    costo crecía con el cuadrado del ancho): el tiempo por nodo se tiene que
+    mantener. También una cadena de n nodos (antes se pasaba del límite de
+    recursión), ancho_maximo() y una búsqueda por niveles que corta cerca de la raíz.
+    '''
+    altura = max(4, n.bit_length() - 1)
+    constructores: List[Tuple[str, Callable[[int], Any]]] = [
+        ('arboles', lambda m: completo_binario(arboles, m.bit_length() - 1)),
+        ('arbolbinarioMarian', lambda m: completo_binario(arbolbinarioMarian, m.bit_length() - 1)),
+        ('arbolNarioMarian', ternario_n),
+    ]
+    for nombre, construir in constructores:
+        tiempos = []
+        for m in (2 ** (altura - 3), 2 ** (altura - 2), 2 ** (altura - 1), 2 ** altura):
+            t = construir(m)
+            tiempo, recorrido = medir(t.bfs)
+            assert len(recorrido) == len(t)
+            tiempos.append(f'{len(t):>8}: {tiempo / len(t) * 1e9:5.0f} ns/nodo')
+        print(f'{nombre:<20} ' + '  '.join(tiempos))
+        del t
+
+    for nombre, cadena in (('arboles', cadena_binaria(arboles, n)), ('arbolNarioMarian', cadena_n(n))):
+        tiempo, recorrido = medir(cadena.bfs)
+        assert len(recorrido) == n
+        print(f'cadena de {n} nodos ({nombre}): bfs {tiempo:.2f}s')
+        del cadena, recorrido
+
+    t = completo_binario(arbolbinarioMarian, altura)
+    tiempo, ancho = medir(t.ancho_maximo)
+    assert ancho == 2 ** (altura - 1)
+    print(f'ancho_maximo() de {len(t)} nodos: {ancho} en {tiempo:.3f}s')
+    tiempo_corte, encontrado = medir(t.buscar_bfs, lambda x: x == 5)
+    tiempo_todo, _ = medir(t.buscar_bfs, lambda x: x < 0)
+    assert encontrado == 5
+    print(f'buscar_bfs: en el nivel 2 {tiempo_corte * 1e6:.0f} µs, sin encontrar {tiempo_todo:.3f}s')
+
+
+def bench_indice(n: int = 200_000, consultas: int = 10_000) -> None:
+    '''
+    Niveles de muchos valores (la mitad no están) contra el mismo árbol de n
+    nodos: con una búsqueda por consulta cuesta O(q·n), así que se mide una muestra
+    y se extrapola; con nivel_muchos es una pasada para el índice y O(1) por valor.
+    '''
+    altura = max(2, n.bit_length())
+    rng = random.Random(13)
+    arboles_a_probar: List[Tuple[str, Any, Callable[[Any, int], int]]] = [
+        ('arboles', completo_binario(arboles, altura), lambda t, v: t.nivel_nodo(v)),
+        ('arbolbinarioMarian', completo_binario(arbolbinarioMarian, altura), lambda t, v: t.nivel(v)),
+        ('arbolNarioMarian', ternario_n(2 ** altura - 1), lambda t, v: t.nivel(v)),
+    ]
+    for nombre, t, nivel in arboles_a_probar:
+        nodos = len(t)
+        valores = [rng.randrange(2 * nodos) for _ in range(consultas)]
+        muestra = valores[:20]
+        tiempo_uno, esperados = medir(lambda: [nivel(t, v) for v in muestra])
+        tiempo_indice, _ = medir(t.indexar)
+        tiempo_lote, obtenidos = medir(t.nivel_muchos, valores)
+        assert obtenidos[:len(muestra)] == esperados
+        assert [nivel(t, v) for v in muestra] == esperados
+        estimado = tiempo_uno / len(muestra) * consultas
+        print(
+            f'{nombre:<20} {nodos} nodos, {consultas} consultas: de a una ~{estimado:.1f}s, '
+            f'índice {tiempo_indice:.3f}s + lote {tiempo_lote * 1e3:.1f} ms ({estimado / (tiempo_indice + tiempo_lote):.0f}x)'
+        )
+        del t
+
+    # una modificación descarta el índice y el siguiente lote lo vuelve a armar
+    t = completo_binario(arboles, 10)
+    t.indexar()
+    hoja = t
+    while not hoja.si().es_vacio():
+        hoja = hoja.si()
+    hoja.insertar_si(arboles.ArbolBinario.crear_nodo(-1))
+    assert t.nivel_nodo(-1) == 10 and t.nivel_muchos([-1, 0]) == [10, 0]
+
+
+
+def bench_caminos(n: int = 200_000) -> None:
+    '''
+    n caminos resueltos de a uno con recorrido_guiado, ya compilados, y todos
+    juntos con recorrido_guiado_lote. Primero caminos cortos al azar sobre un
+    árbol completo (casi sin prefijos para compartir), después caminos que
+    comparten un prefijo largo: árbol completo colgado al final de una cadena de
+    n / 100 nodos. También un camino de n pasos por una cadena, lineal en n.
+    '''
+    rng = random.Random(14)
+    altura = max(2, n.bit_length() - 2)
+    largo = max(1, n // 100)
+
+    def con_prefijo(arbol: Any) -> Any:
+        for i in range(largo):
+            arbol = arboles.ArbolBinario.crear_nodo(-i, arbol)
+        return arbol
+
+    for nombre, t, prefijo in (
+        ('al azar', completo_binario(arboles, altura), []),
+        (f'prefijo de {largo}', con_prefijo(completo_binario(arboles, altura)), ['izquierda'] * largo),
+    ):
+        caminos = [prefijo + [rng.choice(('izquierda', 'derecha')) for _ in range(altura - 1)] for _ in range(n // 10)]
+        compilados = [arboles.ArbolBinario.compilar_camino(c) for c in caminos]
+        tiempo_uno, esperados = medir(lambda: [t.recorrido_guiado(c) for c in caminos])
+        tiempo_compilado, obtenidos = medir(lambda: [t.recorrido_guiado(c) for c in compilados])
+        assert obtenidos == esperados
+        tiempo_lote, obtenidos = medir(t.recorrido_guiado_lote, compilados)
+        assert obtenidos == esperados
+        print(
+            f'arboles, {nombre}: {len(caminos)} caminos en {len(t)} nodos: de a uno {tiempo_uno:.3f}s, '
+            f'compilados {tiempo_compilado:.3f}s, lote {tiempo_lote:.3f}s'
+        )
+        del t
+
+    niveles_n = max(2, altura * 2 // 3)
+    final = ternario_n(3 ** niveles_n)
+    t = final
+    for i in range(largo):
+        padre = arbolNarioMarian.ArbolN(-i)
+        padre.insertar_subarbol(t)
+        t = padre
+    for nombre, arbol, prefijo in (('al azar', final, []), (f'prefijo de {largo}', t, [0] * largo)):
+        caminos_n = [prefijo + [rng.randrange(3) for _ in range(niveles_n - 1)] for _ in range(n // 10)]
+        tiempo_uno, esperados = medir(lambda: [arbol.recorrido_guiado(c) for c in caminos_n])
+        tiempo_lote, obtenidos = medir(arbol.recorrido_guiado_lote, caminos_n)
+        assert obtenidos == esperados
+        print(f'arbolNarioMarian, {nombre}: {len(caminos_n)} caminos: de a uno {tiempo_uno:.3f}s, lote {tiempo_lote:.3f}s')
+    del t, final
+
+    cadena = cadena_binaria(arboles, n)
+    tiempo, dato = medir(cadena.recorrido_guiado, ['izquierda'] * (n - 1))
+    assert dato == 0
+    print(f'camino de {n - 1} pasos por una cadena: {tiempo:.3f}s')
+
+
+def bench_huellas(n: int = 200_000) -> None:
+    '''
+    Comparación de todos contra todos de 60 árboles completos de ~n/60 nodos que
+    difieren en una hoja (uno de cada tres queda sin cambios, así que también hay
+    pares iguales): recorriendo nodo a nodo como antes y con __eq__, que descarta
+    por huella. Después, memoria de los mismos árboles sueltos y en una FabricaArboles.
+    '''
+    m = 60
+    altura = max(2, (n // m).bit_length() - 1)
+    rng = random.Random(15)
+    cambios = [
+        None if k % 3 == 0 else ([rng.random() < 0.5 for _ in range(altura - 1)], -k) for k in range(m)
+    ]
+
+    def variante(cambio: Any) -> Any:
+        t = completo_binario(arboles, altura)
+        if cambio is not None:
+            lados, valor = cambio
+            hoja = t
+            for izquierda in lados:
+                hoja = hoja.si() if izquierda else hoja.sd()
+            hoja.set_raiz(arboles.NodoAB(valor))
+        return t
+
+    def nodo_a_nodo(a: Any, b: Any) -> bool:
+        return recorridos.iguales(
+            a, b, arboles.ArbolBinario._hijos,
+            lambda x, y: x.es_vacio() == y.es_vacio() and (x.es_vacio() or x.raiz.dato == y.raiz.dato)
+        )
+
+    arboles_m = [variante(cambio) for cambio in cambios]
+    pares = [(a, b) for i, a in enumerate(arboles_m) for b in arboles_m[i + 1:]]
+    tiempo_antes, esperado = medir(lambda: [nodo_a_nodo(a, b) for a, b in pares])
+    tiempo_huellas, obtenido = medir(lambda: [a == b for a, b in pares])
+    assert obtenido == esperado
+    tiempo_otra_vez, _ = medir(lambda: [a == b for a, b in pares])
+    print(
+        f'{len(pares)} pares de árboles de {len(arboles_m[0])} nodos ({sum(esperado)} iguales, que se siguen '
+        f'confirmando nodo a nodo): antes {tiempo_antes:.3f}s, con huellas {tiempo_huellas:.3f}s '
+        f'(ya calculadas: {tiempo_otra_vez:.3f}s)'
+    )
+    del arboles_m, pares
+
+    sueltos, memoria_sueltos = memoria_retenida(lambda: [variante(cambio) for cambio in cambios])
+    del sueltos
+    fabrica: arboles.FabricaArboles[int] = arboles.FabricaArboles()
+    unicos, memoria_fabrica = memoria_retenida(lambda: [fabrica.importar(variante(cambio)) for cambio in cambios])
+    assert all(a is b for a, b in zip(unicos[::3], unicos[3::3]))
+    # en la fábrica los iguales son el mismo objeto: ningún par se recorre
+    tiempo_fabrica, iguales = medir(lambda: [a == b for i, a in enumerate(unicos) for b in unicos[i + 1:]])
+    assert iguales == esperado
+    print(
+        f'{m} árboles sueltos: {memoria_sueltos / 2 ** 20:.1f} MiB; en la fábrica: {len(fabrica)} nodos, '
+        f'{memoria_fabrica / 2 ** 20:.1f} MiB ({memoria_sueltos / memoria_fabrica:.1f} veces menos), '
+        f'todos los pares en {tiempo_fabrica * 1e3:.1f} ms'
+    )
+
+
+def bench_render(n: int = 200_000) -> None:
+    '''
+    Volcado de un árbol de ~n nodos a un archivo con render() comparado con armar
+    el texto entero con str(): tiempo (medido con tracemalloc activo) y pico de
+    memoria. render() con max_nodes sólo recorre lo que escribe, y con max_depth
+    una cadena de n / 100 nodos se corta en el nivel pedido.
+    '''
+    altura = max(2, n.bit_length() - 1)
+    for nombre, t in (
+        ('arbolbinarioMarian', completo_binario(arbolbinarioMarian, altura)),
+        ('ArbolBinarioOrdenado', arbolbinarioordenado.ArbolBinarioOrdenado.desde_ordenados(range(2 ** altura - 1))),
+        ('arbolNarioMarian', ternario_n(2 ** altura)),
+    ):
+        with open(os.devnull, 'w') as archivo:
+            tiempo_render, pico_render = pico_memoria(t.render, archivo)
+        tiempo_str, pico_str = pico_memoria(str, t)
+        salida = io.StringIO()
+        tiempo_corto, _ = medir(t.render, salida, 1000)
+        assert salida.getvalue().count('\n') == 1001
+        print(
+            f'{nombre:<22} render: {tiempo_render:.2f}s, pico {pico_render / 2 ** 20:6.2f} MiB  '
+            f'str: {tiempo_str:.2f}s, pico {pico_str / 2 ** 20:6.1f} MiB ({pico_str / pico_render:.0f} veces el de render)  '
+            f'max_nodes=1000: {tiempo_corto * 1e3:.1f} ms'
+        )
+        del t
+
+    cadena = cadena_binaria(arbolbinarioMarian, max(2, n // 100))
+    salida = io.StringIO()
+    tiempo, _ = medir(cadena.render, salida, None, 10)
+    assert salida.getvalue().endswith('... 1 subárbol sin mostrar\n')
+    print(f'cadena de {len(cadena)} nodos con max_depth=10: {tiempo * 1e3:.2f} ms')
+
+
+def bench_persistencia(n: int = 200_000) -> None:
+    '''
+    Guardar y volver a abrir un ArbolBinarioOrdenado de n claves aleatorias:
+    cargar() en el formato compacto (sin crear nodos) y como árbol de nodos,
+    comparado con volver a insertar las claves y con pickle del árbol de nodos.
+    '''
+    def insertar(datos: List[int]) -> Any:
+        t = arbolbinarioordenado.ArbolBinarioOrdenado()
+        for x in datos:
+            t.insertar(x)
+        return t
+
+    datos = claves(n)['aleatorias']
+    tiempo_insertar, t = medir(insertar, datos)
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta = os.path.join(carpeta, 'arbol.bin')
+        ruta_pickle = os.path.join(carpeta, 'arbol.pickle')
+        tiempo_guardar, _ = medir(t.guardar, ruta, 'q')
+        with open(ruta_pickle, 'wb') as archivo:
+            tiempo_pickle, _ = medir(pickle.dump, t, archivo, pickle.HIGHEST_PROTOCOL)
+        tiempo_compacto, compacto = medir(arbolbinariocompacto.ArbolBinarioCompacto.cargar, ruta)
+        tiempo_nodos, u = medir(arbolbinarioordenado.ArbolBinarioOrdenado.cargar, ruta)
+        with open(ruta_pickle, 'rb') as archivo:
+            tiempo_unpickle, _ = medir(pickle.load, archivo)
+        tamanio, tamanio_pickle = os.path.getsize(ruta), os.path.getsize(ruta_pickle)
+
+    assert compacto.inorder() == sorted(datos)
+    assert u == t and u.altura() == t.altura() and u.es_ordenado()
+    print(f'n = {n}  insertar: {tiempo_insertar:.2f}s')
+    print(f'guardar:  {tiempo_guardar:.2f}s, {tamanio / 2 ** 20:6.1f} MiB  pickle.dump: {tiempo_pickle:.2f}s, {tamanio_pickle / 2 ** 20:6.1f} MiB')
+    print(
+        f'cargar compacto: {tiempo_compacto * 1e3:.1f} ms ({tiempo_insertar / tiempo_compacto:.0f} veces menos que insertar)  '
+        f'cargar nodos: {tiempo_nodos:.2f}s  pickle.load: {tiempo_unpickle:.2f}s'
+    )
+
+
+def bench_concurrente(n: int = 100_000, hilos: int = 4, operaciones: int = 20_000) -> None:
+    '''
+    ArbolConcurrente con n claves compartido entre hilos. Primero una prueba de
+    estrés: escritores con claves disjuntas insertan y eliminan mientras lectores
+    verifican cada instantánea (ordenada, len coherente y sin cambios después de
+    que los escritores siguieron). Después, operaciones por segundo y p99 de las
+    lecturas con distintas proporciones de escrituras, comparado con un ArbolAVL
+    protegido por un único lock.
+    '''
+    def armar() -> Any:
+        return arbolbinarioordenadomarian.ArbolAVL.desde_ordenados(range(0, 2 * n, 2))
+
+    arbol: arbolconcurrente.ArbolConcurrente[int] = arbolconcurrente.ArbolConcurrente(armar())
+    esperado = [set(range(i * 2, 2 * n, 2 * hilos)) for i in range(hilos)]
+    errores: List[str] = []
+    terminados = threading.Event()
+
+    def escritor(i: int) -> None:
+        generador = random.Random(i)
+        propias = esperado[i]
+        for _ in range(operaciones // 10):
+            x = generador.randrange(i * 2, 2 * n, 2 * hilos) + generador.randrange(2)
+            if x in propias:
+                arbol.eliminar(x)
+                propias.discard(x)
+            else:
+                arbol.insertar(x)
+                propias.add(x)
+
+    def lector() -> None:
+        anterior = None
+        while not terminados.is_set():
+            t = arbol.instantanea()
+            datos = t.inorder()
+            if len(datos) != len(t) or any(a >= b for a, b in zip(datos, datos[1:])):
+                errores.append('instantánea desordenada o con len incoherente')
+            if anterior is not None and anterior[0].inorder() != anterior[1]:
+                errores.append('una instantánea cambió después de publicada')
+            anterior = (t, datos)
+
+    intervalo = sys.getswitchinterval()
+    sys.setswitchinterval(1e-5)
+    try:
+        lectores = [threading.Thread(target=lector) for _ in range(2)]
+        escritores = [threading.Thread(target=escritor, args=(i,)) for i in range(hilos)]
+        for hilo in lectores + escritores:
+            hilo.start()
+        for hilo in escritores:
+            hilo.join()
+        terminados.set()
+        for hilo in lectores:
+            hilo.join()
+    finally:
+        sys.setswitchinterval(intervalo)
+    assert not errores, errores[:3]
+    assert arbol.inorder() == sorted(set().union(*esperado))
+    assert arbol.instantanea().es_ordenado()
+    print(f'estrés: {hilos} escritores, 2 lectores, {len(arbol)} claves al final: ok')
+
+    class ConLock:
+        def __init__(self) -> None:
+            self.arbol = armar()
+            self.lock = threading.Lock()
+
+        def insertar(self, x: int) -> None:
+            with self.lock:
+                self.arbol.insertar(x)
+
+        def eliminar(self, x: int) -> None:
+            with self.lock:
+                self.arbol.eliminar(x)
+
+        def pertenece(self, x: int) -> bool:
+            with self.lock:
+                return self.arbol.pertenece(x)
+
+    def mezcla(estructura: Any, escrituras: float) -> Tuple[float, float]:
+        latencias: List[List[float]] = [[] for _ in range(hilos)]
+
+        def trabajar(i: int) -> None:
+            generador = random.Random(100 + i)
+            propias = latencias[i]
+            reloj = time.perf_counter
+            for _ in range(operaciones // hilos):
+                x = generador.randrange(2 * n)
+                if generador.random() < escrituras:
+                    if x % 2:
+                        estructura.insertar(x)
+                    else:
+                        estructura.eliminar(x)
+                else:
+                    inicio = reloj()
+                    estructura.pertenece(x)
+                    propias.append(reloj() - inicio)
+
+        trabajadores = [threading.Thread(target=trabajar, args=(i,)) for i in range(hilos)]
+        inicio = time.perf_counter()
+        for hilo in trabajadores:
+            hilo.start()
+        for hilo in trabajadores:
+            hilo.join()
+        tiempo = time.perf_counter() - inicio
+        lecturas = sorted(x for propias in latencias for x in propias)
+        return operaciones / tiempo, lecturas[int(len(lecturas) * 0.99)] if lecturas else 0.0
+
+    for escrituras in (0.0, 0.01, 0.1, 0.5):
+        por_segundo, p99 = mezcla(arbolconcurrente.ArbolConcurrente(armar()), escrituras)
+        por_segundo_lock, p99_lock = mezcla(ConLock(), escrituras)
+        print(
+            f'escrituras {escrituras:4.0%}  instantáneas: {por_segundo:9.0f} op/s, p99 lectura {p99 * 1e6:7.1f} us  '
+            f'lock único: {por_segundo_lock:9.0f} op/s, p99 lectura {p99_lock * 1e6:7.1f} us'
+        )
+
+
+# funciones de módulo para ArbolN.fold: los procesos las reciben por nombre
+def contar_hoja(dato: int) -> int:
+    return 1
+
+
+def contar_nodo(dato: int, hijos: List[int]) -> int:
+    return 1 + sum(hijos)
+
+
+def puntaje_hoja(dato: int) -> int:
+    x = dato
+    for _ in range(40):
+        x = (x * 1103515245 + 12345) & 0x7FFFFFFF
+    return x
+
+
+def puntaje_nodo(dato: int, hijos: List[int]) -> int:
+    return (puntaje_hoja(dato) + max(hijos)) & 0x7FFFFFFF
+
+
+def bench_fold(n: int = 1_000_000) -> None:
+    '''
+    ArbolN.fold sobre un árbol ternario de n nodos, en este proceso y repartido
+    en 1, 2, 4, ... procesos (hasta la cantidad de núcleos), con una función
+    barata (contar nodos) y una cara por nodo (puntaje). El ejecutor se arma
+    antes de medir, así el tiempo no incluye levantar los procesos.
+    '''
+    t = ternario_n(n)
+    nucleos = os.cpu_count() or 1
+    cantidades = [1 << k for k in range(nucleos.bit_length()) if 1 << k <= nucleos]
+    for nombre, hoja, nodo in (('contar', contar_hoja, contar_nodo), ('puntaje', puntaje_hoja, puntaje_nodo)):
+        tiempo_secuencial, esperado = medir(t.fold, hoja, nodo)
+        print(f'{nombre:<8} secuencial: {tiempo_secuencial:.2f}s')
+        for procesos in cantidades:
+            with ProcessPoolExecutor(procesos) as ejecutor:
+                list(ejecutor.map(abs, range(procesos)))
+                tiempo, resultado = medir(t.fold, hoja, nodo, procesos, None, ejecutor)
+            assert resultado == esperado
+            print(f'{nombre:<8} {procesos:>3} procesos: {tiempo:.2f}s  ({tiempo_secuencial / tiempo:.2f}x)')
+    assert t.fold(contar_hoja, contar_nodo) == n
+
+
+def bench_euler(n: int = 1_000_000, consultas: int = 100_000) -> None:
+    '''
+    IndiceEuler sobre un ArbolN aleatorio de n nodos (cada nodo cuelga de uno
+    anterior elegido al azar): tiempo de armado y por consulta de es_ancestro,
+    lca, distancia y tamanio_subarbol, comparado con buscar los dos nodos desde la
+    raíz en cada pregunta.
+    '''
+    generador = random.Random(7)
+    nodos = [arbolNarioMarian.ArbolN(0)]
+    for i in range(1, n):
+        hijo = arbolNarioMarian.ArbolN(i)
+        nodos[generador.randrange(i)].insertar_subarbol(hijo)
+        nodos.append(hijo)
+    tiempo_armado, indice = medir(arbolNarioMarian.IndiceEuler, nodos[0])
+    print(f'n = {n}  armado del índice: {tiempo_armado:.2f}s')
+    pares = [(generador.choice(nodos), generador.choice(nodos)) for _ in range(consultas)]
+
+    def ancestros(objetivo: Any) -> List[Any]:
+        # camino desde la raíz hasta objetivo, buscándolo en preorden
+        pila = [(nodos[0], 0)]
+        camino: List[Any] = []
+        while pila:
+            t, profundidad = pila.pop()
+            del camino[profundidad:]
+            camino.append(t)
+            if t is objetivo:
+                return camino
+            pila.extend((h, profundidad + 1) for h in t._subarboles)
+        return []
+
+    def lca_buscando(a: Any, b: Any) -> Any:
+        comun = None
+        for x, y in zip(ancestros(a), ancestros(b)):
+            if x is not y:
+                break
+            comun = x
+        return comun
+
+    muestra = pares[:20]
+    tiempo_busqueda, esperados = medir(lambda: [lca_buscando(a, b) for a, b in muestra])
+    assert [indice.lca(a, b) for a, b in muestra] == esperados
+    for nombre, consulta in (
+        ('es_ancestro', lambda: [indice.es_ancestro(a, b) for a, b in pares]),
+        ('lca', lambda: [indice.lca(a, b) for a, b in pares]),
+        ('distancia', lambda: [indice.distancia(a, b) for a, b in pares]),
+        ('tamanio_subarbol', lambda: [indice.tamanio_subarbol(a) for a, _ in pares]),
+    ):
+        tiempo, _ = medir(consulta)
+        print(f'{nombre:<17} {tiempo / consultas * 1e6:8.2f} us por consulta')
+    print(f'lca buscando desde la raíz: {tiempo_busqueda / len(muestra) * 1e3:8.2f} ms por consulta')
+
+
+def bench_vistas(n: int = 1_000_000) -> None:
+    '''
+    Contar y recorrer una vez el árbol sin hojas de un ArbolN ternario y de un
+    ArbolBinario completo de ~n nodos (y el espejo del binario): con sin_hojas()
+    y espejo(), que arman el árbol nuevo, y con las vistas perezosas. Tiempo (con
+    tracemalloc activo) y pico de memoria; crear la vista no depende de n.
+    '''
+    altura = max(2, n.bit_length() - 1)
+    for nombre, t, operaciones in (
+        ('arbolNarioMarian', ternario_n(n), ('sin_hojas',)),
+        ('arbolbinarioMarian', completo_binario(arbolbinarioMarian, altura), ('sin_hojas', 'espejo')),
+    ):
+        for operacion in operaciones:
+            tiempo_copia, pico_copia = pico_memoria(lambda: sum(1 for _ in getattr(t, operacion)().iter_preorder()))
+            tiempo_vista, pico_vista = pico_memoria(lambda: sum(1 for _ in getattr(t.vista(), operacion)().iter_preorder()))
+            assert getattr(t, operacion)().preorder() == getattr(t.vista(), operacion)().preorder()
+            print(
+                f'{nombre:<20} {operacion:<10} árbol nuevo: {tiempo_copia:.2f}s, pico {pico_copia / 2 ** 20:6.1f} MiB  '
+                f'vista: {tiempo_vista:.2f}s, pico {pico_vista / 2 ** 20:6.2f} MiB ({pico_copia / pico_vista:.0f} veces menos)'
+            )
+        tiempo, _ = medir(lambda: t.vista().sin_hojas().espejo().filtrar(bool))
+        print(f'{nombre:<20} crear vista sin_hojas().espejo().filtrar(): {tiempo * 1e6:.1f} us')
+
+
+def bench_arbolh(n: int = 200_000) -> None:
+    '''
+    ArbolH de ~n nodos (cada nodo interno con una hoja y dos subárboles, tres
+    hojas en el último nivel) armado con crear_nodo_y_hojas e insertar_subarbol,
+    que controlan los tipos en cada inserción pero no validan el árbol entero, y
+    de una vez con desde_preorden, que sí. Después es_valido() la primera vez y
+    con el resultado guardado.
+    '''
+    altura = max(1, (n // 5).bit_length())
+
+    def en_preorden() -> List[Tuple[Any, int]]:
+        pares: List[Tuple[Any, int]] = []
+        pila = [altura]
+        while pila:
+            nivel = pila.pop()
+            if nivel == 1:
+                pares.append(('x', 3))
+                pares.extend([(1, 0), (2, 0), (3, 0)])
+            else:
+                pares.append(('x', 3))
+                pares.append((0, 0))
+                pila.extend([nivel - 1, nivel - 1])
+        return pares
+
+    def de_a_uno(nivel: int) -> Any:
+        if nivel == 1:
+            return arbol_hojas_marian.ArbolH.crear_nodo_y_hojas('x', 1, 2, 3)
+        t = arbol_hojas_marian.ArbolH.crear_nodo_y_hojas('x', 0)
+        t.insertar_subarbol(de_a_uno(nivel - 1))
+        t.insertar_subarbol(de_a_uno(nivel - 1))
+        return t
+
+    pares = en_preorden()
+    tiempo_de_a_uno, t = medir(de_a_uno, altura)
+    tiempo_lote, u = medir(arbol_hojas_marian.ArbolH.desde_preorden, pares)
+    assert list(t) == list(u) == [dato for dato, _ in pares]
+    tiempo_valido, valido = medir(t.es_valido)
+    tiempo_guardado, valido_guardado = medir(t.es_valido)
+    assert valido and valido_guardado and u.es_valido()
+    print(
+        f'{len(pares)} nodos  insertar_subarbol: {tiempo_de_a_uno:.2f}s (+ es_valido: {tiempo_de_a_uno + tiempo_valido:.2f}s)  '
+        f'desde_preorden, ya validado: {tiempo_lote:.2f}s'
+    )
+    print(f'es_valido: {tiempo_valido * 1e3:.1f} ms, guardado: {tiempo_guardado * 1e6:.1f} us')
+
+
+def expresion_aleatoria(hojas: int, generador: random.Random, variables: str = '') -> List[Tuple[Any, int]]:
+    '''
+    (dato, cantidad de subárboles) en preorden de una ExpresionAritmetica al azar
+    con la cantidad de hojas pedida (floats entre 1 y 2, o con variables, la mitad
+    de las hojas una de ellas) y los cuatro operadores; cada operador reparte sus
+    hojas al azar entre los dos lados.
+    '''
+    operadores = [
+        exprecion_aritmetica_marian.Suma(), exprecion_aritmetica_marian.Resta(),
+        exprecion_aritmetica_marian.Producto(), exprecion_aritmetica_marian.Division(),
+    ]
+    pares: List[Tuple[Any, int]] = []
+    pila = [hojas]
+    while pila:
+        cantidad = pila.pop()
+        if cantidad == 1:
+            if variables and generador.random() < 0.5:
+                pares.append((exprecion_aritmetica_marian.Variable(generador.choice(variables)), 0))
+            else:
+                pares.append((generador.uniform(1, 2), 0))
+        else:
+            izquierda = generador.randint(1, cantidad - 1)
+            pares.append((generador.choice(operadores), 2))
+            pila.extend([cantidad - izquierda, izquierda])
+    return pares
+
+
+def bench_compilar(n: int = 100_000, repeticiones: int = 20) -> None:
+    '''
+    Evaluar repetidas veces expresiones de 10^3 nodos hasta n: con evaluar()
+    (recursiva, sobre los nodos), con el ProgramaPostfijo de compilar() y con
+    la función de Python de a_funcion(). Se informa también lo que tarda armar
+    cada uno, que se paga una sola vez.
+    '''
+    generador = random.Random(11)
+    tamanio = 1_000
+    while tamanio <= n:
+        expresion = exprecion_aritmetica_marian.ExpresionAritmetica.desde_preorden(
+            expresion_aleatoria((tamanio + 1) // 2, generador)
+        )
+        tiempo_compilar, programa = medir(expresion.compilar)
+        tiempo_funcion, funcion = medir(programa.a_funcion)
+        esperado = expresion.evaluar()
+        assert programa.evaluar() == esperado and funcion() == esperado
+
+        def repetir(evaluar: Callable[[], Any]) -> None:
+            for _ in range(repeticiones):
+                evaluar()
+
+        tiempo_arbol, _ = medir(repetir, expresion.evaluar)
+        tiempo_programa, _ = medir(repetir, programa.evaluar)
+        tiempo_python, _ = medir(repetir, funcion)
+        print(
+            f'{len(programa):>7} nodos  compilar: {tiempo_compilar * 1e3:7.1f} ms  a_funcion: {tiempo_funcion * 1e3:7.1f} ms  '
+            f'por evaluación: evaluar() {tiempo_arbol / repeticiones * 1e3:7.2f} ms  '
+            f'programa {tiempo_programa / repeticiones * 1e3:7.2f} ms ({tiempo_arbol / tiempo_programa:.1f}x)  '
+            f'función {tiempo_python / repeticiones * 1e3:7.2f} ms ({tiempo_arbol / tiempo_python:.1f}x)'
+        )
+        tamanio *= 10
+
+
+def bench_lote(n: int = 1_000_000, hojas: int = 32) -> None:
+    '''
+    Una expresión al azar con hojas hojas (la mitad variables x, y, z) evaluada
+    para n filas: fila por fila con evaluar() y con la función de a_funcion()
+    (sobre una muestra), y de una vez con evaluar_lote, con numpy si está
+    instalado y con la versión de listas. Filas por segundo de cada forma.
+    '''
+    generador = random.Random(5)
+    expresion = exprecion_aritmetica_marian.ExpresionAritmetica.desde_preorden(
+        expresion_aleatoria(hojas, generador, 'xyz')
+    )
+    programa = expresion.compilar()
+    columnas = {nombre: array('d', [generador.uniform(1, 2) for _ in range(n)]) for nombre in 'xyz'}
+    muestra = min(n, 20_000)
+    filas = [{nombre: columna[i] for nombre, columna in columnas.items()} for i in range(muestra)]
+    funcion = programa.a_funcion()
+    tiempo_arbol, esperados = medir(lambda: [expresion.evaluar(fila) for fila in filas])
+    tiempo_funcion, obtenidos = medir(lambda: [funcion(fila) for fila in filas])
+    assert obtenidos == esperados
+    print(f'{len(programa)} nodos, {n} filas')
+    print(f'fila por fila, evaluar():      {muestra / tiempo_arbol:14,.0f} filas/s')
+    print(f'fila por fila, a_funcion():    {muestra / tiempo_funcion:14,.0f} filas/s')
+    for nombre, lote in (
+        ('listas', lambda: programa._lote_listas({nombre: list(c) for nombre, c in columnas.items()}, n, None)),
+        ('numpy', (lambda: programa.evaluar_lote(columnas)) if exprecion_aritmetica_marian.np is not None else None),
+    ):
+        if lote is None:
+            print(f'evaluar_lote con {nombre}: no está instalado')
+            continue
+        tiempo, resultado = medir(lote)
+        assert all(abs(r - e) <= 1e-9 * max(1.0, abs(e)) for r, e in zip(resultado, esperados))
+        print(f'evaluar_lote con {nombre:<7}   {n / tiempo:14,.0f} filas/s')
+
+
+def bench_optimizar(n: int = 100_000, bloques: int = 20) -> None:
+    '''
+    Expresión redundante de ~n nodos: sumas y restas de copias de unos pocos
+    bloques al azar (productos y sumas de x, y, 0, 1 y 2, con partes constantes
+    como (2 * 1) + 0). Nodos antes y después de optimizar(), lo que tarda, y
+    cuánto tarda cada evaluación con y sin optimizar, con evaluar(), con el
+    programa compilado y en lote.
+    '''
+    generador = random.Random(13)
+    modulo = exprecion_aritmetica_marian
+    operadores = [modulo.Suma(), modulo.Producto()]
+    datos_hojas = [0, 1, 2, 2.5, modulo.Variable('x'), modulo.Variable('y')]
+
+    def bloque(hojas: int) -> List[Tuple[Any, int]]:
+        if hojas == 1:
+            return [(generador.choice(datos_hojas), 0)]
+        izquierda = generador.randint(1, hojas - 1)
+        return [(generador.choice(operadores), 2)] + bloque(izquierda) + bloque(hojas - izquierda)
+
+    armados = [bloque(generador.randint(3, 8)) for _ in range(bloques)]
+    elegidos = []
+    nodos = 0
+    while nodos < n:
+        elegidos.append(generador.choice(armados))
+        nodos += len(elegidos[-1]) + 1
+    # se combinan en un árbol balanceado para que evaluar() no llegue al límite de recursión
+    pares: List[Tuple[Any, int]] = []
+    pila = [(0, len(elegidos))]
+    while pila:
+        desde, hasta = pila.pop()
+        if hasta - desde == 1:
+            pares.extend(elegidos[desde])
+            continue
+        medio = (desde + hasta) // 2
+        pares.append((generador.choice([modulo.Suma(), modulo.Resta()]), 2))
+        pila.extend([(medio, hasta), (desde, medio)])
+    expresion = modulo.ExpresionAritmetica.desde_preorden(pares)
+
+    tiempo_optimizar, optimizada = medir(expresion.optimizar)
+    print(
+        f'nodos: {expresion.contar_nodos()} antes, {optimizada.contar_nodos()} después de optimizar() '
+        f'({tiempo_optimizar * 1e3:.1f} ms)'
+    )
+    valores = {'x': 1.25, 'y': -0.75}
+    columnas = {nombre: array('d', [generador.uniform(-2, 2) for _ in range(1_000)]) for nombre in 'xy'}
+    for nombre, e in (('original', expresion), ('optimizada', optimizada)):
+        tiempo_compilar, programa = medir(e.compilar)
+        tiempo_arbol, resultado = medir(e.evaluar, valores)
+        tiempo_programa, resultado_programa = medir(programa.evaluar, valores)
+        tiempo_lote, lote = medir(programa.evaluar_lote, columnas)
+        assert resultado_programa == resultado == expresion.evaluar(valores)
+        print(
+            f'{nombre:<10}  {len(programa):>7} códigos (compilar {tiempo_compilar * 1e3:6.1f} ms)  '
+            f'evaluar(): {tiempo_arbol * 1e3:7.2f} ms  programa: {tiempo_programa * 1e3:7.2f} ms  '
+            f'lote de {len(lote)} filas: {tiempo_lote * 1e3:8.2f} ms'
+        )
+
+
+BENCHMARKS: Dict[str, Callable[[int], None]] = {
+    'balanceo': bench_balanceo,
+    'orden_estadistico': bench_orden_estadistico,
+    'carga_masiva': bench_carga_masiva,
+    'injertos': bench_injertos,
+    'eliminar': bench_eliminar,
+    'recursion': bench_recursion,
+    'iteradores': bench_iteradores,
+    'compacto': bench_compacto,
+    'memoria': bench_memoria,
+    'copias': bench_copias,
+    'cache': bench_cache,
+    'bfs': bench_bfs,
+    'indice': bench_indice,
+    'caminos': bench_caminos,
+    'huellas': bench_huellas,
+    'render': bench_render,
+    'persistencia': bench_persistencia,
+    'concurrente': bench_concurrente,
+    'fold': bench_fold,
+    'euler': bench_euler,
+    'vistas': bench_vistas,
+    'arbolh': bench_arbolh,
+    'compilar': bench_compilar,
+    'lote': bench_lote,
+    'optimizar': bench_optimizar,
+}
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in BENCHMARKS:
+        print(f'Uso: python benchmarks.py <{"|".join(BENCHMARKS)}> [n]')
+        return
+    bench = BENCHMARKS[sys.argv[1]]
+    if len(sys.argv) > 2:
+        bench(int(sys.argv[2]))
+    else:
+        bench()
+
+if __name__ == '__main__':
+    main()
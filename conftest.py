@@ -0,0 +1,24 @@
+'''
+Configuración de pytest. Las pruebas marcadas con lento (árboles de un millón de
+nodos) sólo corren con --lento:
+
+    python -m pytest -q --lento
+'''
+import pytest
+
+
+def pytest_addoption(parser):
+    parser.addoption('--lento', action='store_true', default=False, help='corre también las pruebas marcadas con lento')
+
+
+def pytest_configure(config):
+    config.addinivalue_line('markers', 'lento: prueba con árboles grandes, sólo corre con --lento')
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption('--lento'):
+        return
+    saltear = pytest.mark.skip(reason='prueba lenta: correr con --lento')
+    for item in items:
+        if 'lento' in item.keywords:
+            item.add_marker(saltear)
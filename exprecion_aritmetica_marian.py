@@ -1,9 +1,51 @@
 from abc import ABC, abstractmethod
-from typing import TypeAlias
+from array import array
+from itertools import repeat
+from operator import add, mul, sub, truediv
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, TypeAlias
 from arbol_hojas_marian import ArbolH
+from recorridos import posorden
+
+try:
+    import numpy as np
+except ImportError:
+    # evaluar_lote() sigue andando sin numpy, con listas y array('d')
+    np = None
 
 Number: TypeAlias = int | float
 
+
+class Variable:
+    '''
+    Hoja de una ExpresionAritmetica cuyo valor se da al evaluar, por nombre.
+    '''
+    __slots__ = ('nombre',)
+
+    def __init__(self, nombre: str):
+        self.nombre = nombre
+
+    def __eq__(self, otro: object) -> bool:
+        return isinstance(otro, Variable) and otro.nombre == self.nombre
+
+    def __hash__(self) -> int:
+        return hash((Variable, self.nombre))
+
+    def __str__(self) -> str:
+        return self.nombre
+
+    def __repr__(self) -> str:
+        return f'Variable({self.nombre!r})'
+
+
+Hoja: TypeAlias = Number | Variable
+
+
+def _valor_de(nombre: str, valores: Optional[Mapping[str, Any]]) -> Any:
+    if valores is None or nombre not in valores:
+        raise ValueError(f"Falta el valor de la variable {nombre}")
+    return valores[nombre]
+
+
 class Operador(ABC):
     simbolo: str
 
@@ -44,13 +86,282 @@ class Division(Operador):
         return a / b
     
 
-class ExpresionAritmetica(ArbolH[Number,Operador]):
-    def __init__(self, dato: Number):
+# códigos de ProgramaPostfijo: los cuatro operadores de arriba van resueltos en el
+# ciclo de evaluar(); cualquier otro Operador usa un código desde _PRIMERA_PROPIA.
+# _GUARDAR y _CARGAR son para las subexpresiones compartidas (ver optimizar())
+_VALOR, _VARIABLE, _CARGAR, _GUARDAR, _SUMA, _RESTA, _PRODUCTO, _DIVISION = range(8)
+_PRIMERA_PROPIA = 8
+_CODIGOS: Dict[type, int] = {Suma: _SUMA, Resta: _RESTA, Producto: _PRODUCTO, Division: _DIVISION}
+_SIMBOLOS = {_SUMA: '+', _RESTA: '-', _PRODUCTO: '*', _DIVISION: '/'}
+_FUNCIONES = {_SUMA: add, _RESTA: sub, _PRODUCTO: mul, _DIVISION: truediv}
+# en a_funcion(), cada cuántos niveles de paréntesis se guarda el parcial en una variable
+_ANIDAMIENTO = 50
+
+
+class ProgramaPostfijo:
+    '''
+    Una ExpresionAritmetica en notación posfija, lista para evaluarse muchas veces:
+    un arreglo de códigos (_VALOR apila la próxima constante, _VARIABLE el valor
+    de la próxima variable, los operadores operan con los dos valores de arriba de
+    la pila), la lista de constantes y la de nombres de variables, en orden. Una
+    subexpresión compartida se calcula una vez, se guarda en una ranura
+    (_GUARDAR) y después se vuelve a apilar de ahí (_CARGAR); ranuras tiene la
+    ranura de cada uno de esos códigos, en orden.
+    Es una foto de la expresión: si la expresión cambia hay que volver a compilar.
+    '''
+    __slots__ = ('codigos', 'constantes', 'variables', 'ranuras', 'cantidad_ranuras', 'operaciones', '_funcion')
+
+    def __init__(self):
+        self.codigos: array = array('B')
+        self.constantes: List[Number] = []
+        self.variables: List[str] = []
+        self.ranuras: List[int] = []
+        self.cantidad_ranuras = 0
+        # operar de cada clase de Operador sin código propio, por código - _PRIMERA_PROPIA
+        self.operaciones: List[Callable[[Number, Number], Number]] = []
+        self._funcion: Optional[Callable[[], Number]] = None
+
+    def __len__(self) -> int:
+        return len(self.codigos)
+
+    def evaluar(self, valores: Optional[Mapping[str, Number]] = None) -> Number:
+        pila: List[Number] = []
+        apilar, desapilar = pila.append, pila.pop
+        constantes = iter(self.constantes)
+        variables = iter([_valor_de(nombre, valores) for nombre in self.variables])
+        ranuras = iter(self.ranuras)
+        memoria: List[Number] = [0] * self.cantidad_ranuras
+        operaciones = self.operaciones
+        for codigo in self.codigos:
+            if codigo == _VALOR:
+                apilar(next(constantes))
+            elif codigo >= _SUMA:
+                b = desapilar()
+                if codigo == _SUMA:
+                    pila[-1] += b
+                elif codigo == _PRODUCTO:
+                    pila[-1] *= b
+                elif codigo == _RESTA:
+                    pila[-1] -= b
+                elif codigo == _DIVISION:
+                    pila[-1] /= b
+                else:
+                    pila[-1] = operaciones[codigo - _PRIMERA_PROPIA](pila[-1], b)
+            elif codigo == _VARIABLE:
+                apilar(next(variables))
+            elif codigo == _CARGAR:
+                apilar(memoria[next(ranuras)])
+            else:
+                memoria[next(ranuras)] = pila[-1]
+        return pila[0]
+
+    def a_funcion(self) -> Callable[[], Number]:
+        '''
+        Traduce el programa a una función de Python armada con compile(): las
+        operaciones quedan como expresiones con paréntesis y cada _ANIDAMIENTO
+        niveles el parcial pasa a una variable local (el parser de Python no acepta
+        anidamientos muy profundos). Las constantes se leen de k y no van como
+        literales, así Python no las pliega al compilar y la función sigue haciendo
+        las cuentas. La función recibe los valores de las variables igual que
+        evaluar(). Se arma una sola vez y queda guardada.
+        '''
+        if self._funcion is not None:
+            return self._funcion
+        distintas = list(dict.fromkeys(self.variables))
+        posicion = {nombre: i for i, nombre in enumerate(distintas)}
+        renglones = ['def expresion(valores=None, k=k, f=f, r=r):']
+        if distintas:
+            renglones.append('    v = r(valores)')
+        pila: List[tuple] = []  # (texto, anidamiento)
+        temporales = 0
+        constantes = iter(range(len(self.constantes)))
+        variables = iter(self.variables)
+        ranuras = iter(self.ranuras)
+        for codigo in self.codigos:
+            if codigo == _VALOR:
+                pila.append((f'k[{next(constantes)}]', 0))
+                continue
+            if codigo == _VARIABLE:
+                pila.append((f'v[{posicion[next(variables)]}]', 0))
+                continue
+            if codigo == _CARGAR:
+                pila.append((f'm{next(ranuras)}', 0))
+                continue
+            if codigo == _GUARDAR:
+                ranura = next(ranuras)
+                renglones.append(f'    m{ranura} = {pila[-1][0]}')
+                pila[-1] = (f'm{ranura}', 0)
+                continue
+            b, anidamiento_b = pila.pop()
+            a, anidamiento_a = pila.pop()
+            if codigo in _SIMBOLOS:
+                texto = f'({a} {_SIMBOLOS[codigo]} {b})'
+            else:
+                texto = f'f[{codigo - _PRIMERA_PROPIA}]({a}, {b})'
+            anidamiento = max(anidamiento_a, anidamiento_b) + 1
+            if anidamiento >= _ANIDAMIENTO:
+                renglones.append(f'    t{temporales} = {texto}')
+                texto, anidamiento = f't{temporales}', 0
+                temporales += 1
+            pila.append((texto, anidamiento))
+        renglones.append(f'    return {pila[0][0]}')
+        espacio = {
+            'k': tuple(self.constantes), 'f': tuple(self.operaciones),
+            'r': lambda valores: [_valor_de(nombre, valores) for nombre in distintas],
+        }
+        exec(compile('\n'.join(renglones), '<expresion compilada>', 'exec'), espacio)
+        self._funcion = espacio['expresion']
+        return self._funcion
+
+    def evaluar_lote(self, valores: Mapping[str, Sequence[Number]], division_por_cero: Optional[float] = None) -> Any:
+        '''
+        Evalúa la expresión para muchas filas a la vez: valores da una columna por
+        variable (arreglo de numpy, array.array o lista, todas del mismo largo) y el
+        programa se recorre una sola vez, con cada operador aplicado a columnas
+        enteras. Con numpy instalado cada operador es una operación de numpy (sobre
+        float64, reusando los arreglos intermedios) y devuelve un arreglo de numpy;
+        si no, opera con map sobre listas y devuelve un array('d').
+
+        Una división por cero lanza ZeroDivisionError, salvo que se pase
+        division_por_cero: entonces ese es el resultado de cada división por cero.
+        Un operador que no es uno de los cuatro de este módulo recibe, con numpy,
+        las columnas enteras.
+        '''
+        if not valores:
+            raise ValueError("Hace falta al menos una columna de valores")
+        largos = {len(columna) for columna in valores.values()}
+        if len(largos) > 1:
+            raise ValueError("Todas las columnas tienen que tener la misma cantidad de valores")
+        filas = largos.pop()
+        columnas = {nombre: _valor_de(nombre, valores) for nombre in dict.fromkeys(self.variables)}
+        if np is not None:
+            # como con floats de Python, inf - inf da nan sin avisar
+            with np.errstate(all='ignore'):
+                return self._lote_numpy({n: np.asarray(c, dtype=np.float64) for n, c in columnas.items()}, filas, division_por_cero)
+        return self._lote_listas({n: c if type(c) is list else list(c) for n, c in columnas.items()}, filas, division_por_cero)
+
+    def _operar_valores(self, codigo: int, a: Number, b: Number, division_por_cero: Optional[float]) -> Number:
+        # las partes constantes de la expresión, que en el lote no son columnas
+        if codigo == _DIVISION and b == 0 and division_por_cero is not None:
+            return division_por_cero
+        if codigo < _PRIMERA_PROPIA:
+            return _FUNCIONES[codigo](a, b)
+        return self.operaciones[codigo - _PRIMERA_PROPIA](a, b)
+
+    def _lote_numpy(self, columnas: Dict[str, Any], filas: int, division_por_cero: Optional[float]) -> Any:
+        pila: List[Any] = []
+        # propios[i]: pila[i] es un arreglo intermedio, que se puede usar de salida
+        propios: List[bool] = []
+        constantes = iter(self.constantes)
+        variables = iter(self.variables)
+        ranuras = iter(self.ranuras)
+        memoria: List[Any] = [None] * self.cantidad_ranuras
+        for codigo in self.codigos:
+            if codigo == _VALOR:
+                pila.append(next(constantes))
+                propios.append(False)
+                continue
+            if codigo == _VARIABLE:
+                pila.append(columnas[next(variables)])
+                propios.append(False)
+                continue
+            if codigo == _CARGAR:
+                pila.append(memoria[next(ranuras)])
+                propios.append(False)
+                continue
+            if codigo == _GUARDAR:
+                # ya no se puede pisar: se vuelve a leer desde la ranura
+                memoria[next(ranuras)] = pila[-1]
+                propios[-1] = False
+                continue
+            b, b_propio = pila.pop(), propios.pop()
+            a, a_propio = pila[-1], propios[-1]
+            if not isinstance(a, np.ndarray) and not isinstance(b, np.ndarray):
+                pila[-1] = self._operar_valores(codigo, a, b, division_por_cero)
+                continue
+            salida = a if a_propio else b if b_propio else None
+            if codigo == _SUMA:
+                resultado = np.add(a, b, out=salida)
+            elif codigo == _PRODUCTO:
+                resultado = np.multiply(a, b, out=salida)
+            elif codigo == _RESTA:
+                resultado = np.subtract(a, b, out=salida)
+            elif codigo == _DIVISION:
+                ceros = b == 0
+                if division_por_cero is None and np.any(ceros):
+                    raise ZeroDivisionError("División por cero en el lote")
+                resultado = np.divide(a, b, out=salida)
+                if division_por_cero is not None and np.any(ceros):
+                    resultado[ceros] = division_por_cero
+            else:
+                resultado = self.operaciones[codigo - _PRIMERA_PROPIA](a, b)
+            pila[-1] = resultado
+            propios[-1] = codigo < _PRIMERA_PROPIA
+        if not isinstance(pila[0], np.ndarray):
+            return np.full(filas, pila[0], dtype=np.float64)
+        return pila[0] if propios[0] else np.array(pila[0], dtype=np.float64)
+
+    def _lote_listas(self, columnas: Dict[str, List[Number]], filas: int, division_por_cero: Optional[float]) -> array:
+        pila: List[Any] = []
+        constantes = iter(self.constantes)
+        variables = iter(self.variables)
+
+        def por_filas(f: Callable[[Number, Number], Number], a: Any, b: Any) -> List[Number]:
+            if type(a) is not list:
+                return list(map(f, repeat(a, filas), b))
+            return list(map(f, a, b if type(b) is list else repeat(b, filas)))
+
+        def dividir(a: Number, b: Number) -> Number:
+            return a / b if b else division_por_cero
+
+        ranuras = iter(self.ranuras)
+        memoria: List[Any] = [None] * self.cantidad_ranuras
+        for codigo in self.codigos:
+            if codigo == _VALOR:
+                pila.append(next(constantes))
+                continue
+            if codigo == _VARIABLE:
+                pila.append(columnas[next(variables)])
+                continue
+            if codigo == _CARGAR:
+                pila.append(memoria[next(ranuras)])
+                continue
+            if codigo == _GUARDAR:
+                memoria[next(ranuras)] = pila[-1]
+                continue
+            b = pila.pop()
+            a = pila[-1]
+            if type(a) is not list and type(b) is not list:
+                pila[-1] = self._operar_valores(codigo, a, b, division_por_cero)
+            elif codigo == _DIVISION:
+                try:
+                    pila[-1] = por_filas(truediv, a, b)
+                except ZeroDivisionError:
+                    if division_por_cero is None:
+                        raise
+                    pila[-1] = por_filas(dividir, a, b)
+            elif codigo < _PRIMERA_PROPIA:
+                pila[-1] = por_filas(_FUNCIONES[codigo], a, b)
+            else:
+                pila[-1] = por_filas(self.operaciones[codigo - _PRIMERA_PROPIA], a, b)
+        if type(pila[0]) is not list:
+            return array('d', [pila[0]]) * filas
+        return array('d', pila[0])
+
+
+class ExpresionAritmetica(ArbolH[Hoja,Operador]):
+    __slots__ = ()
+
+    def __init__(self, dato: Hoja | Operador):
         super().__init__(dato)
 
     @staticmethod
     def valor(valor: Number) -> "ExpresionAritmetica":
         return ExpresionAritmetica(valor)
+
+    @staticmethod
+    def variable(nombre: str) -> "ExpresionAritmetica":
+        return ExpresionAritmetica(Variable(nombre))
     
     @staticmethod
     def _crear_operacion(operador: Operador, operando_1: "ExpresionAritmetica", operando_2: "ExpresionAritmetica") -> "ExpresionAritmetica":
@@ -75,16 +386,167 @@ class ExpresionAritmetica(ArbolH[Number,Operador]):
     def division(operando_1: "ExpresionAritmetica", operando_2: "ExpresionAritmetica") -> "ExpresionAritmetica":
         return ExpresionAritmetica._crear_operacion(Division(), operando_1, operando_2)
     
+    def _tipos(self) -> tuple:
+        # los nodos son operadores de distintas clases
+        return (int, float, Variable), Operador
+
     def es_valor(self) -> bool:
         return self.es_hoja()
+
+    def es_variable(self) -> bool:
+        return self.es_hoja() and isinstance(self._dato, Variable)
     
-    def evaluar(self) -> Number:
+    def evaluar(self, valores: Optional[Mapping[str, Number]] = None) -> Number:
         if self.es_valor():
-            return self.dato_hoja()
+            dato = self.dato_hoja()
+            return _valor_de(dato.nombre, valores) if isinstance(dato, Variable) else dato
         operador = self.dato_nodo()
         operando_1, operando_2 = self.subarboles
-        return operador.operar(operando_1.evaluar(), operando_2.evaluar())
+        return operador.operar(operando_1.evaluar(valores), operando_2.evaluar(valores))
+
+    def evaluar_lote(self, valores: Mapping[str, Sequence[Number]], division_por_cero: Optional[float] = None) -> Any:
+        '''
+        Compila la expresión y la evalúa para todas las filas de valores, ver
+        ProgramaPostfijo.evaluar_lote.
+        '''
+        return self.compilar().evaluar_lote(valores, division_por_cero)
     
+    def compilar(self) -> ProgramaPostfijo:
+        '''
+        Recorre la expresión una vez en posorden (sin recursión) y arma su
+        ProgramaPostfijo, que evalúa sin pasar por los nodos. Si la expresión
+        comparte subexpresiones (como las que devuelve optimizar()), cada una se
+        calcula una sola vez por evaluación.
+        '''
+        programa = ProgramaPostfijo()
+        codigos, constantes, ranuras = programa.codigos, programa.constantes, programa.ranuras
+        propios: Dict[type, int] = {}
+        # cuántas veces aparece cada nodo como subárbol de otro
+        usos: Dict[int, int] = {}
+        pendientes = [self]
+        while pendientes:
+            t = pendientes.pop()
+            usos[id(t)] = usos.get(id(t), 0) + 1
+            if usos[id(t)] == 1:
+                pendientes.extend(t._subarboles)
+        # ranura de cada nodo compartido ya calculado: las otras veces no se recorre
+        ranura_de: Dict[int, int] = {}
+
+        def hijos(t: ExpresionAritmetica) -> list:
+            return [] if id(t) in ranura_de else t._subarboles
+
+        for t in posorden(self, hijos):
+            if id(t) in ranura_de:
+                codigos.append(_CARGAR)
+                ranuras.append(ranura_de[id(t)])
+                continue
+            if not t._subarboles:
+                if isinstance(t._dato, Variable):
+                    codigos.append(_VARIABLE)
+                    programa.variables.append(t._dato.nombre)
+                else:
+                    codigos.append(_VALOR)
+                    constantes.append(t._dato)
+                continue
+            if len(t._subarboles) != 2:
+                raise ValueError("Cada operador tiene que tener dos operandos")
+            clase = type(t._dato)
+            codigo = _CODIGOS.get(clase)
+            if codigo is None:
+                codigo = propios.get(clase)
+                if codigo is None:
+                    codigo = propios[clase] = _PRIMERA_PROPIA + len(programa.operaciones)
+                    programa.operaciones.append(clase.operar)
+            codigos.append(codigo)
+            if usos[id(t)] > 1:
+                ranura_de[id(t)] = len(ranura_de)
+                codigos.append(_GUARDAR)
+                ranuras.append(ranura_de[id(t)])
+        programa.cantidad_ranuras = len(ranura_de)
+        return programa
+
+    def optimizar(self, asumir_finitos: bool = False) -> "ExpresionAritmetica":
+        '''
+        Devuelve una expresión equivalente, nueva (self no cambia), en la que:
+        - cada operación entre dos constantes queda calculada (salvo que dé error,
+          como una división por cero: ésa queda para cuando se evalúe);
+        - x + 0, 0 + x, x - 0, x * 1 y 1 * x quedan en x, con 0 y 1 enteros, que
+          no cambian el tipo del resultado (x + 0 sí puede dar -0.0 donde antes
+          daba 0.0);
+        - las subexpresiones iguales son un mismo nodo, así que el resultado es un
+          grafo: no hay que modificarlo, y compilar() calcula cada una una vez
+          (evaluar() recorre los nodos y las repite).
+        x * 0 y 0 * x sólo quedan en 0 con asumir_finitos, porque con x infinito,
+        nan o una división por cero no da 0.
+        '''
+        unicos: Dict[tuple, ExpresionAritmetica] = {}
+        # nodo de self -> nodo equivalente del resultado
+        nuevos: Dict[int, ExpresionAritmetica] = {}
+
+        def unico(clave: tuple, crear: Callable[[], "ExpresionAritmetica"]) -> "ExpresionAritmetica":
+            nodo = unicos.get(clave)
+            if nodo is None:
+                nodo = unicos[clave] = crear()
+            return nodo
+
+        def hoja(dato: Hoja) -> "ExpresionAritmetica":
+            # float por hex(): 0.0 y -0.0 son iguales con == pero no se pueden juntar
+            clave = (float, dato.hex()) if type(dato) is float else (type(dato), dato)
+            return unico(clave, lambda: ExpresionAritmetica(dato))
+
+        def es_constante(t: ExpresionAritmetica, valor: int, solo_enteros: bool = True) -> bool:
+            dato = t._dato
+            return not t._subarboles and (type(dato) is int or not solo_enteros and type(dato) is float) and dato == valor
+
+        def hijos(t: ExpresionAritmetica) -> list:
+            return [] if id(t) in nuevos else t._subarboles
+
+        for t in posorden(self, hijos):
+            if id(t) in nuevos:
+                continue
+            if not t._subarboles:
+                nuevos[id(t)] = hoja(t._dato)
+                continue
+            if len(t._subarboles) != 2:
+                raise ValueError("Cada operador tiene que tener dos operandos")
+            operador = t._dato
+            clase = type(operador)
+            a, b = nuevos[id(t._subarboles[0])], nuevos[id(t._subarboles[1])]
+            resultado: Optional[ExpresionAritmetica] = None
+            if not a._subarboles and not b._subarboles and not isinstance(a._dato, Variable) and not isinstance(b._dato, Variable):
+                try:
+                    resultado = hoja(operador.operar(a._dato, b._dato))
+                except ArithmeticError:
+                    pass
+            elif clase is Suma and (es_constante(a, 0) or es_constante(b, 0)):
+                resultado = b if es_constante(a, 0) else a
+            elif clase is Resta and es_constante(b, 0):
+                resultado = a
+            elif clase is Producto and (es_constante(a, 1) or es_constante(b, 1)):
+                resultado = b if es_constante(a, 1) else a
+            elif clase is Producto and asumir_finitos and (es_constante(a, 0, False) or es_constante(b, 0, False)):
+                resultado = a if es_constante(a, 0, False) else b
+            if resultado is None:
+                resultado = unico(
+                    (clase, id(a), id(b)), lambda: ExpresionAritmetica._crear_operacion(operador, a, b)
+                )
+            nuevos[id(t)] = resultado
+        return nuevos[id(self)]
+
+    def contar_nodos(self) -> int:
+        '''
+        Cantidad de nodos distintos: en una expresión optimizada cada subexpresión
+        compartida cuenta una vez.
+        '''
+        vistos = set()
+        pendientes = [self]
+        while pendientes:
+            t = pendientes.pop()
+            if id(t) not in vistos:
+                vistos.add(id(t))
+                pendientes.extend(t._subarboles)
+        return len(vistos)
+
     def __str__(self) -> str:
         return super().__str__()
     
@@ -112,6 +574,34 @@ def main():
 
     print(expresion)
     print(f'El resultado es: {expresion.evaluar()}')
+    print(f'Válida: {expresion.es_valido()}')
+
+    programa = expresion.compilar()
+    print(f'Compilada: {len(programa)} códigos, {programa.evaluar()}; como función de Python: {programa.a_funcion()()}')
+
+    # (x + 1) * y / (x - 2)
+    con_variables = ExpresionAritmetica.division(
+        ExpresionAritmetica.producto(
+            ExpresionAritmetica.suma(ExpresionAritmetica.variable('x'), ExpresionAritmetica.valor(1)),
+            ExpresionAritmetica.variable('y')
+        ),
+        ExpresionAritmetica.resta(ExpresionAritmetica.variable('x'), ExpresionAritmetica.valor(2))
+    )
+    print(f'Con x = 4, y = 3: {con_variables.evaluar({"x": 4, "y": 3})}')
+    columnas = {'x': array('d', [0, 1, 2, 3, 4]), 'y': array('d', [1, 1, 1, 2, 3])}
+    lote = con_variables.evaluar_lote(columnas, division_por_cero=float('inf'))
+    print(f'En lote, con división por cero = inf: {[float(r) for r in lote]}')
+
+    # (x * 1 + 2 * 3) * (x * 1 + 2 * 3): se pliega 2 * 3, se saca el * 1 y se comparte el factor
+    def factor() -> ExpresionAritmetica:
+        return ExpresionAritmetica.suma(
+            ExpresionAritmetica.producto(ExpresionAritmetica.variable('x'), ExpresionAritmetica.valor(1)),
+            ExpresionAritmetica.producto(ExpresionAritmetica.valor(2), ExpresionAritmetica.valor(3))
+        )
+    redundante = ExpresionAritmetica.producto(factor(), factor())
+    optimizada = redundante.optimizar()
+    print(f'Optimizada: {redundante.contar_nodos()} nodos antes, {optimizada.contar_nodos()} después; '
+          f'con x = 2: {redundante.evaluar({"x": 2})} y {optimizada.compilar().evaluar({"x": 2})}')
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
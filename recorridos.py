@@ -0,0 +1,300 @@
+'''
+Recorridos con pila explícita, compartidos por todas las clases de árboles.
+
+Cada función recibe el árbol y una función hijos(arbol) que devuelve la lista de
+sus subárboles (para los binarios: [si, sd], o [] si el árbol es vacío). Como la
+pila es una lista de Python y no la pila de ejecución, la profundidad sólo está
+limitada por la memoria y no por el límite de recursión.
+'''
+from collections import deque
+import sys
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, TextIO, Tuple, TypeVar
+
+A = TypeVar('A')
+R = TypeVar('R')
+D = TypeVar('D')
+
+Hijos = Callable[[A], Sequence[A]]
+
+
+def preorden(arbol: A, hijos: Hijos) -> Iterator[A]:
+    pila = [arbol]
+    while pila:
+        actual = pila.pop()
+        yield actual
+        pila.extend(reversed(hijos(actual)))
+
+
+def preorden_con_nivel(arbol: A, hijos: Hijos) -> Iterator[Tuple[A, int]]:
+    pila = [(arbol, 0)]
+    while pila:
+        actual, nivel = pila.pop()
+        yield actual, nivel
+        pila.extend((subarbol, nivel + 1) for subarbol in reversed(hijos(actual)))
+
+
+def posorden(arbol: A, hijos: Hijos) -> Iterator[A]:
+    pila: List[Tuple[A, bool]] = [(arbol, False)]
+    while pila:
+        actual, visitado = pila.pop()
+        if visitado:
+            yield actual
+        else:
+            pila.append((actual, True))
+            pila.extend((subarbol, False) for subarbol in reversed(hijos(actual)))
+
+
+def por_niveles(arbol: A, hijos: Hijos) -> Iterator[A]:
+    cola = deque([arbol])
+    while cola:
+        actual = cola.popleft()
+        yield actual
+        cola.extend(hijos(actual))
+
+
+def niveles(arbol: A, hijos: Hijos) -> Iterator[List[A]]:
+    '''
+    Recorrido por niveles que entrega cada nivel como una lista. No hace falta una
+    cola: con el nivel actual se arma la lista del siguiente y se las intercambia.
+    Un nivel se arma recién cuando se lo pide, así que cortar el recorrido no
+    visita los niveles de abajo.
+    '''
+    nivel = [arbol]
+    while nivel:
+        yield nivel
+        siguiente: List[A] = []
+        for actual in nivel:
+            siguiente.extend(hijos(actual))
+        nivel = siguiente
+
+
+def ancho_maximo(arbol: A, hijos: Hijos) -> int:
+    return max(len(nivel) for nivel in niveles(arbol, hijos))
+
+
+def buscar_por_niveles(arbol: A, hijos: Hijos, predicado: Callable[[A], bool]) -> Optional[Tuple[A, int]]:
+    '''
+    Primer subárbol en orden por niveles que cumple el predicado, con su nivel; o
+    None. Es el más cercano a la raíz.
+    '''
+    for profundidad, nivel in enumerate(niveles(arbol, hijos)):
+        for actual in nivel:
+            if predicado(actual):
+                return actual, profundidad
+    return None
+
+
+# Entrada del índice de valores: (nivel, dirección desde el padre, entrada del padre).
+# La raíz es (0, None, None).
+Entrada = Tuple[int, Any, Optional[tuple]]
+
+
+def indice_de_valores(
+    arbol: A,
+    hijos_con_direccion: Callable[[A], Iterable[Tuple[D, A]]],
+    dato: Callable[[A], Any],
+    por_niveles: bool = False,
+) -> Dict[Any, Entrada]:
+    '''
+    Diccionario dato -> entrada armado en una sola pasada. Cada entrada apunta a la
+    de su padre, así el índice ocupa O(n) aunque el árbol sea profundo, y el camino
+    desde la raíz se arma con camino_de(entrada) en O(nivel). Si un dato se repite
+    queda su primera aparición en preorden, o por niveles si por_niveles es True.
+    Los datos tienen que ser hashables.
+    '''
+    indice: Dict[Any, Entrada] = {}
+    pendientes = deque([(arbol, (0, None, None))])
+    sacar = pendientes.popleft if por_niveles else pendientes.pop
+    while pendientes:
+        actual, entrada = sacar()
+        indice.setdefault(dato(actual), entrada)
+        nivel = entrada[0] + 1
+        siguientes = [(subarbol, (nivel, direccion, entrada)) for direccion, subarbol in hijos_con_direccion(actual)]
+        pendientes.extend(siguientes if por_niveles else reversed(siguientes))
+    return indice
+
+
+def camino_de(entrada: Entrada) -> list:
+    camino = []
+    while entrada[2] is not None:
+        camino.append(entrada[1])
+        entrada = entrada[2]
+    camino.reverse()
+    return camino
+
+
+def escribir_sangrado(
+    arbol: A,
+    hijos: Hijos,
+    renglon: Callable[[A], str],
+    sink: Optional[TextIO] = None,
+    max_nodes: Optional[int] = None,
+    max_depth: Optional[int] = None,
+    es_vacio: Optional[Callable[[A], bool]] = None,
+    sangria: str = '.' * 4,
+) -> int:
+    '''
+    Escribe en sink (por defecto la salida estándar) un renglón por subárbol en
+    preorden, con la sangría repetida tantas veces como su nivel. Los renglones se
+    mandan en bloques, así que la memoria no depende del tamaño del árbol.
+
+    Con max_nodes se escriben a lo sumo esos renglones y con max_depth no se baja
+    de ese nivel (la raíz es el nivel 0). Si algo queda afuera se termina con un
+    renglón que dice cuántos subárboles no se mostraron (sin contar los vacíos si se
+    pasa es_vacio). Devuelve la cantidad de renglones de subárboles escritos.
+    '''
+    sink = sys.stdout if sink is None else sink
+    pendientes: List[Tuple[A, int]] = [(arbol, 0)]
+    bloque: List[str] = []
+    caracteres = escritos = omitidos = 0
+    while pendientes:
+        if max_nodes is not None and escritos >= max_nodes:
+            omitidos += sum(1 for t, _ in pendientes if es_vacio is None or not es_vacio(t))
+            break
+        actual, nivel = pendientes.pop()
+        texto = sangria * nivel + renglon(actual) + '\n'
+        bloque.append(texto)
+        escritos += 1
+        # se corta por caracteres y no por renglones: en un árbol profundo la
+        # sangría hace que cada renglón sea largo
+        caracteres += len(texto)
+        if caracteres >= 1 << 16:
+            sink.write(''.join(bloque))
+            bloque.clear()
+            caracteres = 0
+        subarboles = hijos(actual)
+        if max_depth is not None and nivel >= max_depth:
+            omitidos += sum(1 for t in subarboles if es_vacio is None or not es_vacio(t))
+        else:
+            pendientes.extend((subarbol, nivel + 1) for subarbol in reversed(subarboles))
+    if omitidos:
+        bloque.append(f'... {omitidos} {"subárbol" if omitidos == 1 else "subárboles"} sin mostrar\n')
+    sink.write(''.join(bloque))
+    return escritos
+
+
+def _prefijo_comun(a: Sequence, b: Sequence) -> int:
+    # largo del prefijo común comparando rebanadas (en C) con búsqueda binaria,
+    # en lugar de un paso de Python por elemento
+    desde, hasta = 0, min(len(a), len(b))
+    if a[:hasta] == b[:hasta]:
+        return hasta
+    while desde < hasta:
+        medio = (desde + hasta + 1) // 2
+        if a[desde:medio] == b[desde:medio]:
+            desde = medio
+        else:
+            hasta = medio - 1
+    return desde
+
+
+def resolver_caminos(
+    arbol: A, caminos: Iterable[Sequence[D]], bajar: Callable[[A, D], Optional[A]]
+) -> List[Optional[A]]:
+    '''
+    Subárbol al que lleva cada camino, o None si bajar() devuelve None en algún paso
+    (el camino se sale del árbol). Los caminos iguales se resuelven una vez y los
+    distintos se recorren en orden lexicográfico, que es el preorden del trie de
+    sus prefijos: cada uno arranca desde donde se separa del anterior, así que un
+    prefijo compartido se baja una sola vez para todo el lote.
+    '''
+    grupos: dict = {}
+    cantidad = 0
+    for i, camino in enumerate(caminos):
+        clave = camino if isinstance(camino, (str, bytes, tuple)) else tuple(camino)
+        grupos.setdefault(clave, []).append(i)
+        cantidad = i + 1
+    destinos: List[Optional[A]] = [None] * cantidad
+    # pila[j]: subárbol después de j pasos del camino anterior (None si se salió)
+    pila: List[Optional[A]] = [arbol]
+    anterior: Sequence[D] = ()
+    for camino in sorted(grupos):
+        comun = _prefijo_comun(camino, anterior)
+        del pila[comun + 1:]
+        actual = pila[-1]
+        for direccion in camino[comun:]:
+            if actual is not None:
+                actual = bajar(actual, direccion)
+            pila.append(actual)
+        for i in grupos[camino]:
+            destinos[i] = actual
+        anterior = camino
+    return destinos
+
+
+def inorden(arbol: A, izquierdo: Callable[[A], A], derecho: Callable[[A], A], es_vacio: Callable[[A], bool]) -> Iterator[A]:
+    pila: List[A] = []
+    actual = arbol
+    while not es_vacio(actual) or pila:
+        while not es_vacio(actual):
+            pila.append(actual)
+            actual = izquierdo(actual)
+        actual = pila.pop()
+        yield actual
+        actual = derecho(actual)
+
+
+def plegar(arbol: A, hijos: Hijos, combinar: Callable[[A, List[R]], R]) -> R:
+    '''
+    Calcula combinar(subarbol, resultados_de_sus_hijos) de las hojas hacia la raíz y
+    devuelve el resultado de la raíz. Sirve para altura, copias, espejo, etc.
+    '''
+    resultados: List[R] = []
+    pila: List[Tuple[A, Optional[Sequence[A]]]] = [(arbol, None)]
+    while pila:
+        actual, subarboles = pila.pop()
+        if subarboles is None:
+            subarboles = hijos(actual)
+            pila.append((actual, subarboles))
+            pila.extend((subarbol, None) for subarbol in reversed(subarboles))
+        else:
+            cantidad = len(subarboles)
+            if cantidad:
+                de_los_hijos = resultados[-cantidad:]
+                del resultados[-cantidad:]
+            else:
+                de_los_hijos = []
+            resultados.append(combinar(actual, de_los_hijos))
+    return resultados[0]
+
+
+def plegar_serializado(
+    datos: Sequence[D], grados: Sequence[int], hoja: Callable[[D], R], combinar: Callable[[D, List[R]], R]
+) -> List[R]:
+    '''
+    plegar sobre un bosque guardado en preorden como dos arreglos: el dato y la
+    cantidad de hijos de cada nodo. hoja(dato) en los nodos sin hijos y
+    combinar(dato, resultados_de_los_hijos) en los demás. Devuelve el resultado de
+    cada raíz del bosque, en orden. Los nodos se recorren de atrás para adelante
+    (los descendientes de un nodo están después que él), así que alcanza con una
+    pila de resultados y no hace falta armar ningún nodo.
+    '''
+    resultados: List[R] = []
+    for dato, grado in zip(reversed(datos), reversed(grados)):
+        if grado:
+            de_los_hijos = resultados[:-grado - 1:-1]
+            del resultados[-grado:]
+            resultados.append(combinar(dato, de_los_hijos))
+        else:
+            resultados.append(hoja(dato))
+    resultados.reverse()
+    return resultados
+
+
+def iguales(a: A, b: A, hijos: Hijos, mismo_nodo: Callable[[A, A], bool]) -> bool:
+    '''
+    Recorre los dos árboles en paralelo y corta en la primera diferencia. Un
+    subárbol compartido por los dos (el mismo objeto) no se recorre.
+    '''
+    pila = [(a, b)]
+    while pila:
+        x, y = pila.pop()
+        if x is y:
+            continue
+        if not mismo_nodo(x, y):
+            return False
+        hijos_x, hijos_y = hijos(x), hijos(y)
+        if len(hijos_x) != len(hijos_y):
+            return False
+        pila.extend(zip(hijos_x, hijos_y))
+    return True
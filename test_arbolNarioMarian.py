@@ -0,0 +1,97 @@
+'''
+ArbolN: las modificaciones pasan por insertar_subarbol y los setters, así que
+las huellas guardadas nunca dejan a __eq__ con un resultado viejo. Las huellas,
+el índice de nivel() e IndiceEuler se invalidan por árbol.
+'''
+import threading
+
+import pytest
+
+from arbolNarioMarian import ArbolN, IndiceEuler
+
+
+def arbol(*datos) -> ArbolN:
+    t = ArbolN(datos[0])
+    for dato in datos[1:]:
+        t.insertar_subarbol(ArbolN(dato))
+    return t
+
+
+def test_subarboles_es_de_solo_lectura():
+    t = arbol(1, 2, 3)
+    assert isinstance(t.subarboles, tuple)
+    with pytest.raises(AttributeError):
+        t.subarboles.append(ArbolN(4))
+    t.subarboles = [h for h in t.subarboles if h.dato != 2]
+    assert t.preorder() == [1, 3]
+
+
+def test_igualdad_despues_de_calcular_huellas():
+    a, b = arbol(1, 2), arbol(1, 2, 3)
+    assert a != b
+    a.insertar_subarbol(ArbolN(3))
+    assert a == b
+    a.subarboles = list(a.subarboles) + [ArbolN(4)]
+    assert a != b
+    b.subarboles = b.subarboles + (ArbolN(4),)
+    assert a == b
+    a.subarboles[0].dato = 9
+    assert a != b
+
+
+def test_igualdad_compara_primero_el_dato():
+    assert arbol(1, 2) != arbol(2, 2)
+    assert arbol([1], [2]) == arbol([1], [2])
+    assert arbol([1], [2]) != arbol([1], [3])
+
+
+def test_indice_por_arbol():
+    t, otro = arbol(1, 2, 3), arbol(10, 20)
+    hoja = t.subarboles[0]
+    t.indexar()
+    euler = IndiceEuler(t)
+    otro.insertar_subarbol(ArbolN(30))
+    otro.dato = 11
+    # modificar otro árbol no descarta el índice ni reconstruye IndiceEuler
+    assert t._indice_vigente() is not None and euler._version == t._version()
+
+    nuevo = ArbolN(4)
+    hoja.insertar_subarbol(nuevo)
+    assert t._indice_vigente() is None
+    assert t.camino(4) == [0, 0] and euler.es_ancestro(hoja, nuevo)
+    # un subárbol colgado ya con sus propios hijos también es de la familia
+    suelto = arbol(5, 6)
+    nuevo.insertar_subarbol(suelto)
+    assert t.nivel(6) == 4
+    suelto.subarboles[0].dato = 7
+    assert t.nivel(6) == -1 and t.nivel(7) == 4
+
+
+def test_huella_por_arbol_y_copias():
+    t = arbol(1, 2, 3)
+    copia = t.copy()
+    assert t == copia
+    copia.insertar_subarbol(ArbolN(4))
+    assert t != copia and t.preorder() == [1, 2, 3]
+    podado = t.sin_hojas()
+    h = podado.huella()
+    podado.insertar_subarbol(ArbolN(9))
+    assert podado.huella() != h
+
+
+def test_versiones_distintas_entre_hilos():
+    arboles = [ArbolN(i) for i in range(8)]
+    versiones = [[] for _ in arboles]
+
+    def modificar(i: int):
+        for _ in range(2000):
+            arboles[i].dato = i
+            versiones[i].append(arboles[i]._version())
+
+    hilos = [threading.Thread(target=modificar, args=(i,)) for i in range(len(arboles))]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    todas = [v for vs in versiones for v in vs]
+    assert len(set(todas)) == len(todas)
@@ -0,0 +1,32 @@
+'''
+Resultado guardado de ArbolH.es_valido(): se descarta sólo con las inserciones en
+el mismo árbol, y los subárboles no se modifican por fuera de insertar_subarbol.
+'''
+import pytest
+
+from arbol_hojas_marian import ArbolH
+
+
+def test_subarboles_es_de_solo_lectura():
+    t = ArbolH.crear_nodo_y_hojas('a', 1, 2)
+    assert isinstance(t.subarboles, tuple)
+    with pytest.raises(AttributeError):
+        t.subarboles.append(ArbolH(3))
+
+
+def test_es_valido_por_arbol():
+    t = ArbolH.desde_anidado(('a', [1, ('b', [2, 3])]))
+    otro = ArbolH.crear_nodo_y_hojas('x', 4)
+    assert t.es_valido()
+    version = t._valido[0]
+    otro.insertar_subarbol(ArbolH.crear_nodo_y_hojas('y', 5))
+    # insertar en otro árbol no descarta el resultado guardado
+    assert t._valido[0] == version and t.es_valido()
+
+    b = t.subarboles[1]
+    c = ArbolH.crear_nodo_y_hojas('c', 6)
+    b.insertar_subarbol(c)
+    c._subarboles[0]._dato = 'z'
+    c.insertar_subarbol(ArbolH(7))
+    # insertar en un subárbol colgado después también cambia la versión del árbol
+    assert not t.es_valido()
@@ -0,0 +1,54 @@
+'''
+guardar()/cargar() del formato compacto: los datos de un tipo de array vuelven tal
+cual y los datos en pickle sólo se cargan con permitir_pickle=True.
+'''
+import sys
+
+import pytest
+
+import arboles
+import arbolbinarioordenado
+from arbolbinariocompacto import ArbolBinarioCompacto
+
+
+def test_guardar_y_cargar_con_tipo(tmp_path):
+    ruta = str(tmp_path / 'arbol.bin')
+    t = arbolbinarioordenado.ArbolBinarioOrdenado.desde_ordenados(range(100))
+    t.guardar(ruta, 'q')
+    assert ArbolBinarioCompacto.cargar(ruta).inorder() == list(range(100))
+    u = arbolbinarioordenado.ArbolBinarioOrdenado.cargar(ruta)
+    assert u == t and u.es_ordenado() and u.altura() == t.altura()
+
+
+def test_datos_en_pickle_solo_con_permiso(tmp_path):
+    ruta = str(tmp_path / 'arbol.bin')
+    t = arboles.ArbolBinario.crear_nodo('raíz', arboles.ArbolBinario.crear_nodo(('una', 'tupla')))
+    t.guardar(ruta)
+    with pytest.raises(ValueError, match='permitir_pickle'):
+        ArbolBinarioCompacto.cargar(ruta)
+    with pytest.raises(ValueError, match='permitir_pickle'):
+        arboles.ArbolBinario.cargar(ruta)
+    assert arboles.ArbolBinario.cargar(ruta, permitir_pickle=True) == t
+
+
+def test_archivo_cortado_o_danado(tmp_path):
+    ruta = tmp_path / 'arbol.bin'
+    t = arbolbinarioordenado.ArbolBinarioOrdenado.desde_ordenados(range(100))
+    t.guardar(str(ruta), 'q')
+    contenido = ruta.read_bytes()
+
+    cortado = tmp_path / 'cortado.bin'
+    for largo in (40, 1000, len(contenido) - 8):
+        cortado.write_bytes(contenido[:largo])
+        with pytest.raises(ValueError, match='cortado'):
+            ArbolBinarioCompacto.cargar(str(cortado))
+    with pytest.raises(ValueError, match='cortado'):
+        arbolbinarioordenado.ArbolBinarioOrdenado.cargar(str(cortado))
+
+    # el primer hijo izquierdo apunta fuera de los 100 nodos
+    danado = tmp_path / 'danado.bin'
+    danado.write_bytes(contenido[:24] + (100).to_bytes(8, sys.byteorder, signed=True) + contenido[32:])
+    with pytest.raises(ValueError, match='fuera de'):
+        ArbolBinarioCompacto.cargar(str(danado))
+    with pytest.raises(ValueError, match='fuera de'):
+        arbolbinarioordenado.ArbolBinarioOrdenado.cargar(str(danado))
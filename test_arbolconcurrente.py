@@ -0,0 +1,87 @@
+'''
+ArbolConcurrente con varios hilos: los lectores nunca ven una instantánea a medias
+ni una que cambie después de publicada, y al final están todas las modificaciones.
+'''
+import random
+import sys
+import threading
+
+import pytest
+
+from arbolbinarioordenadomarian import ArbolAVL
+from arbolconcurrente import ArbolConcurrente
+
+
+@pytest.fixture
+def cambios_de_hilo_frecuentes():
+    # con cambios de hilo cada 10 µs las lecturas se cruzan con las escrituras
+    intervalo = sys.getswitchinterval()
+    sys.setswitchinterval(1e-5)
+    yield
+    sys.setswitchinterval(intervalo)
+
+
+@pytest.mark.parametrize('n, operaciones', [(2_000, 400), pytest.param(100_000, 5_000, marks=pytest.mark.lento)])
+def test_escritores_y_lectores(n, operaciones, cambios_de_hilo_frecuentes):
+    hilos = 4
+    arbol = ArbolConcurrente(ArbolAVL.desde_ordenados(range(0, 2 * n, 2)))
+    # cada escritor tiene sus propias claves: el resultado final no depende del orden
+    esperado = [set(range(i * 2, 2 * n, 2 * hilos)) for i in range(hilos)]
+    errores = []
+    terminados = threading.Event()
+
+    def escritor(i):
+        generador = random.Random(i)
+        propias = esperado[i]
+        for _ in range(operaciones):
+            x = generador.randrange(i * 2, 2 * n, 2 * hilos) + generador.randrange(2)
+            if x in propias:
+                arbol.eliminar(x)
+                propias.discard(x)
+            else:
+                arbol.insertar(x)
+                propias.add(x)
+
+    def lector():
+        anteriores = []
+        while not terminados.is_set():
+            t = arbol.instantanea()
+            datos = t.inorder()
+            if len(datos) != len(t) or any(a >= b for a, b in zip(datos, datos[1:])):
+                errores.append('instantánea desordenada o con len incoherente')
+            anteriores.append((t, datos))
+        for t, datos in anteriores[::max(1, len(anteriores) // 20)]:
+            if t.inorder() != datos:
+                errores.append('una instantánea cambió después de publicada')
+
+    lectores = [threading.Thread(target=lector) for _ in range(2)]
+    escritores = [threading.Thread(target=escritor, args=(i,)) for i in range(hilos)]
+    for hilo in lectores + escritores:
+        hilo.start()
+    for hilo in escritores:
+        hilo.join()
+    terminados.set()
+    for hilo in lectores:
+        hilo.join()
+
+    assert not errores, errores[:3]
+    assert arbol.inorder() == sorted(set().union(*esperado))
+    assert arbol.instantanea().es_ordenado() and len(arbol) == len(arbol.inorder())
+
+
+def test_modificar_publica_todo_junto_o_nada():
+    arbol = ArbolConcurrente()
+    arbol.insertar_muchos([5, 1, 9])
+    antes = arbol.instantanea()
+
+    def falla(t):
+        t.insertar(3)
+        raise RuntimeError('a mitad de camino')
+
+    with pytest.raises(RuntimeError):
+        arbol.modificar(falla)
+    assert arbol.instantanea() is antes and arbol.inorder() == [1, 5, 9]
+
+    arbol.modificar(lambda t: (t.insertar(3), t.eliminar(9)))
+    assert arbol.inorder() == [1, 3, 5] and antes.inorder() == [1, 5, 9]
+    assert arbol.rank(5) == 2 and arbol.select(0) == 1 and arbol.floor(4) == 3 and arbol.ceiling(6) is None
@@ -0,0 +1,107 @@
+'''
+Tamaño, altura y huella guardados en los nodos de arboles.ArbolBinario: después de
+cualquier secuencia de modificaciones tienen que coincidir con los del árbol
+(es_consistente) y con un recálculo desde cero.
+'''
+import random
+
+import pytest
+
+import arbolbinarioordenado
+from arboles import ArbolBinario, FabricaArboles
+from recorridos import plegar
+
+
+def altura_recorriendo(t):
+    altura, pila = 0, [(t, 1)]
+    while pila:
+        actual, nivel = pila.pop()
+        if not actual.es_vacio():
+            altura = max(altura, nivel)
+            pila.extend([(actual.si(), nivel + 1), (actual.sd(), nivel + 1)])
+    return altura
+
+
+def nodos(t):
+    pila, resultado = [t], []
+    while pila:
+        actual = pila.pop()
+        if not actual.es_vacio():
+            resultado.append(actual)
+            pila.extend([actual.si(), actual.sd()])
+    return resultado
+
+
+def copiar(t):
+    return plegar(t, ArbolBinario._hijos, lambda s, hijos: ArbolBinario() if s.es_vacio() else ArbolBinario.crear_nodo(s.dato(), *hijos))
+
+
+def arbol_al_azar(generador, n):
+    t = ArbolBinario.crear_nodo(generador.randrange(100))
+    for _ in range(n - 1):
+        padre = generador.choice(nodos(t))
+        hoja = ArbolBinario.crear_nodo(generador.randrange(100))
+        if generador.random() < 0.5:
+            padre.insertar_si(hoja)
+        else:
+            padre.insertar_sd(hoja)
+    return t
+
+
+@pytest.mark.parametrize('semilla', range(20))
+def test_valores_guardados_despues_de_modificar(semilla):
+    generador = random.Random(semilla)
+    t = arbol_al_azar(generador, 30)
+    for _ in range(50):
+        destino = generador.choice(nodos(t))
+        injerto = arbol_al_azar(generador, generador.randrange(1, 6)) if generador.random() < 0.8 else ArbolBinario()
+        if generador.random() < 0.5:
+            destino.insertar_si(injerto)
+        else:
+            destino.insertar_sd(injerto)
+        assert t.es_consistente()
+        assert len(t) == len(nodos(t)) and t.altura() == altura_recorriendo(t)
+        assert t == copiar(t)
+
+
+def test_es_consistente_detecta_valores_viejos():
+    t = ArbolBinario.crear_nodo(1, ArbolBinario.crear_nodo(2))
+    assert t.es_consistente()
+    t.si().raiz.si = ArbolBinario.crear_nodo(3)  # sin pasar por insertar_si
+    assert not t.es_consistente()
+
+
+def test_un_subarbol_no_cuelga_de_dos_padres():
+    compartido = ArbolBinario.crear_nodo(3)
+    a, b = ArbolBinario.crear_nodo(1), ArbolBinario.crear_nodo(1)
+    a.insertar_si(compartido)
+    with pytest.raises(ValueError):
+        b.insertar_si(compartido)
+    with pytest.raises(ValueError):
+        a.insertar_sd(compartido)
+    with pytest.raises(ValueError):
+        ArbolBinario.crear_nodo(2, compartido)
+    assert b.es_hoja() and a.sd().es_vacio()
+
+    # volver a colgarlo en el mismo lugar no cambia nada; una vez reemplazado queda libre
+    a.insertar_si(compartido)
+    a.insertar_si(ArbolBinario.crear_nodo(4))
+    b.insertar_si(compartido)
+    compartido.insertar_si(ArbolBinario.crear_nodo(5))
+    assert len(a) == 2 and len(b) == 3 and a.es_consistente() and b.es_consistente()
+    assert a != b and b == copiar(b)
+
+
+def test_injertar_un_arbol_de_la_fabrica():
+    fabrica = FabricaArboles()
+    unico = fabrica.importar(ArbolBinario.crear_nodo(5, ArbolBinario.crear_nodo(2)))
+    t = arbolbinarioordenado.ArbolBinarioOrdenado.crear_nodo(10)
+    t.insertar_si(unico)
+    t.insertar(3)
+    assert list(t.iter_inorder()) == [2, 3, 5, 10] and len(t) == 4
+    assert t.es_consistente() and t.es_ordenado()
+    # el de la fábrica no cambió y sigue siendo el único con esos datos
+    assert list(unico.iter_inorder()) == [2, 5] and unico.es_consistente()
+    assert fabrica.importar(ArbolBinario.crear_nodo(5, ArbolBinario.crear_nodo(2))) is unico
+    with pytest.raises(TypeError):
+        unico.set_raiz(None)
@@ -0,0 +1,260 @@
+'''
+copy() persistente de arbolbinarioMarian, arbolbinarioordenadomarian y
+arbolNarioMarian: lo que se escribe a través de cualquier referencia del
+original queda en el original, y las copias no cambian.
+'''
+import random
+
+import pytest
+
+from arbolNarioMarian import ArbolN
+from arbolbinarioMarian import ArbolBinario
+from arbolbinarioordenadomarian import ArbolAVL, ArbolBinarioOrdenado
+from arbolconcurrente import ArbolConcurrente
+
+
+def test_subarbol_colgado_despues_de_copiar():
+    t = ArbolN(1)
+    t.copy()
+    n2 = ArbolN(2)
+    t.insertar_subarbol(n2)
+    t.insertar_subarbol(ArbolN(3))
+    assert [h.dato for h in t.subarboles] == [2, 3]
+    n2.insertar_subarbol(ArbolN(5))
+    assert t.preorder() == [1, 2, 5, 3]
+
+    b = ArbolBinario.crear_nodo(1)
+    b.copy()
+    b2 = ArbolBinario.crear_nodo(2)
+    b.insertar_si(b2)
+    b.insertar_sd(ArbolBinario.crear_nodo(3))
+    assert b.si() is b2
+    b2.insertar_si(ArbolBinario.crear_nodo(5))
+    assert b.preorder() == [1, 2, 5, 3]
+
+
+def test_subarbol_obtenido_antes_de_copiar():
+    t = ArbolN(1)
+    n2 = ArbolN(2)
+    t.insertar_subarbol(n2)
+    n2.insertar_subarbol(ArbolN(4))
+    copia = t.copy()
+    n2.insertar_subarbol(ArbolN(5))
+    n2.subarboles[0].dato = 40
+    assert t.preorder() == [1, 2, 40, 5]
+    assert copia.preorder() == [1, 2, 4]
+
+    b = ArbolBinario.crear_nodo(1, ArbolBinario.crear_nodo(2, ArbolBinario.crear_nodo(4)))
+    b2 = b.si()
+    copia_b = b.copy()
+    b2.insertar_sd(ArbolBinario.crear_nodo(5))
+    b2.si().insertar_si(ArbolBinario.crear_nodo(8))
+    assert b.preorder() == [1, 2, 4, 8, 5]
+    assert copia_b.preorder() == [1, 2, 4]
+
+
+def test_la_copia_se_modifica_por_sus_referencias():
+    t = ArbolN(1)
+    t.insertar_subarbol(ArbolN(2))
+    copia = t.copy()
+    h = copia.subarboles[0]
+    assert h is copia.subarboles[0]
+    h.insertar_subarbol(ArbolN(7))
+    h.dato = 20
+    assert copia.preorder() == [1, 20, 7] and t.preorder() == [1, 2]
+
+    b = ArbolBinario.crear_nodo(1, ArbolBinario.crear_nodo(2))
+    copia_b = b.copy()
+    hijo = copia_b.si()
+    assert hijo is copia_b.si()
+    hijo.insertar_sd(ArbolBinario.crear_nodo(3))
+    assert copia_b.preorder() == [1, 2, 3] and b.preorder() == [1, 2]
+
+
+def test_copias_de_copias():
+    t = ArbolN(1)
+    n = ArbolN(2)
+    t.insertar_subarbol(n)
+    c1 = t.copy()
+    c2 = c1.copy()
+    c1.subarboles[0].insertar_subarbol(ArbolN(3))
+    c3 = c1.copy()
+    n.insertar_subarbol(ArbolN(9))
+    assert t.preorder() == [1, 2, 9]
+    assert c1.preorder() == [1, 2, 3] and c3.preorder() == [1, 2, 3]
+    assert c2.preorder() == [1, 2]
+
+
+def test_ordenado_por_referencias_y_desde_la_raiz():
+    t = ArbolBinarioOrdenado.desde_ordenados(range(0, 30, 2))
+    izquierdo = t.si()
+    copia = t.copy()
+    izquierdo.insertar(5)
+    assert 5 in t.inorder() and len(t) == 16 and t.es_ordenado()
+    assert copia.inorder() == list(range(0, 30, 2)) and len(copia) == 15 and copia.es_ordenado()
+
+    t.insertar(27)
+    copia.insertar(1)
+    assert t.inorder() == sorted(list(range(0, 30, 2)) + [5, 27])
+    assert copia.inorder() == sorted(list(range(0, 30, 2)) + [1])
+    assert len(t) == 17 and len(copia) == 16
+
+
+def test_subarbol_sigue_en_el_arbol_despues_de_escribir_desde_la_raiz():
+    t = ArbolBinarioOrdenado.desde_ordenados(range(0, 30, 2))
+    izquierdo = t.si()
+    copia = t.copy()
+    # insertar desde la raíz copia el camino, pero izquierdo sigue siendo del árbol
+    t.insertar(3)
+    assert t.si() is izquierdo
+    izquierdo.insertar(5)
+    assert t.inorder() == sorted(list(range(0, 30, 2)) + [3, 5]) and len(t) == 17 and t.es_ordenado()
+    assert copia.inorder() == list(range(0, 30, 2)) and len(copia) == 15
+
+
+def nodos_binarios(t: ArbolBinario) -> list:
+    pendientes, nodos = [t], []
+    while pendientes:
+        s = pendientes.pop()
+        if not s.es_vacio():
+            nodos.append(s)
+            pendientes.extend((s.raiz.si, s.raiz.sd))
+    return nodos
+
+
+def test_copiar_y_escribir_copian_solo_el_camino():
+    t = ArbolBinarioOrdenado.desde_ordenados(range(1023))
+    copia = t.copy()
+    # copy() no marca más que los hijos de la raíz
+    assert sum(s._duenio is not None for s in nodos_binarios(t)) <= 3
+    hoja = t
+    while not hoja.es_hoja():
+        hoja = hoja.raiz.si
+    antes = {id(s) for s in nodos_binarios(copia)}
+    hoja.insertar(-1)
+    # la copia sólo cambió los nodos del camino (la raíz, de la copia, no cuenta)
+    assert len({id(s) for s in nodos_binarios(copia)} - antes) <= t.altura()
+    assert len({id(s) for s in nodos_binarios(t)} & {id(s) for s in nodos_binarios(copia)}) >= 1000
+    assert copia.inorder() == list(range(1023)) and t.inorder() == [-1] + list(range(1023))
+
+    n = ArbolN(0)
+    hijos = [ArbolN(i) for i in range(1, 200)]
+    for h in hijos:
+        n.insertar_subarbol(h)
+        h.insertar_subarbol(ArbolN(-h.dato))
+    copia_n = n.copy()
+    hijos[5].subarboles[0].insertar_subarbol(ArbolN(1000))
+    # sólo se copió el camino: el resto de los hijos sigue compartido
+    compartidos = sum(a is b for a, b in zip(n._subarboles, copia_n._subarboles))
+    assert compartidos == 198
+    assert copia_n.preorder() == [0] + [x for i in range(1, 200) for x in (i, -i)]
+    assert n.preorder()[11:15] == [6, -6, 1000, 7]
+
+
+def test_indice_binario_por_arbol():
+    t = ArbolAVL.desde_ordenados(range(15))
+    t.indexar()
+    otro = ArbolBinario.crear_nodo(1, ArbolBinario.crear_nodo(2))
+    otro.si().insertar_sd(ArbolBinario.crear_nodo(3))
+    concurrente = ArbolConcurrente(t.copy())
+    concurrente.insertar(20)
+    copia = t.copy()
+    copia.insertar(-1)
+    # escribir en otros árboles, ni en las copias, no descarta el índice
+    assert t._indice_vigente() is not None and t.nivel(0) == 3
+
+    hoja = t
+    while not hoja.es_hoja():
+        hoja = hoja.si()
+    hoja.insertar(-5)
+    assert t._indice_vigente() is None
+    assert t.nivel(-5) == 4 and t.camino(-5) == ['izquierda'] * 4
+    assert copia.nivel(-5) == -1
+
+
+def test_avl_instantaneas():
+    generador = random.Random(3)
+    t = ArbolAVL()
+    claves = set()
+    instantaneas = []
+    for _ in range(400):
+        if generador.random() < 0.2:
+            instantaneas.append((t.copy(), sorted(claves)))
+        valor = generador.randrange(200)
+        if valor in claves and generador.random() < 0.5:
+            t.eliminar(valor)
+            claves.discard(valor)
+        elif valor not in claves:
+            t.insertar(valor)
+            claves.add(valor)
+    assert t.inorder() == sorted(claves) and len(t) == len(claves)
+    for instantanea, esperado in instantaneas:
+        assert instantanea.inorder() == esperado and len(instantanea) == len(esperado)
+        assert instantanea.es_ordenado() and instantanea.altura() <= 10
+
+
+def armar(generador: random.Random, n: int) -> ArbolN:
+    nodos = [ArbolN(0)]
+    for i in range(1, n):
+        padre = generador.choice(nodos)
+        nodos.append(ArbolN(i))
+        padre.insertar_subarbol(nodos[-1])
+    return nodos[0]
+
+
+def como_tupla(t: ArbolN) -> tuple:
+    return (t.dato, tuple(como_tupla(h) for h in t.subarboles))
+
+
+@pytest.mark.parametrize('semilla', range(5))
+def test_versiones_al_azar(semilla):
+    '''
+    Versiones y referencias al azar contra un modelo hecho con listas: cada
+    referencia se escribe en la versión de la que salió.
+    '''
+    generador = random.Random(semilla)
+    raiz = armar(generador, 30)
+
+    def modelo_de(t: ArbolN) -> list:
+        return [t.dato, [modelo_de(h) for h in t.subarboles]]
+
+    versiones = [(raiz, modelo_de(raiz))]
+    # referencias guardadas: (nodo, versión, camino hasta el nodo)
+    guardadas = []
+
+    def en_modelo(modelo: list, camino: list) -> list:
+        for i in camino:
+            modelo = modelo[1][i]
+        return modelo
+
+    def como_lista(t: tuple) -> list:
+        return [t[0], [como_lista(h) for h in t[1]]]
+
+    siguiente = 1000
+    for _ in range(300):
+        operacion = generador.random()
+        indice = generador.randrange(len(versiones))
+        arbol, modelo = versiones[indice]
+        if operacion < 0.15:
+            copia = arbol.copy()
+            versiones.append((copia, como_lista(como_tupla(arbol))))
+            continue
+        if operacion < 0.3 and guardadas:
+            nodo, indice, camino = generador.choice(guardadas)
+            modelo = versiones[indice][1]
+        else:
+            nodo, camino = arbol, []
+            while nodo.subarboles and generador.random() < 0.7:
+                i = generador.randrange(len(nodo.subarboles))
+                nodo, camino = nodo.subarboles[i], camino + [i]
+            guardadas.append((nodo, indice, camino))
+        destino = en_modelo(modelo, camino)
+        if operacion < 0.8:
+            nodo.insertar_subarbol(ArbolN(siguiente))
+            destino[1].append([siguiente, []])
+        else:
+            nodo.dato = siguiente
+            destino[0] = siguiente
+        siguiente += 1
+        for t, esperado in versiones:
+            assert modelo_de(t) == esperado
@@ -0,0 +1,78 @@
+'''
+evaluar_lote() da lo mismo que evaluar() fila por fila, tanto por el camino de
+listas como, si numpy está instalado, por el de numpy.
+'''
+from array import array
+import math
+import random
+
+import pytest
+
+import exprecion_aritmetica_marian
+from exprecion_aritmetica_marian import ExpresionAritmetica
+
+
+def expresion() -> ExpresionAritmetica:
+    # (x + 1) * y / (x - 2) - (2 * 3)
+    x, y = ExpresionAritmetica.variable('x'), ExpresionAritmetica.variable('y')
+    return ExpresionAritmetica.resta(
+        ExpresionAritmetica.division(
+            ExpresionAritmetica.producto(ExpresionAritmetica.suma(x, ExpresionAritmetica.valor(1)), y),
+            ExpresionAritmetica.resta(ExpresionAritmetica.variable('x'), ExpresionAritmetica.valor(2))
+        ),
+        ExpresionAritmetica.producto(ExpresionAritmetica.valor(2), ExpresionAritmetica.valor(3))
+    )
+
+
+def columnas(filas: int = 200):
+    aleatorio = random.Random(7)
+    xs = [float(aleatorio.randint(-5, 5)) for _ in range(filas)]
+    ys = [aleatorio.uniform(-10, 10) for _ in range(filas)]
+    return xs, ys
+
+
+def esperado(e: ExpresionAritmetica, xs, ys, division_por_cero):
+    resultado = []
+    for x, y in zip(xs, ys):
+        try:
+            resultado.append(e.evaluar({'x': x, 'y': y}))
+        except ZeroDivisionError:
+            resultado.append(division_por_cero - 6)
+    return resultado
+
+
+def comprobar_lote(e: ExpresionAritmetica, xs, ys):
+    sin_ceros = [x if x != 2 else 3.0 for x in xs]
+    lote = e.evaluar_lote({'x': sin_ceros, 'y': ys})
+    assert len(lote) == len(xs)
+    assert all(math.isclose(float(r), v) for r, v in zip(lote, esperado(e, sin_ceros, ys, 0.0)))
+
+    lote = e.evaluar_lote({'x': array('d', xs), 'y': ys}, division_por_cero=100.0)
+    assert all(math.isclose(float(r), v) for r, v in zip(lote, esperado(e, xs, ys, 100.0)))
+
+    with pytest.raises(ZeroDivisionError):
+        e.evaluar_lote({'x': xs, 'y': ys})
+    with pytest.raises(ValueError):
+        e.evaluar_lote({'x': xs, 'y': ys[:-1]})
+    with pytest.raises(ValueError):
+        e.evaluar_lote({'x': xs})
+
+
+def test_lote_con_listas(monkeypatch):
+    monkeypatch.setattr(exprecion_aritmetica_marian, 'np', None)
+    xs, ys = columnas()
+    assert 2.0 in xs
+    lote = expresion().evaluar_lote({'x': xs, 'y': ys}, division_por_cero=0.0)
+    assert isinstance(lote, array) and lote.typecode == 'd'
+    comprobar_lote(expresion(), xs, ys)
+
+
+def test_lote_con_numpy():
+    np = pytest.importorskip('numpy')
+    xs, ys = columnas()
+    entrada = np.array(xs)
+    copia = entrada.copy()
+    lote = expresion().evaluar_lote({'x': entrada, 'y': ys}, division_por_cero=0.0)
+    assert isinstance(lote, np.ndarray) and lote.dtype == np.float64
+    assert np.array_equal(entrada, copia)
+    comprobar_lote(expresion(), xs, ys)
@@ -0,0 +1,107 @@
+'''
+Los recorridos de todas las clases corren sobre la pila explícita de recorridos.py:
+en cadenas (árboles degenerados) mucho más profundas que el límite de recursión de
+Python tienen que dar el resultado correcto sin RecursionError.
+'''
+import sys
+
+import pytest
+
+import arbol_hojas_marian
+import arboles
+import arbolbinarioMarian
+import arbolbinarioordenado
+import arbolbinarioordenadomarian
+from arbolNarioMarian import ArbolN
+
+TAMANIOS = [10_000, pytest.param(1_000_000, marks=pytest.mark.lento)]
+
+
+def cadena_binaria(modulo, n):
+    # cada nodo cuelga del subárbol izquierdo del siguiente: inorden 0, 1, ..., n - 1
+    t = modulo.ArbolBinario()
+    for i in range(n):
+        t = modulo.ArbolBinario.crear_nodo(i, t)
+    return t
+
+
+def cadena_ordenada(modulo, n):
+    # cada nodo cuelga del subárbol derecho del anterior
+    t = modulo.ArbolBinarioOrdenado.vacio()
+    for i in range(n - 1, -1, -1):
+        t = modulo.ArbolBinarioOrdenado.crear_nodo(i, None, t)
+    return t
+
+
+def cadena_n(n):
+    t = ArbolN(0)
+    for i in range(1, n):
+        padre = ArbolN(i)
+        padre.insertar_subarbol(t)
+        t = padre
+    return t
+
+
+def test_cadenas_mas_profundas_que_el_limite_de_recursion():
+    assert TAMANIOS[0] > sys.getrecursionlimit()
+
+
+@pytest.mark.parametrize('n', TAMANIOS)
+def test_arboles(n):
+    t = cadena_binaria(arboles, n)
+    assert t.altura() == n and len(t) == n and t.es_consistente()
+    recorrido = []
+    t.inorder(recorrido)
+    assert recorrido == list(range(n))
+    assert list(t.iter_preorder()) == list(range(n - 1, -1, -1))
+    assert list(t.iter_posorder()) == list(range(n))
+    assert t.bfs() == list(range(n - 1, -1, -1))
+    assert t.nivel_nodo(0) == n - 1
+    assert t == cadena_binaria(arboles, n)
+
+
+@pytest.mark.parametrize('n', TAMANIOS)
+def test_arbol_binario_marian(n):
+    t = cadena_binaria(arbolbinarioMarian, n)
+    assert t.altura() == n and len(t) == n
+    assert t.inorder() == list(range(n))
+    assert t.posorder() == list(range(n))
+    assert t.preorder() == list(range(n - 1, -1, -1))
+    assert t.nivel(0) == n - 1
+    assert t.espejo().inorder() == list(range(n - 1, -1, -1))
+    assert len(t.sin_hojas()) == n - 1
+    copia = t.copy()
+    assert copia is not t and copia.inorder() == list(range(n))
+
+
+@pytest.mark.parametrize('modulo', [arbolbinarioordenado, arbolbinarioordenadomarian])
+@pytest.mark.parametrize('n', TAMANIOS)
+def test_ordenados(modulo, n):
+    t = cadena_ordenada(modulo, n)
+    assert t.es_ordenado() and len(t) == n and t.altura() == n
+    assert list(t.iter_inorder()) == list(range(n))
+    assert t.rank(n - 1) == n - 1 and t.select(n - 1) == n - 1
+
+
+@pytest.mark.parametrize('n', TAMANIOS)
+def test_arbol_n(n):
+    t = cadena_n(n)
+    assert t.altura() == n and len(t) == n
+    assert t.preorder() == list(range(n - 1, -1, -1))
+    assert t.posorder() == list(range(n))
+    assert t.bfs() == list(range(n - 1, -1, -1))
+    assert t.nivel(0) == n - 1
+    assert len(t.sin_hojas()) == n - 1
+    assert t == t.copy()
+
+
+@pytest.mark.parametrize('n', TAMANIOS)
+def test_arbol_h(n):
+    # cada nodo interno tiene dos hojas y cuelga del nodo de arriba: 3 nodos por paso
+    t = arbol_hojas_marian.ArbolH.crear_nodo_y_hojas('x', 0, 1)
+    for _ in range(n // 3 - 1):
+        padre = arbol_hojas_marian.ArbolH.crear_nodo_y_hojas('x', 0, 1)
+        padre.insertar_subarbol(t)
+        t = padre
+    assert t.es_valido()
+    assert sum(1 for _ in t.iter_preorder()) == sum(1 for _ in t.iter_posorder()) == 3 * (n // 3)
@@ -0,0 +1,157 @@
+'''
+Versiones para copy() persistente, compartidas por arbolbinarioMarian (y sus
+árboles ordenados) y arbolNarioMarian.
+
+Cada nodo guarda en _duenio la Version de su árbol en la que se creó o se
+escribió por última vez; None quiere decir la de su padre (el nodo del que
+cuelga en su árbol), así que un árbol que nunca se copió no tiene nada marcado.
+copy() cierra la versión actual: con eso, en O(1), todos los nodos del original
+pasan a ser de una versión cerrada, que la copia puede estar compartiendo. El
+original sigue con una versión nueva del mismo linaje y la copia empieza uno
+propio.
+
+Un nodo de una versión cerrada no se escribe en el lugar: antes se lo desprende.
+El nodo se queda con una copia de su contenido, en la versión actual, y el
+contenido viejo pasa a un nodo congelado, que es el que ven desde ahora las
+copias. Como las copias pueden llegar al nodo a través de sus antecesores, se
+desprende el camino desde el primer antecesor que ya está en la versión actual:
+es la copia por camino, hecha del lado del que escribe, y las referencias que
+tenga quien escribe siguen siendo del árbol. Para saber qué nodos de las copias
+apuntan a uno compartido, cada copia se anota, con una referencia débil, en los
+hijos que comparte.
+
+Las clases guardan en _antecesor el nodo del que cuelga cada uno en su árbol.
+Cuando un nodo pasa a estar compartido lo guarda con una referencia débil: si no,
+las versiones que ya nadie usa seguirían vivas a través de los nodos que
+comparten con las nuevas.
+'''
+import weakref
+from typing import Any, Iterable, List, Optional, Tuple
+
+
+class Version:
+    __slots__ = ('atajo',)
+
+    def __init__(self):
+        # None mientras es la versión actual de su linaje; cerrada, camino hacia la
+        # versión actual (unión y búsqueda)
+        self.atajo: Optional[Version] = None
+
+
+# dueño de los nodos que sólo leen las copias: no es de ningún linaje y está
+# cerrada, así que sus nodos nunca se escriben
+_SIN_LINAJE = Version()
+CONGELADA = Version()
+CONGELADA.atajo = _SIN_LINAJE
+
+
+def ultima(version: Version) -> Version:
+    raiz = version
+    while raiz.atajo is not None:
+        raiz = raiz.atajo
+    # compresión de caminos
+    while version.atajo is not None and version.atajo is not raiz:
+        version.atajo, version = raiz, version.atajo
+    return raiz
+
+
+def cerrar(version: Version) -> Version:
+    '''
+    Cierra la versión actual de un linaje y devuelve la que sigue.
+    '''
+    sigue = Version()
+    version.atajo = sigue
+    return sigue
+
+
+def es_ajeno(hijo: Optional[Version], padre: Optional[Version]) -> bool:
+    '''
+    True si el hijo es de otro árbol para el nodo padre: lo que los accesos del
+    padre tienen que copiar antes de entregarlo. Un nodo sin versión es del árbol
+    de su padre.
+    '''
+    return hijo is not None and padre is not None and ultima(hijo) is not ultima(padre)
+
+
+def antecesor(nodo: Any) -> Any:
+    enlace = nodo._antecesor
+    return enlace() if type(enlace) is weakref.ref else enlace
+
+
+def camino(nodo: Any) -> List[Tuple[Any, Optional[Version]]]:
+    '''
+    (nodo, versión) desde el primer antecesor que está en la versión actual (o
+    desde la raíz) hasta nodo, de arriba hacia abajo. Los nodos sin versión
+    toman la de su padre y se la quedan anotada, para no volver a subir.
+    '''
+    subida = []
+    t = nodo
+    while t is not None:
+        subida.append(t)
+        if t._duenio is not None and t._duenio.atajo is None:
+            break
+        t = antecesor(t)
+    resultado = []
+    version = None
+    for t in reversed(subida):
+        if t._duenio is None:
+            t._duenio = version
+        version = t._duenio
+        resultado.append((t, version))
+    return resultado
+
+
+def a_desprender(nodo: Any) -> List[Tuple[Any, Version]]:
+    '''
+    Los nodos que hay que desprender antes de escribir nodo, de arriba hacia
+    abajo y con su versión cerrada.
+    '''
+    if nodo._duenio is CONGELADA:
+        raise ValueError('El subárbol es de una instantánea (ver copy()): no se modifica')
+    return [(t, version) for t, version in camino(nodo) if version is not None and version.atajo is not None]
+
+
+def version_para_copiar(nodo: Any) -> Version:
+    '''
+    La versión de nodo, para copy(). Si su árbol nunca se copió, el linaje empieza
+    en la raíz: con uno propio, nodo quedaría como de otro árbol para su padre.
+    '''
+    ruta = camino(nodo)
+    if ruta[-1][1] is None:
+        ruta[0][0]._duenio = Version()
+        ruta = camino(nodo)
+    return ruta[-1][1]
+
+
+def compartir(hijos: Iterable[Any], version: Optional[Version], copia: Any, original: Any = None) -> None:
+    '''
+    copia (un nodo de otro árbol, o congelado, hecho a partir de original) apunta
+    desde ahora a estos hijos de un nodo de esa versión: los que no tenían versión
+    se la quedan anotada, porque ya no se llega a ellos sólo desde su padre, y
+    anotan a copia para que se la pueda redirigir cuando se los desprenda. Los
+    que colgaban de original pasan a tenerlo con una referencia débil.
+    '''
+    referencia = weakref.ref(copia)
+    for hijo in hijos:
+        if hijo._duenio is None:
+            hijo._duenio = version
+        if hijo._antecesor is original is not None:
+            hijo._antecesor = weakref.ref(original)
+        if hijo._duenio is CONGELADA:
+            continue
+        anotadas = hijo._ajenos
+        if anotadas is None:
+            hijo._ajenos = [referencia]
+            continue
+        # las copias que ya no se usan se descartan cada vez que la lista duplica su largo
+        if len(anotadas) & (len(anotadas) - 1) == 0:
+            anotadas[:] = [r for r in anotadas if r() is not None]
+        anotadas.append(referencia)
+
+
+def desanotar(nodo: Any) -> List[Any]:
+    '''
+    Las copias vivas que apuntan a nodo, que deja de tenerlas anotadas.
+    '''
+    anotadas, nodo._ajenos = nodo._ajenos, None
+    return [copia for copia in map(weakref.ref.__call__, anotadas or ()) if copia is not None]